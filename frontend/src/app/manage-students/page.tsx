@@ -28,6 +28,9 @@ export default function ManageStudentsPage() {
   const [error, setError] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
   const [entriesPerPage, setEntriesPerPage] = useState(10);
+  // keyset pages: links to the neighbouring pages and to the one on screen (null = first)
+  const [pageLinks, setPageLinks] = useState<{ next: string | null; previous: string | null }>({ next: null, previous: null });
+  const [pageLink, setPageLink] = useState<string | null>(null);
   const [searchTerm, setSearchTerm] = useState('');
   const [showAddForm, setShowAddForm] = useState(false);
 
@@ -47,11 +50,13 @@ export default function ManageStudentsPage() {
   const [editingStudentId, setEditingStudentId] = useState<number | null>(null);
   const [editFormData, setEditFormData] = useState<UpdateStudentData>({});
 
-  const loadStudents = async () => {
+  const loadStudents = async (link: string | null = pageLink) => {
     try {
       setError(null);
-      const data = await fetchStudents();
-      setStudents(data);
+      const data = await fetchStudents(entriesPerPage, link);
+      setStudents(data.results);
+      setPageLinks({ next: data.next, previous: data.previous });
+      setPageLink(link);
     } catch (err) {
       setError("Failed to load students.");
       console.error(err);
@@ -62,11 +67,11 @@ export default function ManageStudentsPage() {
 
   useEffect(() => {
     if (user && (user.role === 'teacher' || user.role === 'admin')) {
-      loadStudents();
+      loadStudents(null);
     } else if (user) {
       setIsLoading(false);
     }
-  }, [user]);
+  }, [user, entriesPerPage]);
 
   const handleCreateStudent = async (e: React.FormEvent) => {
     e.preventDefault();
@@ -257,7 +262,7 @@ export default function ManageStudentsPage() {
               <Search className="absolute left-3 top-1/2 -translate-y-1/2 text-gray-800" size={18} />
               <input
                 type="text"
-                placeholder="Search students..."
+                placeholder="Search this page..."
                 value={searchTerm}
                 onChange={(e) => setSearchTerm(e.target.value)}
                 className="pl-10 pr-4 py-2 border border-gray-300 text-black rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500 w-64"
@@ -419,22 +424,25 @@ export default function ManageStudentsPage() {
           {/* Footer */}
           <div className="flex items-center justify-between mt-6">
             <p className="text-sm text-gray-600">
-              Showing {filteredStudents.length} of {students.length} students
+              Showing {filteredStudents.length} of {students.length} students on this page
             </p>
 
             {/* Pagination */}
             <div className="flex items-center gap-2">
-              <button className="p-2 border border-gray-300 rounded-lg hover:bg-gray-50 transition-colors">
+              <button
+                onClick={() => loadStudents(pageLinks.previous)}
+                disabled={!pageLinks.previous}
+                className="p-2 border border-gray-300 rounded-lg hover:bg-gray-50 transition-colors disabled:opacity-50"
+                title="Previous page"
+              >
                 <ChevronLeft size={18} className="text-gray-600" />
               </button>
-              <button className="px-4 py-2 bg-blue-600 text-white rounded-lg">1</button>
-              <button className="px-4 py-2 border border-gray-300 rounded-lg hover:bg-gray-50 transition-colors text-gray-700">
-                2
-              </button>
-              <button className="px-4 py-2 border border-gray-300 rounded-lg hover:bg-gray-50 transition-colors text-gray-700">
-                3
-              </button>
-              <button className="p-2 border border-gray-300 rounded-lg hover:bg-gray-50 transition-colors">
+              <button
+                onClick={() => loadStudents(pageLinks.next)}
+                disabled={!pageLinks.next}
+                className="p-2 border border-gray-300 rounded-lg hover:bg-gray-50 transition-colors disabled:opacity-50"
+                title="Next page"
+              >
                 <ChevronRight size={18} className="text-gray-600" />
               </button>
             </div>
@@ -14,6 +14,8 @@ import {
   UpdateTeacherData,
 } from "@/services/teacherService"; // 1. Import from teacherService
 
+const PAGE_SIZE = 25;
+
 // This is a simple component for the "Access Denied" message
 const AccessDenied = () => (
   <div className="p-4 m-4 text-center text-red-600 bg-red-100 rounded-lg">
@@ -27,6 +29,9 @@ export default function ManageTeachersPage() {
   const [teachers, setTeachers] = useState<Teacher[]>([]);
   const [error, setError] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
+  // keyset pages: links to the neighbouring pages and to the one on screen (null = first)
+  const [pageLinks, setPageLinks] = useState<{ next: string | null; previous: string | null }>({ next: null, previous: null });
+  const [pageLink, setPageLink] = useState<string | null>(null);
 
   // 2. State for the new teacher form
   const [formState, setFormState] = useState<NewTeacherData>({
@@ -43,11 +48,13 @@ export default function ManageTeachersPage() {
   const [editFormData, setEditFormData] = useState<UpdateTeacherData>({});
 
   // Function to load teachers from the API
-  const loadTeachers = async () => {
+  const loadTeachers = async (link: string | null = pageLink) => {
     try {
       setError(null);
-      const data = await fetchTeachers();
-      setTeachers(data);
+      const data = await fetchTeachers(PAGE_SIZE, link);
+      setTeachers(data.results);
+      setPageLinks({ next: data.next, previous: data.previous });
+      setPageLink(link);
     } catch (err) {
       setError("Failed to load teachers.");
       console.error(err);
@@ -303,6 +310,24 @@ return (
             </tbody>
           </table>
         </div>
+
+        {/* --- Pagination --- */}
+        <div className="flex justify-end gap-2 mt-4">
+          <button
+            onClick={() => loadTeachers(pageLinks.previous)}
+            disabled={!pageLinks.previous}
+            className="px-3 py-1 text-white bg-black rounded-full disabled:opacity-50"
+          >
+            Previous
+          </button>
+          <button
+            onClick={() => loadTeachers(pageLinks.next)}
+            disabled={!pageLinks.next}
+            className="px-3 py-1 text-white bg-black rounded-full disabled:opacity-50"
+          >
+            Next
+          </button>
+        </div>
       </div>
     </section>
   );
@@ -31,4 +31,39 @@ apiClient.interceptors.request.use(
   }
 );
 
+// List endpoints return keyset pages: { next, previous, results }.
+// List screens show one page at a time with getPage; getAll follows every
+// `next` link and is only for small reference lists (course and teacher
+// choices, a user's own courses).
+export interface Page<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
+// The first page of `url`, or the page a `next`/`previous` link points to
+// (the link already carries the cursor and page_size).
+export const getPage = async <T>(url: string, pageSize: number, link?: string | null): Promise<Page<T>> => {
+  const response = await apiClient.get<Page<T>>(link || url, {
+    params: link ? undefined : { page_size: pageSize },
+  });
+  return response.data;
+};
+
+export const getAll = async <T>(url: string, pageSize = 500): Promise<T[]> => {
+  const rows: T[] = [];
+  let next: string | null = url;
+  let params: Record<string, number> | undefined = { page_size: pageSize };
+  while (next) {
+    const response: { data: Page<T> | T[] } = await apiClient.get<Page<T> | T[]>(next, { params });
+    if (Array.isArray(response.data)) {
+      return response.data; // unpaginated endpoint
+    }
+    rows.push(...response.data.results);
+    next = response.data.next;
+    params = undefined; // the next link already carries cursor and page_size
+  }
+  return rows;
+};
+
 export default apiClient;
\ No newline at end of file
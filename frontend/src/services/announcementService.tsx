@@ -1,5 +1,5 @@
 // src/services/announcementService.ts
-import apiClient from '@/lib/api';
+import apiClient, { getPage, Page } from '@/lib/api';
 
 export interface Announcement {
   id: string | number; // or number
@@ -8,12 +8,11 @@ export interface Announcement {
   created_at: string;
 }
 
-// --- Get ALL Announcements ---
-export const getAllAnnouncements = async (): Promise<Announcement[]> => {
+// --- Get one page of Announcements (newest first) ---
+export const getAnnouncements = async (pageSize: number, link?: string | null): Promise<Page<Announcement>> => {
   try {
     // GET /api/announcements/
-    const response = await apiClient.get('/api/announcements/');
-    return response.data;
+    return await getPage<Announcement>('/api/announcements/', pageSize, link);
   } catch (error) {
     console.error('Error fetching announcements:', error);
     throw error;
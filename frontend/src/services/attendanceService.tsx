@@ -1,4 +1,4 @@
-import api from '@/lib/api';
+import api, { getAll } from '@/lib/api';
 
 // --- Helper: Format date to "YYYY-MM-DD" ---
 const toYYYYMMDD = (date: Date) => date.toISOString().split('T')[0];
@@ -36,6 +36,21 @@ export interface AttendanceRecord {
   status: 'Present' | 'Absent';
 }
 
+// For GET /api/attendance/student/my-attendance/
+// (no id when the server stores attendance as bitmaps: days are not rows there)
+export interface MyAttendanceRecord {
+  id?: number;
+  course: number;
+  date: string; // "YYYY-MM-DD"
+  status: 'Present' | 'Absent';
+}
+
+// For GET /api/attendance/teacher/mark/ (the whole roster; null = not marked yet)
+export interface RollCallEntry {
+  student: Student;
+  status: 'Present' | 'Absent' | null;
+}
+
 // For POST /api/attendance/teacher/
 export interface NewAttendanceData {
   course_id: number;
@@ -52,8 +67,7 @@ export const attendanceService = {
 
   getTeacherCourses: async (): Promise<CourseWithStudents[]> => {
     try {
-      const response = await api.get<CourseWithStudents[]>('/api/attendance/teacher/courses/');
-      return response.data;
+      return await getAll<CourseWithStudents>('/api/attendance/teacher/courses/');
     } catch (error) {
       console.error("Failed to fetch teacher courses:", error);
       throw new Error('Could not load your courses.');
@@ -61,12 +75,12 @@ export const attendanceService = {
   },
 
   /**
-   * (Teacher) Gets all attendance records for a specific course on a specific date.
+   * (Teacher) Gets the course roster with each student's status on a specific date.
    */
-  getAttendanceForDay: async (courseId: number, date: Date): Promise<AttendanceRecord[]> => {
+  getAttendanceForDay: async (courseId: number, date: Date): Promise<RollCallEntry[]> => {
     const dateString = toYYYYMMDD(date);
     try {
-      const response = await api.get<AttendanceRecord[]>(
+      const response = await api.get<RollCallEntry[]>(
         `/api/attendance/teacher/mark/?course_id=${courseId}&date=${dateString}`
       );
       return response.data;
@@ -76,6 +90,27 @@ export const attendanceService = {
     }
   },
 
+  /**
+   * (Teacher) Marks every student without a status on the date as `status` (Absent by default).
+   */
+  initializeAttendance: async (
+    courseId: number,
+    date: Date,
+    status: 'Present' | 'Absent' = 'Absent'
+  ): Promise<{ initialized: number }> => {
+    try {
+      const response = await api.post<{ initialized: number }>('/api/attendance/teacher/mark/initialize/', {
+        course_id: courseId,
+        date: toYYYYMMDD(date),
+        status,
+      });
+      return response.data;
+    } catch (error) {
+      console.error("Failed to initialize attendance:", error);
+      throw new Error('Could not initialize attendance.');
+    }
+  },
+
   /**
    * (Teacher) Saves a batch of attendance records for a course on a specific date.
    */
@@ -92,8 +127,7 @@ export const attendanceService = {
  
   getEnrolledCourses: async (): Promise<StudentCourse[]> => {
     try {
-      const response = await api.get<StudentCourse[]>('/api/attendance/student/courses/');
-      return response.data;
+      return await getAll<StudentCourse>('/api/attendance/student/courses/');
     } catch (error) {
       console.error("Failed to fetch enrolled courses:", error);
       throw new Error('Could not load your courses.');
@@ -103,9 +137,9 @@ export const attendanceService = {
   /**
    * (Student) Gets their own attendance history for a single course.
    */
-  getMyAttendance: async (courseId: number): Promise<AttendanceRecord[]> => {
+  getMyAttendance: async (courseId: number): Promise<MyAttendanceRecord[]> => {
     try {
-      const response = await api.get<AttendanceRecord[]>(
+      const response = await api.get<MyAttendanceRecord[]>(
         `/api/attendance/student/my-attendance/?course_id=${courseId}`
       );
       return response.data;
@@ -1,4 +1,4 @@
-import api from '@/lib/api';
+import api, { getAll } from '@/lib/api';
 
 // 1. Course interface (no change)
 export interface Course {
@@ -32,8 +32,7 @@ export interface Teacher {
 
 export const fetchCourses = async (): Promise<Course[]> => {
   try {
-    const response = await api.get<Course[]>('/api/courses/');
-    return response.data;
+    return await getAll<Course>('/api/courses/');
   } catch (error) {
     console.error('Failed to fetch courses:', error);
     throw new Error('Could not retrieve courses.');
@@ -42,8 +41,7 @@ export const fetchCourses = async (): Promise<Course[]> => {
 
 export const fetchTeachers = async (): Promise<Teacher[]> => {
   try {
-    const response = await api.get<Teacher[]>('/api/users/teachers/');
-    return response.data;
+    return await getAll<Teacher>('/api/users/teachers/');
   } catch (error) {
     console.error('Failed to fetch teachers:', error);
     throw new Error('Could not retrieve teachers.');
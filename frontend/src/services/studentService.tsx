@@ -1,5 +1,5 @@
 // src/services/studentService.ts
-import api from '@/lib/api';
+import api, { getPage, Page } from '@/lib/api';
 import axios from 'axios';
 
 // src/services/studentService.tsx
@@ -54,10 +54,10 @@ export interface UpdateStudentData {
 }
 
 // ... rest of your file is fine ...
-export const fetchStudents = async (): Promise<Student[]> => {
+// One page of students; pass the `next`/`previous` link of the page on screen to move
+export const fetchStudents = async (pageSize: number, link?: string | null): Promise<Page<Student>> => {
   try {
-    const response = await api.get<Student[]>('/api/students/');
-    return response.data;
+    return await getPage<Student>('/api/students/', pageSize, link);
   } catch (error) {
     console.error('Error fetching students:', error);
     throw error;
@@ -1,5 +1,5 @@
 // src/services/teacherService.ts
-import api from '@/lib/api';
+import api, { getPage, Page } from '@/lib/api';
 
 
 // --- Interfaces (These are all correct) ---
@@ -27,10 +27,10 @@ export interface UpdateTeacherData {
 
 // --- API Functions ---
 
-export const fetchTeachers = async (): Promise<Teacher[]> => {
+// One page of teachers; pass the `next`/`previous` link of the page on screen to move
+export const fetchTeachers = async (pageSize: number, link?: string | null): Promise<Page<Teacher>> => {
   try {
-    const response = await api.get<Teacher[]>('/api/teachers/');
-    return response.data;
+    return await getPage<Teacher>('/api/teachers/', pageSize, link);
   } catch (error) {
     console.error('Error fetching teachers:', error);
     // 1. RE-THROW THE ORIGINAL ERROR
@@ -15,6 +15,9 @@ class Announcement(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['course', '-created_at'], name='announcement_course_recent_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.course})"
@@ -1,3 +1,50 @@
-from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from announcements.models import Announcement
+from users.models import User
+
+
+class KeysetPaginationTests(APITestCase):
+    """Cursor navigation of sms_backend.pagination.KeysetPagination."""
+    url = "/api/announcements/?page_size=3"
+
+    def setUp(self):
+        admin = User.objects.create(username="admin", role="admin", is_staff=True)
+        self.ids = [
+            Announcement.objects.create(title=f"a{i}", message="m", created_by=admin).id for i in range(7)
+        ]
+        self.client.force_authenticate(admin)
+
+    def pages(self, url, link):
+        pages = []
+        while url:
+            page = self.client.get(url).json()
+            pages.append([row["id"] for row in page["results"]])
+            url = page[link]
+        return pages
+
+    def test_next_and_previous_cover_every_row_once(self):
+        forward = self.pages(self.url, "next")
+        self.assertEqual(forward, [self.ids[6:3:-1], self.ids[3:0:-1], self.ids[:1]])
+
+        last = self.client.get(self.url).json()
+        while last["next"]:
+            last = self.client.get(last["next"]).json()
+        backward = self.pages(last["previous"], "previous")
+        self.assertEqual(backward, forward[-2::-1])
+
+    def test_deleting_a_row_leaves_no_gap(self):
+        first = self.client.get(self.url).json()
+        Announcement.objects.filter(id=self.ids[3]).delete()  # would open page 2
+        second = self.client.get(first["next"]).json()
+        self.assertEqual([row["id"] for row in second["results"]], self.ids[2::-1])
+
+    def test_count_only_on_request(self):
+        with CaptureQueriesContext(connection) as plain:
+            self.assertNotIn("count", self.client.get(self.url).json())
+        with self.assertNumQueries(len(plain) + 1):  # one COUNT(*)
+            page = self.client.get(f"{self.url}&count=true").json()
+        self.assertEqual(page["count"], 7)
+        self.assertEqual(list(page), ["count", "next", "previous", "results"])
@@ -7,6 +7,7 @@ class AnnouncementListCreateView(generics.ListCreateAPIView):
     queryset = Announcement.objects.all()
     serializer_class = AnnouncementSerializer
     permission_classes = [IsAuthenticated]
+    ordering = '-id'  # newest first
 
     def get_queryset(self):
         user = self.request.user
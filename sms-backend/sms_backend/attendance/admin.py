@@ -1,5 +1,26 @@
 from django.contrib import admin
-from .models import Attendance
+from .models import Attendance, AttendanceSummary, CourseDailyAttendance, CourseRosterSlot
 
 # Register your models here.
-admin.site.register(Attendance)
\ No newline at end of file
+admin.site.register(Attendance)
+
+
+@admin.register(AttendanceSummary)
+class AttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ("student", "course", "present_count", "absent_count", "updated_at")
+    list_filter = ("course",)
+    search_fields = ("student__username", "course__code")
+
+
+@admin.register(CourseDailyAttendance)
+class CourseDailyAttendanceAdmin(admin.ModelAdmin):
+    list_display = ("course", "date", "present_count", "absent_count")
+    list_filter = ("course",)
+    date_hierarchy = "date"
+
+
+@admin.register(CourseRosterSlot)
+class CourseRosterSlotAdmin(admin.ModelAdmin):
+    list_display = ("course", "ordinal", "student")
+    list_filter = ("course",)
+    search_fields = ("student__username", "course__code")
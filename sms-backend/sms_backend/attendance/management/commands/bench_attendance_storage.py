@@ -0,0 +1,127 @@
+import datetime
+import random
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from attendance.models import Attendance, AttendanceBitmap, CourseRosterSlot
+from attendance.services.storage import BACKENDS, rows_to_bitmaps
+from courses.models import Course
+
+
+class _Rollback(Exception):
+    pass
+
+
+def table_bytes(model):
+    """On-disk size of a model's table and indexes, or None if unknown."""
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT pg_total_relation_size(%s)", [table])
+        elif connection.vendor == "sqlite":
+            cursor.execute(
+                "SELECT SUM(pgsize) FROM dbstat WHERE name IN "
+                "(SELECT name FROM sqlite_master WHERE tbl_name = %s)",
+                [table],
+            )
+        else:
+            return None
+        return cursor.fetchone()[0] or 0
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the row and bitmap attendance storage modes on a synthetic "
+        "course: bytes on disk and latency of the roll-call, register and "
+        "student-history queries. Everything runs in a transaction that is "
+        "rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=200)
+        parser.add_argument("--days", type=int, default=180)
+        parser.add_argument("--repeat", type=int, default=5,
+                            help="Runs per measurement; the median is reported.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._bench(options["students"], options["days"], options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _bench(self, size, days, repeat):
+        sizes = {model: table_bytes(model) for model in (Attendance, AttendanceBitmap, CourseRosterSlot)}
+        course, students, dates = self._seed(size, days)
+        rows_to_bitmaps(course.id, keep_source=True)
+        for model, before in sizes.items():
+            after = table_bytes(model)
+            sizes[model] = None if before is None else after - before
+
+        rows_bytes = sizes[Attendance]
+        bitmap_bytes = None if sizes[AttendanceBitmap] is None else sizes[AttendanceBitmap] + sizes[CourseRosterSlot]
+        self.stdout.write(f"{size} students x {days} days = {size * days} attendance records")
+        self.stdout.write(f"{'storage':>8} {'bytes':>12}")
+        self.stdout.write(f"{'rows':>8} {self._fmt(rows_bytes):>12}")
+        self.stdout.write(f"{'bitmap':>8} {self._fmt(bitmap_bytes):>12}")
+
+        rng = random.Random(1)
+        student = students[len(students) // 2]
+        statuses = {s.id: rng.choice(["Present", "Absent"]) for s in students}
+        day = dates[len(dates) // 2]
+        checks = {
+            "register": lambda b: b.day_roster(course.id, day),
+            "history": lambda b: list(b.student_records(student, course.id)),
+            "roll call": lambda b: b.save_day(course, day, statuses),
+            "counts": lambda b: b.student_counts(course.id),
+        }
+
+        self.stdout.write(f"{'query':>10} " + " ".join(f"{name + ' ms':>10}" for name in BACKENDS))
+        for label, check in checks.items():
+            timings = [self._median(repeat, check, backend()) for backend in BACKENDS.values()]
+            self.stdout.write(f"{label:>10} " + " ".join(f"{t * 1000:>10.2f}" for t in timings))
+
+    def _seed(self, size, days):
+        User = get_user_model()
+        rng = random.Random(0)
+        tag = uuid.uuid4().hex[:8]
+
+        teacher = User.objects.create(username=f"{tag}-teacher", role="teacher")
+        students = User.objects.bulk_create(
+            [User(username=f"{tag}-student-{i}", role="student") for i in range(size)]
+        )
+        course = Course.objects.create(code=tag, name=f"bench {tag}", teacher=teacher)
+        course.students.set(students)
+
+        start = datetime.date(2026, 1, 1)
+        dates = [start + datetime.timedelta(days=d) for d in range(days)]
+        Attendance.objects.bulk_create(
+            (
+                Attendance(
+                    student=student, course=course, date=date,
+                    status="Present" if rng.random() < 0.85 else "Absent",
+                )
+                for date in dates for student in students
+            ),
+            batch_size=1000,
+        )
+        return course, students, dates
+
+    @staticmethod
+    def _median(repeat, check, backend):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            check(backend)
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+
+    @staticmethod
+    def _fmt(value):
+        return "n/a" if value is None else f"{value:,}"
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from attendance.services import rollups
+from attendance.services.storage import (
+    BACKENDS, get_backend, bitmaps_to_rows, rows_to_bitmaps,
+)
+
+CONVERTERS = {"bitmap": rows_to_bitmaps, "rows": bitmaps_to_rows}
+
+
+class Command(BaseCommand):
+    help = (
+        "Move stored attendance between the row and bitmap storage modes, "
+        "one course per transaction. Set ATTENDANCE_STORAGE to the target "
+        "mode once every course is converted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--to", choices=sorted(CONVERTERS), required=True,
+                            help="Storage mode to convert into.")
+        parser.add_argument("--course", type=int, action="append", dest="courses",
+                            help="Only convert this course id (repeatable).")
+        parser.add_argument("--keep-source", action="store_true",
+                            help="Leave the source data in place after converting.")
+
+    def handle(self, *args, **options):
+        target = options["to"]
+        source = BACKENDS["rows" if target == "bitmap" else "bitmap"]()
+        convert = CONVERTERS[target]
+
+        course_ids = options["courses"] or sorted(source.course_ids())
+        total = 0
+        for course_id in course_ids:
+            with transaction.atomic(), rollups.deferred():
+                converted = convert(course_id, keep_source=options["keep_source"])
+                # recount from the converted data so the rollups match what will be served
+                rollups.rebuild([course_id], backend=BACKENDS[target]())
+            self.stdout.write(f"course {course_id}: {converted} records")
+            total += converted
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Converted {total} attendance records in {len(course_ids)} courses to {target} storage"
+        ))
+        if get_backend().name != target:
+            self.stdout.write(self.style.WARNING(
+                f"ATTENDANCE_STORAGE is still '{get_backend().name}'; set it to '{target}' to serve the converted data."
+            ))
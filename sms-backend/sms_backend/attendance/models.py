@@ -33,8 +33,115 @@ class Attendance(models.Model):
         # This is a critical rule:
         # A student can only have one attendance status per course, per day.
         unique_together = ('student', 'course', 'date')
+        indexes = [
+            # a course's register for one day or a date range
+            models.Index(fields=['course', 'date'], name='attendance_course_date_idx'),
+        ]
 
     def __str__(self):
         # Provides a helpful name in the Django admin
         return f"{self.student.username} - {self.course.code} on {self.date} - {self.status}"
 
+
+
+class AttendanceSummary(models.Model):
+    """
+    Present/absent counts for one student in one course, kept up to date
+    by the attendance write paths so percentages never scan Attendance.
+    """
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='attendance_summaries'
+    )
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='attendance_summaries'
+    )
+    present_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('student', 'course')
+
+    @property
+    def total(self):
+        return self.present_count + self.absent_count
+
+    @property
+    def percentage(self):
+        return round(self.present_count * 100 / self.total, 2) if self.total else None
+
+    def __str__(self):
+        return f"{self.student.username} - {self.course.code}: {self.present_count}/{self.total}"
+
+
+class CourseDailyAttendance(models.Model):
+    """ Headcount of one course on one day, for attendance trends """
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='daily_attendance'
+    )
+    date = models.DateField()
+    present_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('course', 'date')
+        ordering = ['course', 'date']
+
+    def __str__(self):
+        return f"{self.course.code} on {self.date}: {self.present_count} present, {self.absent_count} absent"
+
+
+class CourseRosterSlot(models.Model):
+    """
+    Fixed bit position of a student in a course's attendance bitmaps.
+    Ordinals are handed out in order and never reused, so old bitmaps
+    stay readable after students leave the course.
+    """
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='roster_slots'
+    )
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='roster_slots'
+    )
+    ordinal = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = [('course', 'student'), ('course', 'ordinal')]
+        ordering = ['course', 'ordinal']
+
+    def __str__(self):
+        return f"{self.course.code} #{self.ordinal}: {self.student.username}"
+
+
+class AttendanceBitmap(models.Model):
+    """
+    One course's roll call for one day in the compact storage mode.
+    Bit ``n`` of ``marked`` says the student in roster slot ``n`` has a
+    status that day; the same bit of ``present`` says they were present.
+    Both are little-endian packed bitsets.
+    """
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='attendance_bitmaps'
+    )
+    date = models.DateField()
+    marked = models.BinaryField(default=b'')
+    present = models.BinaryField(default=b'')
+
+    class Meta:
+        unique_together = ('course', 'date')
+
+    def __str__(self):
+        return f"{self.course.code} on {self.date}"
@@ -1,6 +1,9 @@
+from django.db import transaction
 from rest_framework import serializers
+from rest_framework.exceptions import PermissionDenied
 # Make sure to import the models
-from .models import Attendance
+from .models import Attendance, AttendanceSummary, CourseDailyAttendance
+from .services import rollups, storage
 from users.models import User
 from courses.models import Course
 
@@ -25,7 +28,7 @@ class StudentCourseSerializer(serializers.ModelSerializer):
         fields = ['id', 'code', 'name']
 
 class StudentAttendanceSerializer(serializers.ModelSerializer):
-    """ Serializer for a teacher to see student status for a day """
+    """ Serializer for a teacher to see student status for a day (null when unmarked) """
     student = StudentSerializer(read_only=True)
     class Meta:
         model = Attendance
@@ -37,6 +40,29 @@ class AttendanceSerializer(serializers.ModelSerializer):
         model = Attendance
         fields = ['id', 'course', 'date', 'status']
 
+class AttendanceDaySerializer(serializers.ModelSerializer):
+    """ A student's own attendance with bitmap storage: days are not rows, so there is no id """
+    class Meta:
+        model = Attendance
+        fields = ['course', 'date', 'status']
+
+class AttendanceSummarySerializer(serializers.ModelSerializer):
+    """ Serializer for a student's attendance percentage in each course """
+    course_code = serializers.CharField(source='course.code', read_only=True)
+    course_name = serializers.CharField(source='course.name', read_only=True)
+    total = serializers.IntegerField(read_only=True)
+    percentage = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = AttendanceSummary
+        fields = ['course', 'course_code', 'course_name', 'present_count', 'absent_count', 'total', 'percentage']
+
+class CourseDailyAttendanceSerializer(serializers.ModelSerializer):
+    """ Serializer for one day of a course's attendance trend """
+    class Meta:
+        model = CourseDailyAttendance
+        fields = ['date', 'present_count', 'absent_count']
+
 class CreateAttendanceSerializer(serializers.Serializer):
     """ Serializer for POSTING a batch of attendance records """
     course_id = serializers.IntegerField()
@@ -46,30 +72,97 @@ class CreateAttendanceSerializer(serializers.Serializer):
     )
 
     def create(self, validated_data):
+        """
+        Save the whole roll call in one transaction: students are checked
+        against the course roster with one query and the storage backend
+        writes every valid row in a single upsert.
+        Returns an outcome for each input row.
+        """
         course_id = validated_data['course_id']
         date = validated_data['date']
         records_data = validated_data['records']
-        
+
         try:
             course = Course.objects.get(id=course_id)
         except Course.DoesNotExist:
             raise serializers.ValidationError("Course not found.")
-        
-        created_records = []
-        for record_data in records_data:
-            student_id = record_data.get('student_id')
+
+        valid_statuses = {choice for choice, _ in Attendance.STATUS_CHOICES}
+        results = []
+        rows = {}
+        for index, record_data in enumerate(records_data):
+            result = {'row': index, 'student_id': record_data.get('student_id')}
+            results.append(result)
+            try:
+                student_id = int(record_data.get('student_id'))
+            except (TypeError, ValueError):
+                result.update(outcome='rejected', error="student_id is required.")
+                continue
             status = record_data.get('status')
-            
-            if not student_id or not status:
-                continue 
-
-            attendance_record, created = Attendance.objects.update_or_create(
-                student_id=student_id,
-                course=course,
-                date=date,
-                defaults={'status': status}
+            if status not in valid_statuses:
+                result.update(outcome='rejected', error=f"Invalid status \"{status}\".")
+                continue
+            if student_id in rows:
+                result.update(outcome='rejected', error=f"Duplicate of row {rows[student_id][0]['row']}.")
+                continue
+            result['student_id'] = student_id
+            rows[student_id] = (result, status)
+
+        with transaction.atomic():
+            enrolled = set(
+                course.students.filter(id__in=rows).values_list('id', flat=True)
+            ) if rows else set()
+
+            statuses = {}
+            for student_id, (result, status) in rows.items():
+                if student_id in enrolled:
+                    statuses[student_id] = status
+                else:
+                    result.update(outcome='rejected', error="Student is not enrolled in this course.")
+
+            outcomes = storage.get_backend().save_day(course, date, statuses) if statuses else {}
+            for student_id, outcome in outcomes.items():
+                rows[student_id][0]['outcome'] = outcome
+            rollups.refresh(
+                course.id, date,
+                [student_id for student_id, outcome in outcomes.items() if outcome != 'unchanged'],
             )
-            created_records.append(attendance_record)
-            
-        return {'created_records': created_records}
 
+        return {'results': results}
+
+class InitializeAttendanceSerializer(serializers.Serializer):
+    """
+    Serializer for opening a roll call with a default status for the whole
+    roster. Only the course's teacher or staff may open one; the request
+    must be in the context.
+    """
+    course_id = serializers.IntegerField()
+    date = serializers.DateField()
+    status = serializers.ChoiceField(choices=Attendance.STATUS_CHOICES, default='Absent')
+
+    def create(self, validated_data):
+        """
+        Give every enrolled student without a status on the date the default
+        one, in a single insert. Existing statuses are left alone.
+        Returns the number of students initialized.
+        """
+        try:
+            course = Course.objects.get(id=validated_data['course_id'])
+        except Course.DoesNotExist:
+            raise serializers.ValidationError("Course not found.")
+        user = self.context['request'].user
+        if not user.is_staff and course.teacher_id != user.id:
+            raise PermissionDenied("Only the course's teacher can open its roll call.")
+        date = validated_data['date']
+
+        backend = storage.get_backend()
+        with transaction.atomic():
+            unmarked = {
+                entry['student']['id']: validated_data['status']
+                for entry in backend.day_roster(course.id, date)
+                if entry['status'] is None
+            }
+            if unmarked:
+                backend.save_day(course, date, unmarked)
+                rollups.refresh(course.id, date, list(unmarked))
+        return {'initialized': len(unmarked)}
@@ -0,0 +1,56 @@
+"""
+Attendance registers: one line per (course, student) with a cell per date.
+
+Lines are assembled from the storage backend's ordered row stream and
+rendered to CSV or JSON chunk by chunk, so a whole-term register for a
+large course is sent without ever being held in memory.
+"""
+import json
+from itertools import groupby
+from operator import itemgetter
+
+from sms_backend.streaming import line_writer
+
+CHUNK_SIZE = 2000
+
+
+def register_lines(rows, dates):
+    """
+    Group ``(course_id, student_id, username, date, status)`` rows (sorted
+    by course and student) into ``(course_id, student_id, username, cells)``
+    where ``cells`` follows ``dates`` and holds None for unmarked days.
+    """
+    column = {date: index for index, date in enumerate(dates)}
+    for (course_id, student_id, username), records in groupby(rows, key=itemgetter(0, 1, 2)):
+        cells = [None] * len(dates)
+        for record in records:
+            cells[column[record[3]]] = record[4]
+        yield course_id, student_id, username, cells
+
+
+def stream_csv(lines, dates, course_codes):
+    writer = line_writer()
+    yield writer.writerow(["course", "student_id", "student"] + [date.isoformat() for date in dates])
+    for course_id, student_id, username, cells in lines:
+        yield writer.writerow([course_codes[course_id], student_id, username] + [cell or "" for cell in cells])
+
+
+def stream_json(lines, dates, course_codes):
+    yield '{"dates": %s, "rows": [' % json.dumps([date.isoformat() for date in dates])
+    separator = ""
+    for course_id, student_id, username, cells in lines:
+        yield separator + json.dumps({
+            "course_id": course_id,
+            "course": course_codes[course_id],
+            "student_id": student_id,
+            "student": username,
+            "statuses": cells,
+        })
+        separator = ","
+    yield "]}"
+
+
+RENDERERS = {
+    "csv": (stream_csv, "text/csv"),
+    "json": (stream_json, "application/json"),
+}
@@ -0,0 +1,114 @@
+"""
+Attendance rollup tables.
+
+``AttendanceSummary`` holds present/absent counts per (student, course)
+and ``CourseDailyAttendance`` per (course, date). Write paths refresh only
+the keys they touched: the storage backend counts the affected students
+or days and one upsert per table stores the result, so a roll call costs
+the same handful of queries however long the course has been running.
+``rebuild`` recomputes everything and is what the nightly repair command
+runs.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from attendance.models import AttendanceSummary, CourseDailyAttendance
+from attendance.services.storage import get_backend
+
+COUNT_FIELDS = ["present_count", "absent_count", "updated_at"]
+
+_state = threading.local()
+
+
+@contextmanager
+def deferred():
+    """
+    Skip the per-row refreshes sent by attendance signals. Bulk jobs use
+    this and rebuild the rollups of the courses they touched afterwards.
+    """
+    previous = getattr(_state, "deferred", False)
+    _state.deferred = True
+    try:
+        yield
+    finally:
+        _state.deferred = previous
+
+
+def is_deferred():
+    return getattr(_state, "deferred", False)
+
+
+def refresh_student_summaries(course_id, student_ids=None, backend=None):
+    """Recount the course's summaries, or only those of ``student_ids``."""
+    backend = backend or get_backend()
+    summaries = AttendanceSummary.objects.filter(course_id=course_id)
+    if student_ids is not None:
+        summaries = summaries.filter(student_id__in=student_ids)
+
+    rows = [
+        AttendanceSummary(course_id=course_id, **row)
+        for row in backend.student_counts(course_id, student_ids)
+    ]
+    with transaction.atomic():
+        summaries.exclude(student_id__in=[row.student_id for row in rows]).delete()
+        AttendanceSummary.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["student", "course"],
+            update_fields=COUNT_FIELDS,
+        )
+    return len(rows)
+
+
+def refresh_daily(course_id, dates=None, backend=None):
+    """Recount the course's daily headcounts, or only those of ``dates``."""
+    backend = backend or get_backend()
+    days = CourseDailyAttendance.objects.filter(course_id=course_id)
+    if dates is not None:
+        days = days.filter(date__in=dates)
+
+    rows = [
+        CourseDailyAttendance(course_id=course_id, **row)
+        for row in backend.daily_counts(course_id, dates)
+    ]
+    with transaction.atomic():
+        days.exclude(date__in=[row.date for row in rows]).delete()
+        CourseDailyAttendance.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["course", "date"],
+            update_fields=COUNT_FIELDS,
+        )
+    return len(rows)
+
+
+def refresh(course_id, date, student_ids):
+    """Bring both rollups up to date after a roll call on ``date``."""
+    if not student_ids:
+        return
+    backend = get_backend()
+    refresh_student_summaries(course_id, student_ids, backend)
+    refresh_daily(course_id, [date], backend)
+
+
+def rebuild(course_ids=None, backend=None):
+    """
+    Recompute every rollup from the stored attendance. Rollups of courses
+    that no longer have any attendance are removed. Returns
+    ``(summaries, days)`` written.
+    """
+    backend = backend or get_backend()
+    if course_ids is None:
+        course_ids = (
+            backend.course_ids()
+            | set(AttendanceSummary.objects.values_list("course_id", flat=True).distinct())
+            | set(CourseDailyAttendance.objects.values_list("course_id", flat=True).distinct())
+        )
+
+    summaries = days = 0
+    for course_id in sorted(course_ids):
+        summaries += refresh_student_summaries(course_id, backend=backend)
+        days += refresh_daily(course_id, backend=backend)
+    return summaries, days
@@ -0,0 +1,388 @@
+"""
+Attendance storage backends.
+
+``rows`` keeps one ``Attendance`` row per student, course and day.
+``bitmap`` keeps one ``AttendanceBitmap`` per course and day, with each
+student's bit found through their ``CourseRosterSlot`` ordinal; a
+lecture's roll call is then a single row however many students attend.
+
+The ``ATTENDANCE_STORAGE`` setting picks the backend. Views, the roll-call
+serializer and the rollups only talk to the object returned by
+``get_backend()``; ``convert_attendance`` moves data between the two.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count, FilteredRelation, Max, Q
+
+from attendance.models import Attendance, AttendanceBitmap, CourseRosterSlot
+from courses.models import Course
+from users.models import User
+
+PRESENT = "Present"
+ABSENT = "Absent"
+
+
+def _status(present):
+    return PRESENT if present else ABSENT
+
+
+def _roster(course_id):
+    return User.objects.filter(enrolled_courses=course_id).order_by("username")
+
+
+def _roster_entry(student_id, username, email, status):
+    return {"student": {"id": student_id, "username": username, "email": email}, "status": status}
+
+
+def _outcome(old, new):
+    if old is None:
+        return "created"
+    return "unchanged" if old == new else "updated"
+
+
+class RowStorage:
+    """One ``Attendance`` row per student per course per day."""
+
+    name = "rows"
+
+    def day_roster(self, course_id, date):
+        """
+        Every student enrolled in the course with their status on ``date``
+        (None when unmarked), read with one LEFT JOIN.
+        """
+        roster = (
+            _roster(course_id)
+            .annotate(day=FilteredRelation(
+                "attendance_records",
+                condition=Q(attendance_records__course_id=course_id, attendance_records__date=date),
+            ))
+            .values_list("id", "username", "email", "day__status")
+        )
+        return [_roster_entry(*row) for row in roster]
+
+    def student_records(self, student, course_id):
+        return Attendance.objects.filter(student=student, course_id=course_id).order_by("date")
+
+    def save_day(self, course, date, statuses):
+        """
+        Store ``{student_id: status}`` for one course and day. Returns
+        ``{student_id: outcome}`` with created/updated/unchanged.
+        """
+        existing = dict(
+            Attendance.objects.filter(course=course, date=date, student_id__in=statuses)
+            .values_list("student_id", "status")
+        ) if statuses else {}
+        outcomes = {
+            student_id: _outcome(existing.get(student_id), status)
+            for student_id, status in statuses.items()
+        }
+        changed = [
+            Attendance(student_id=student_id, course=course, date=date, status=statuses[student_id])
+            for student_id, outcome in outcomes.items() if outcome != "unchanged"
+        ]
+        if changed:
+            Attendance.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=["student", "course", "date"],
+                update_fields=["status"],
+            )
+        return outcomes
+
+    @staticmethod
+    def _counts():
+        return {
+            "present_count": Count("id", filter=Q(status=PRESENT)),
+            "absent_count": Count("id", filter=Q(status=ABSENT)),
+        }
+
+    def student_counts(self, course_id, student_ids=None):
+        records = Attendance.objects.filter(course_id=course_id).order_by()
+        if student_ids is not None:
+            records = records.filter(student_id__in=student_ids)
+        return list(records.values("student_id").annotate(**self._counts()))
+
+    def daily_counts(self, course_id, dates=None):
+        records = Attendance.objects.filter(course_id=course_id).order_by()
+        if dates is not None:
+            records = records.filter(date__in=dates)
+        return list(records.values("date").annotate(**self._counts()))
+
+    def course_ids(self):
+        return set(Attendance.objects.values_list("course_id", flat=True).distinct())
+
+    def register_dates(self, course_ids, start, end):
+        return list(
+            Attendance.objects.filter(course_id__in=course_ids, date__range=(start, end))
+            .order_by("date").values_list("date", flat=True).distinct()
+        )
+
+    def register_rows(self, course_ids, start, end, student_ids=None, chunk_size=2000):
+        """
+        Stream ``(course_id, student_id, username, date, status)`` ordered
+        by course, student and date, ``chunk_size`` rows at a time.
+        """
+        records = Attendance.objects.filter(course_id__in=course_ids, date__range=(start, end))
+        if student_ids:
+            records = records.filter(student_id__in=student_ids)
+        return (
+            records.order_by("course_id", "student_id", "date")
+            .values_list("course_id", "student_id", "student__username", "date", "status")
+            .iterator(chunk_size=chunk_size)
+        )
+
+
+def _to_int(bits):
+    return int.from_bytes(bits or b"", "little")
+
+
+def _to_bytes(value):
+    return value.to_bytes((value.bit_length() + 7) // 8, "little")
+
+
+class BitmapStorage:
+    """One ``AttendanceBitmap`` per course per day."""
+
+    name = "bitmap"
+
+    def _slots(self, course_id):
+        return dict(
+            CourseRosterSlot.objects.filter(course_id=course_id).values_list("student_id", "ordinal")
+        )
+
+    def assign_slots(self, course_id, student_ids):
+        """
+        Return ``{student_id: ordinal}`` for the whole course, giving the
+        next free ordinals to students in ``student_ids`` without one.
+        """
+        slots = self._slots(course_id)
+        missing = sorted(set(student_ids) - slots.keys())
+        if missing:
+            # serialise slot allocation per course (save_day holds this lock already)
+            Course.objects.select_for_update().filter(id=course_id).exists()
+            start = (
+                CourseRosterSlot.objects.filter(course_id=course_id)
+                .aggregate(top=Max("ordinal"))["top"]
+            )
+            start = 0 if start is None else start + 1
+            new = [
+                CourseRosterSlot(course_id=course_id, student_id=student_id, ordinal=start + offset)
+                for offset, student_id in enumerate(missing)
+            ]
+            CourseRosterSlot.objects.bulk_create(new)
+            slots.update((slot.student_id, slot.ordinal) for slot in new)
+        return slots
+
+    def day_roster(self, course_id, date):
+        bitmap = (
+            AttendanceBitmap.objects.filter(course_id=course_id, date=date)
+            .values_list("marked", "present").first()
+        )
+        marked, present = (_to_int(bitmap[0]), _to_int(bitmap[1])) if bitmap else (0, 0)
+        roster = (
+            _roster(course_id)
+            .annotate(slot=FilteredRelation(
+                "roster_slots", condition=Q(roster_slots__course_id=course_id),
+            ))
+            .values_list("id", "username", "email", "slot__ordinal")
+        )
+        return [
+            _roster_entry(
+                student_id, username, email,
+                _status(present >> ordinal & 1) if ordinal is not None and marked >> ordinal & 1 else None,
+            )
+            for student_id, username, email, ordinal in roster
+        ]
+
+    def student_records(self, student, course_id):
+        """Unsaved ``Attendance`` objects, so without ids (see ``AttendanceDaySerializer``)."""
+        slot = (
+            CourseRosterSlot.objects.filter(course_id=course_id, student=student)
+            .values_list("course_id", "ordinal").first()
+        )
+        if slot is None:
+            return []
+        course_id, ordinal = slot  # the stored id, not the query string's
+        days = (
+            AttendanceBitmap.objects.filter(course_id=course_id)
+            .order_by("date")
+            .values_list("date", "marked", "present")
+        )
+        return [
+            Attendance(course_id=course_id, date=date, status=_status(_to_int(present) >> ordinal & 1))
+            for date, marked, present in days
+            if _to_int(marked) >> ordinal & 1
+        ]
+
+    def save_day(self, course, date, statuses):
+        # one roll call per course at a time: before a day's first save there
+        # is no bitmap row to lock, and two roll calls would each start from
+        # empty bits and overwrite the other's
+        Course.objects.select_for_update().filter(id=course.id).exists()
+        slots = self.assign_slots(course.id, statuses)
+        bitmap = AttendanceBitmap.objects.filter(course=course, date=date).first()
+        old_marked = marked = _to_int(bitmap.marked) if bitmap else 0
+        old_present = present = _to_int(bitmap.present) if bitmap else 0
+
+        outcomes = {}
+        for student_id, status in statuses.items():
+            bit = 1 << slots[student_id]
+            old = _status(old_present & bit) if old_marked & bit else None
+            outcomes[student_id] = _outcome(old, status)
+            marked |= bit
+            present = present | bit if status == PRESENT else present & ~bit
+
+        if (marked, present) != (old_marked, old_present):
+            AttendanceBitmap.objects.bulk_create(
+                [AttendanceBitmap(course=course, date=date, marked=_to_bytes(marked), present=_to_bytes(present))],
+                update_conflicts=True,
+                unique_fields=["course", "date"],
+                update_fields=["marked", "present"],
+            )
+        return outcomes
+
+    def student_counts(self, course_id, student_ids=None):
+        slots = self._slots(course_id)
+        if student_ids is not None:
+            wanted = set(student_ids)
+            slots = {student_id: o for student_id, o in slots.items() if student_id in wanted}
+        counts = {student_id: [0, 0] for student_id in slots}
+        days = AttendanceBitmap.objects.filter(course_id=course_id).values_list("marked", "present")
+        for marked, present in days:
+            marked, present = _to_int(marked), _to_int(present)
+            for student_id, ordinal in slots.items():
+                if marked >> ordinal & 1:
+                    counts[student_id][0 if present >> ordinal & 1 else 1] += 1
+        return [
+            {"student_id": student_id, "present_count": p, "absent_count": a}
+            for student_id, (p, a) in counts.items() if p or a
+        ]
+
+    def daily_counts(self, course_id, dates=None):
+        days = AttendanceBitmap.objects.filter(course_id=course_id)
+        if dates is not None:
+            days = days.filter(date__in=dates)
+        rows = []
+        for date, marked, present in days.values_list("date", "marked", "present"):
+            marked, present = _to_int(marked), _to_int(present)
+            if marked:
+                present_count = present.bit_count()
+                rows.append({
+                    "date": date,
+                    "present_count": present_count,
+                    "absent_count": marked.bit_count() - present_count,
+                })
+        return rows
+
+    def course_ids(self):
+        return set(AttendanceBitmap.objects.values_list("course_id", flat=True).distinct())
+
+    def register_dates(self, course_ids, start, end):
+        return list(
+            AttendanceBitmap.objects.filter(course_id__in=course_ids, date__range=(start, end))
+            .order_by("date").values_list("date", flat=True).distinct()
+        )
+
+    def register_rows(self, course_ids, start, end, student_ids=None, chunk_size=2000):
+        # a term's bitmaps are small, so every course's days are held while
+        # the rosters are streamed: two queries however many courses
+        days = defaultdict(list)
+        for course_id, date, marked, present in (
+            AttendanceBitmap.objects.filter(course_id__in=course_ids, date__range=(start, end))
+            .order_by("course_id", "date").values_list("course_id", "date", "marked", "present")
+        ):
+            days[course_id].append((date, _to_int(marked), _to_int(present)))
+        if not days:
+            return
+        slots = CourseRosterSlot.objects.filter(course_id__in=days)
+        if student_ids:
+            slots = slots.filter(student_id__in=student_ids)
+        slots = (
+            slots.order_by("course_id", "student_id")
+            .values_list("course_id", "student_id", "student__username", "ordinal")
+            .iterator(chunk_size=chunk_size)
+        )
+        for course_id, student_id, username, ordinal in slots:
+            for date, marked, present in days[course_id]:
+                if marked >> ordinal & 1:
+                    yield course_id, student_id, username, date, _status(present >> ordinal & 1)
+
+
+def rows_to_bitmaps(course_id, keep_source=False):
+    """
+    Pack a course's ``Attendance`` rows into day bitmaps, giving roster
+    slots to every student that appears. Days already stored as bitmaps
+    are overwritten. Returns the number of rows converted.
+    """
+    backend = BitmapStorage()
+    records = list(
+        Attendance.objects.filter(course_id=course_id)
+        .order_by("date", "student_id")
+        .values_list("student_id", "date", "status")
+    )
+    slots = backend.assign_slots(course_id, {student_id for student_id, _, _ in records})
+
+    days = {}
+    for student_id, date, status in records:
+        bit = 1 << slots[student_id]
+        marked, present = days.get(date, (0, 0))
+        days[date] = (marked | bit, present | bit if status == PRESENT else present)
+
+    AttendanceBitmap.objects.bulk_create(
+        [
+            AttendanceBitmap(course_id=course_id, date=date, marked=_to_bytes(marked), present=_to_bytes(present))
+            for date, (marked, present) in days.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["course", "date"],
+        update_fields=["marked", "present"],
+    )
+    if not keep_source:
+        Attendance.objects.filter(course_id=course_id).delete()
+    return len(records)
+
+
+def bitmaps_to_rows(course_id, keep_source=False):
+    """
+    Expand a course's day bitmaps back into ``Attendance`` rows. Returns
+    the number of rows written.
+    """
+    students = {
+        ordinal: student_id
+        for student_id, ordinal in BitmapStorage()._slots(course_id).items()
+    }
+    records = []
+    days = AttendanceBitmap.objects.filter(course_id=course_id).values_list("date", "marked", "present")
+    for date, marked, present in days:
+        marked, present = _to_int(marked), _to_int(present)
+        records.extend(
+            Attendance(
+                student_id=student_id, course_id=course_id, date=date,
+                status=_status(present >> ordinal & 1),
+            )
+            for ordinal, student_id in students.items()
+            if marked >> ordinal & 1
+        )
+
+    Attendance.objects.bulk_create(
+        records,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["student", "course", "date"],
+        update_fields=["status"],
+    )
+    if not keep_source:
+        AttendanceBitmap.objects.filter(course_id=course_id).delete()
+    return len(records)
+
+
+BACKENDS = {backend.name: backend for backend in (RowStorage, BitmapStorage)}
+
+
+def get_backend(name=None):
+    name = name or getattr(settings, "ATTENDANCE_STORAGE", "rows")
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown ATTENDANCE_STORAGE {name!r}; expected one of {sorted(BACKENDS)}")
@@ -0,0 +1,17 @@
+from django.db.models import Model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from attendance.models import Attendance
+from attendance.services import rollups
+
+
+@receiver([post_save, post_delete], sender=Attendance)
+def refresh_attendance_rollups(sender, instance, origin=None, **kwargs):
+    # single-row edits (admin, shell); roll calls refresh their rollups in bulk
+    if rollups.is_deferred():
+        return
+    if isinstance(origin, Model) and not isinstance(origin, Attendance):
+        # cascaded from deleting a course or student: their rollups cascade
+        # too, and the nightly rebuild fixes any daily headcounts left over
+        return
+    rollups.refresh(instance.course_id, instance.date, [instance.student_id])
@@ -1,3 +1,455 @@
-from django.test import TestCase
+import datetime
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.http import StreamingHttpResponse
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from attendance.models import Attendance, AttendanceSummary
+from attendance.services import rollups
+from attendance.services.storage import get_backend, rows_to_bitmaps
+from courses.models import Course
+from sms_backend.query_budget import QueryBudgetExceeded, QueryCounter, max_queries, query_budget
+from users.models import User
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class AttendanceQueryBudgetTests(APITestCase):
+    """
+    Each endpoint must run the same number of queries for a small and a
+    large course; a per-row query (N+1) makes the counts diverge and the
+    view's @query_budget raise.
+    """
+    date = datetime.date(2026, 1, 5)
+
+    def setUp(self):
+        self.teacher = User.objects.create(username="teacher", role="teacher")
+        self.course = Course.objects.create(code="C1", name="Course", teacher=self.teacher)
+        self.client.force_authenticate(self.teacher)
+
+    def enroll(self, count):
+        start = User.objects.count()
+        students = User.objects.bulk_create(
+            [User(username=f"student-{start + i}", role="student") for i in range(count)]
+        )
+        self.course.students.add(*students)
+        Attendance.objects.bulk_create(
+            [Attendance(student=s, course=self.course, date=self.date, status="Present") for s in students]
+        )
+        return students
+
+    def count(self, method, url, data=None):
+        counter = QueryCounter()
+        with counter.active():
+            response = getattr(self.client, method)(url, data, format="json")
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertLess(response.status_code, 300, response.content if not response.streaming else "")
+        return len(counter)
+
+    def assertConstantQueries(self, method, url, data=None, as_student=False):
+        first = self.enroll(3)[0]
+        if as_student:
+            self.client.force_authenticate(first)
+        small = self.count(method, url, data)
+        self.enroll(30)
+        large = self.count(method, url, data)
+        self.assertEqual(small, large, f"{url} query count grew from {small} to {large}")
+
+    def test_teacher_course_list(self):
+        url = "/api/attendance/teacher/courses/"
+        self.enroll(3)
+        small = self.count("get", url)
+        for i in range(5):
+            course = Course.objects.create(code=f"X{i}", name="Extra", teacher=self.teacher)
+            course.students.add(*User.objects.filter(role="student"))
+        self.assertEqual(small, self.count("get", url))
+
+    def test_day_register(self):
+        self.assertConstantQueries(
+            "get", f"/api/attendance/teacher/mark/?course_id={self.course.id}&date={self.date}"
+        )
+
+    def test_attendance_trend(self):
+        self.assertConstantQueries("get", f"/api/attendance/teacher/attendance-trend/?course_id={self.course.id}")
+
+    def test_range_register(self):
+        self.assertConstantQueries(
+            "get",
+            f"/api/attendance/teacher/register/?course_id={self.course.id}&from={self.date}&to={self.date}",
+        )
+
+    def test_student_endpoints(self):
+        for url in (
+            "/api/attendance/student/courses/",
+            f"/api/attendance/student/my-attendance/?course_id={self.course.id}",
+            "/api/attendance/student/attendance-summary/",
+        ):
+            with self.subTest(url=url):
+                self.assertConstantQueries("get", url, as_student=True)
+
+    def test_roll_call(self):
+        small = self.enroll(3)
+        large = small + self.enroll(30)
+        url = "/api/attendance/teacher/mark/"
+        counts = [
+            self.count("post", url, {
+                "course_id": self.course.id,
+                "date": str(self.date + datetime.timedelta(days=1)),
+                "records": [{"student_id": s.id, "status": "Absent"} for s in students],
+            })
+            for students in (small, large)
+        ]
+        self.assertEqual(counts[0], counts[1])
+
+    def test_initialize_session(self):
+        url = "/api/attendance/teacher/mark/initialize/"
+        counts = []
+        for offset, size in enumerate((3, 30)):
+            self.enroll(size)
+            data = {"course_id": self.course.id, "date": str(self.date + datetime.timedelta(days=offset + 1))}
+            counts.append(self.count("post", url, data))
+        self.assertEqual(counts[0], counts[1])
+        roster = self.client.get(f"/api/attendance/teacher/mark/?course_id={self.course.id}&date={data['date']}").json()
+        self.assertEqual(len(roster), 33)
+        self.assertTrue(all(entry["status"] == "Absent" for entry in roster))
+
+    def test_max_queries_reports_statements(self):
+        with self.assertRaisesMessage(AssertionError, "ran 2 queries, budget is 1"):
+            with max_queries(1):
+                User.objects.count()
+                Course.objects.count()
+
+
+@override_settings(ATTENDANCE_STORAGE="bitmap")
+class BitmapAttendanceQueryBudgetTests(AttendanceQueryBudgetTests):
+
+    def enroll(self, count):
+        students = super().enroll(count)
+        with rollups.deferred():
+            rows_to_bitmaps(self.course.id)
+        return students
+
+
+class QueryBudgetTests(TestCase):
+
+    @staticmethod
+    @query_budget(1)
+    def create_courses():
+        teacher = User.objects.create(username="teacher", role="teacher")
+        Course.objects.create(code="C1", name="Course", teacher=teacher)
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_strict_budget_rolls_back_the_writes(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.create_courses()
+        self.assertFalse(User.objects.exists())
+
+    def test_budget_only_logs_by_default(self):
+        with self.assertLogs("sms_backend.query_budget", "WARNING"):
+            self.create_courses()
+        self.assertTrue(Course.objects.exists())
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_streamed_queries_count(self):
+        @query_budget(1)
+        def view():
+            return StreamingHttpResponse(str(User.objects.count()) for _ in range(2))
+
+        response = view()
+        with self.assertRaisesMessage(QueryBudgetExceeded, "ran 2 queries, budget is 1"):
+            b"".join(response.streaming_content)
+
+    def test_batches_of_a_bulk_insert_count_once(self):
+        with max_queries(1):
+            User.objects.bulk_create([User(username=f"u{i}") for i in range(250)], batch_size=100)
+        with self.assertRaises(QueryBudgetExceeded):
+            with max_queries(2):
+                for i in range(3):
+                    User.objects.create(username=f"single-{i}")
+
+
+class StorageTests(APITestCase):
+    """ The same behaviour from every storage backend (rows here, bitmaps below) """
+    date = datetime.date(2026, 1, 5)
+
+    def setUp(self):
+        self.backend = get_backend()
+        self.teacher = User.objects.create(username="teacher", role="teacher")
+        self.course = Course.objects.create(code="C1", name="Course", teacher=self.teacher)
+        self.students = User.objects.bulk_create(
+            [User(username=f"student-{i}", role="student") for i in range(3)]
+        )
+        self.course.students.add(*self.students)
+        self.a, self.b, self.c = (s.id for s in self.students)
+
+    def save(self, statuses, date=None):
+        return self.backend.save_day(self.course, date or self.date, statuses)
+
+    def test_save_day_outcomes(self):
+        self.assertEqual(self.save({self.a: "Present", self.b: "Absent"}), {self.a: "created", self.b: "created"})
+        self.assertEqual(
+            self.save({self.a: "Present", self.b: "Present", self.c: "Absent"}),
+            {self.a: "unchanged", self.b: "updated", self.c: "created"},
+        )
+
+    def test_day_roster_has_none_for_unmarked(self):
+        self.save({self.a: "Present", self.b: "Absent"})
+        roster = {entry["student"]["id"]: entry["status"] for entry in self.backend.day_roster(self.course.id, self.date)}
+        self.assertEqual(roster, {self.a: "Present", self.b: "Absent", self.c: None})
+
+    def test_roll_calls_for_disjoint_students_merge(self):
+        new_day = self.date + datetime.timedelta(days=1)
+        self.save({self.a: "Present"}, new_day)
+        self.save({self.b: "Absent"}, new_day)
+        roster = {entry["student"]["id"]: entry["status"] for entry in self.backend.day_roster(self.course.id, new_day)}
+        self.assertEqual(roster, {self.a: "Present", self.b: "Absent", self.c: None})
+
+    def test_counts(self):
+        self.save({self.a: "Present", self.b: "Absent"})
+        self.save({self.a: "Absent"}, self.date + datetime.timedelta(days=1))
+        self.assertCountEqual(self.backend.student_counts(self.course.id), [
+            {"student_id": self.a, "present_count": 1, "absent_count": 1},
+            {"student_id": self.b, "present_count": 0, "absent_count": 1},
+        ])
+        self.assertEqual(self.backend.student_counts(self.course.id, [self.b]), [
+            {"student_id": self.b, "present_count": 0, "absent_count": 1},
+        ])
+        self.assertCountEqual(self.backend.daily_counts(self.course.id, [self.date]), [
+            {"date": self.date, "present_count": 1, "absent_count": 1},
+        ])
+
+    def test_student_records(self):
+        later = self.date + datetime.timedelta(days=1)
+        self.save({self.a: "Absent"}, later)
+        self.save({self.a: "Present", self.b: "Absent"})
+        records = self.backend.student_records(self.students[0], self.course.id)
+        self.assertEqual([(r.date, r.status) for r in records], [(self.date, "Present"), (later, "Absent")])
+        self.assertEqual(list(self.backend.student_records(self.students[2], self.course.id)), [])
+
+    def test_my_attendance(self):
+        self.save({self.a: "Present"})
+        self.client.force_authenticate(self.students[0])
+        response = self.client.get(f"/api/attendance/student/my-attendance/?course_id={self.course.id}")
+        self.assertEqual(response.status_code, 200)
+        [day] = response.json()
+        self.assertEqual((day["course"], day["date"], day["status"]), (self.course.id, str(self.date), "Present"))
+        self.assertEqual("id" in day, self.backend.name == "rows")
+
+
+@override_settings(ATTENDANCE_STORAGE="bitmap")
+class BitmapStorageTests(StorageTests):
+
+    def test_save_day_locks_the_course(self):
+        self.save({self.a: "Present"})  # every slot exists from here on
+        with mock.patch.object(Course.objects, "select_for_update", wraps=Course.objects.select_for_update) as lock:
+            self.save({self.a: "Absent"}, self.date + datetime.timedelta(days=1))
+        lock.assert_called_once_with()
+
+
+class RollCallTests(APITestCase):
+    url = "/api/attendance/teacher/mark/"
+    date = datetime.date(2026, 1, 5)
+
+    def setUp(self):
+        self.teacher = User.objects.create(username="teacher", role="teacher")
+        self.course = Course.objects.create(code="C1", name="Course", teacher=self.teacher)
+        self.client.force_authenticate(self.teacher)
+
+    def enroll(self, count):
+        start = User.objects.count()
+        students = User.objects.bulk_create(
+            [User(username=f"student-{start + i}", role="student") for i in range(count)]
+        )
+        self.course.students.add(*students)
+        return [s.id for s in students]
+
+    def roll_call(self, records, date=None):
+        response = self.client.post(
+            self.url, {"course_id": self.course.id, "date": str(date or self.date), "records": records}, format="json"
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()["results"]
+
+    def test_outcome_per_row(self):
+        a, b, c = self.enroll(3)
+        outsider = User.objects.create(username="outsider", role="student")
+        Attendance.objects.create(student_id=a, course=self.course, date=self.date, status="Present")
+        results = self.roll_call([
+            {"student_id": a, "status": "Present"},
+            {"student_id": b, "status": "Absent"},
+            {"student_id": c, "status": "Late"},
+            {"student_id": outsider.id, "status": "Present"},
+            {"student_id": b, "status": "Present"},
+            {"status": "Present"},
+        ])
+        self.assertEqual(
+            [result["outcome"] for result in results],
+            ["unchanged", "created", "rejected", "rejected", "rejected", "rejected"],
+        )
+        self.assertEqual(results[4]["error"], "Duplicate of row 1.")
+        self.assertEqual(Attendance.objects.get(student_id=b).status, "Absent")
+        self.assertFalse(Attendance.objects.filter(student_id__in=[c, outsider.id]).exists())
+
+    def test_matches_the_per_row_path(self):
+        students = self.enroll(6)
+        Attendance.objects.create(student_id=students[0], course=self.course, date=self.date, status="Absent")
+        records = [{"student_id": s, "status": ("Present", "Absent")[i % 2]} for i, s in enumerate(students)]
+        self.roll_call(records)
+        bulk = sorted(Attendance.objects.filter(date=self.date).values_list("student_id", "status"))
+
+        # the update_or_create loop the upsert replaced
+        old_date = self.date - datetime.timedelta(days=1)
+        Attendance.objects.create(student_id=students[0], course=self.course, date=old_date, status="Absent")
+        for record in records:
+            Attendance.objects.update_or_create(
+                student_id=record["student_id"], course=self.course, date=old_date,
+                defaults={"status": record["status"]},
+            )
+        self.assertEqual(bulk, sorted(Attendance.objects.filter(date=old_date).values_list("student_id", "status")))
+
+    def test_only_the_teacher_or_staff_can_initialize(self):
+        url = "/api/attendance/teacher/mark/initialize/"
+        students = self.enroll(3)
+        data = {"course_id": self.course.id, "date": str(self.date)}
+        other_teacher = User.objects.create(username="other", role="teacher")
+        for user in (User.objects.get(id=students[0]), other_teacher):
+            with self.subTest(user=user.username):
+                self.client.force_authenticate(user)
+                self.assertEqual(self.client.post(url, data, format="json").status_code, 403)
+        self.assertFalse(Attendance.objects.exists())
+
+        self.client.force_authenticate(User.objects.create(username="admin", role="admin", is_staff=True))
+        self.assertEqual(self.client.post(url, data, format="json").json(), {"initialized": 3})
+
+    def test_query_count_does_not_grow_with_the_roll_call(self):
+        for day, size in enumerate((3, 30), start=1):
+            records = [{"student_id": s, "status": "Present"} for s in self.enroll(size)]
+            with self.subTest(size=size), self.assertNumQueries(16):
+                self.roll_call(records, self.date + datetime.timedelta(days=day))
+
+
+class RollupTests(APITestCase):
+    date = datetime.date(2026, 1, 5)
+
+    def setUp(self):
+        self.teacher = User.objects.create(username="teacher", role="teacher")
+        self.course = Course.objects.create(code="C1", name="Course", teacher=self.teacher)
+        self.students = User.objects.bulk_create(
+            [User(username=f"student-{i}", role="student") for i in range(2)]
+        )
+        self.course.students.add(*self.students)
+        self.client.force_authenticate(self.teacher)
+        for day, statuses in enumerate((("Present", "Absent"), ("Present", "Present"), ("Absent", "Present"))):
+            self.client.post("/api/attendance/teacher/mark/", {
+                "course_id": self.course.id,
+                "date": str(self.date + datetime.timedelta(days=day)),
+                "records": [{"student_id": s.id, "status": status} for s, status in zip(self.students, statuses)],
+            }, format="json")
+
+    def test_summaries_follow_roll_calls(self):
+        counts = dict(
+            (student_id, (present, absent)) for student_id, present, absent in
+            AttendanceSummary.objects.values_list("student_id", "present_count", "absent_count")
+        )
+        self.assertEqual(counts, {self.students[0].id: (2, 1), self.students[1].id: (2, 1)})
+
+        self.client.force_authenticate(self.students[0])
+        [summary] = self.client.get("/api/attendance/student/attendance-summary/").json()["results"]
+        self.assertEqual((summary["course_code"], summary["total"]), ("C1", 3))
+        self.assertAlmostEqual(summary["percentage"], 66.67, places=2)
+
+    def test_summaries_are_listed_by_course_code(self):
+        for code in ("B2", "A1"):
+            course = Course.objects.create(code=code, name=code, teacher=self.teacher)
+            AttendanceSummary.objects.create(student=self.students[0], course=course, present_count=1)
+        self.client.force_authenticate(self.students[0])
+        url = "/api/attendance/student/attendance-summary/?page_size=2"
+        first = self.client.get(url).json()
+        second = self.client.get(first["next"]).json()
+        codes = [s["course_code"] for s in first["results"] + second["results"]]
+        self.assertEqual(codes, ["A1", "B2", "C1"])
+
+    def test_rebuild_matches_the_refreshed_rollups(self):
+        refreshed = sorted(AttendanceSummary.objects.values_list("student_id", "present_count", "absent_count"))
+        AttendanceSummary.objects.all().delete()
+        rollups.rebuild()
+        self.assertEqual(
+            sorted(AttendanceSummary.objects.values_list("student_id", "present_count", "absent_count")), refreshed
+        )
+
+    def test_trend(self):
+        url = f"/api/attendance/teacher/attendance-trend/?course_id={self.course.id}"
+        days = self.client.get(f"{url}&from={self.date + datetime.timedelta(days=1)}").json()["results"]
+        self.assertEqual(
+            [(day["date"], day["present_count"], day["absent_count"]) for day in days],
+            [("2026-01-06", 2, 0), ("2026-01-07", 1, 1)],
+        )
+
+    def test_trend_rejects_an_invalid_date(self):
+        url = f"/api/attendance/teacher/attendance-trend/?course_id={self.course.id}&from=2025-13-45"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.json())
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class RegisterTests(APITestCase):
+    url = "/api/attendance/teacher/register/"
+    date = datetime.date(2026, 1, 5)
+
+    def setUp(self):
+        self.teacher = User.objects.create(username="teacher", role="teacher")
+        self.client.force_authenticate(self.teacher)
+        self.students = User.objects.bulk_create(
+            [User(username=f"student-{i}", role="student") for i in range(3)]
+        )
+        self.courses = [
+            Course.objects.create(code=f"C{i}", name="Course", teacher=self.teacher) for i in range(2)
+        ]
+        backend = get_backend()
+        for course in self.courses:
+            course.students.add(*self.students)
+            backend.save_day(course, self.date, {s.id: "Present" for s in self.students[:2]})
+            backend.save_day(course, self.date + datetime.timedelta(days=2), {self.students[0].id: "Absent"})
+
+    def register(self, **params):
+        query = "&".join(f"{name}={value}" for name, value in {
+            "course_id": ",".join(str(c.id) for c in self.courses),
+            "from": self.date, "to": self.date + datetime.timedelta(days=6), **params,
+        }.items())
+        response = self.client.get(f"{self.url}?{query}")
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_json(self):
+        register = json.loads(self.register())
+        self.assertEqual(register["dates"], ["2026-01-05", "2026-01-07"])
+        self.assertEqual(
+            [(row["course"], row["student"], row["statuses"]) for row in register["rows"]],
+            [
+                (course.code, student.username, statuses)
+                for course in self.courses
+                for student, statuses in zip(self.students, (["Present", "Absent"], ["Present", None]))
+            ],
+        )
+
+    def test_csv_for_some_students(self):
+        lines = self.register(output="csv", student_id=self.students[1].id).splitlines()
+        self.assertEqual(lines, [
+            "course,student_id,student,2026-01-05,2026-01-07",
+            f"C0,{self.students[1].id},student-1,Present,",
+            f"C1,{self.students[1].id},student-1,Present,",
+        ])
+
+    def test_rejects_bad_parameters(self):
+        for query in ("course_id=x&from=2026-01-01&to=2026-01-02", "course_id=1&from=2026-02-01&to=2026-01-01",
+                      "course_id=1&from=2026-01-01&to=2026-01-02&output=pdf", "from=2026-01-01&to=2026-01-02"):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f"{self.url}?{query}").status_code, 400)
+
+
+@override_settings(ATTENDANCE_STORAGE="bitmap")
+class BitmapRegisterTests(RegisterTests):
+    pass
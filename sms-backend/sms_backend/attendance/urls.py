@@ -2,15 +2,23 @@ from django.urls import path
 from .views import (
     TeacherCourseList,
     AttendanceMarking,
+    AttendanceSessionInitialize,
     StudentEnrolledCoursesView,
-    StudentAttendanceView
+    StudentAttendanceView,
+    StudentAttendanceSummaryView,
+    CourseAttendanceTrend,
+    AttendanceRegister,
 )
 
 urlpatterns = [
     # Teacher URLs
     path('teacher/courses/', TeacherCourseList.as_view(), name='teacher-course-list'),
     path('teacher/mark/', AttendanceMarking.as_view(), name='teacher-attendance'),
+    path('teacher/mark/initialize/', AttendanceSessionInitialize.as_view(), name='teacher-attendance-initialize'),
+    path('teacher/register/', AttendanceRegister.as_view(), name='teacher-attendance-register'),
+    path('teacher/attendance-trend/', CourseAttendanceTrend.as_view(), name='teacher-attendance-trend'),
     path('student/courses/', StudentEnrolledCoursesView.as_view(), name='student-enrolled-courses'),
     path('student/my-attendance/', StudentAttendanceView.as_view(), name='student-my-attendance'),
+    path('student/attendance-summary/', StudentAttendanceSummaryView.as_view(), name='student-attendance-summary'),
 ]
 
@@ -1,27 +1,38 @@
 from rest_framework import generics, status
 from rest_framework.views import APIView
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import Attendance
+from .models import Attendance, AttendanceSummary, CourseDailyAttendance
 from .serializers import (
     AttendanceSerializer, 
+    AttendanceDaySerializer,
     CourseStudentSerializer, 
     StudentAttendanceSerializer,
     StudentCourseSerializer,
-    CreateAttendanceSerializer # Import the new serializer
+    CreateAttendanceSerializer, # Import the new serializer
+    InitializeAttendanceSerializer,
+    AttendanceSummarySerializer,
+    CourseDailyAttendanceSerializer,
 )
+from .services.register import CHUNK_SIZE, RENDERERS, register_lines
+from .services.storage import get_backend
 from courses.models import Course
+from sms_backend.query_budget import query_budget
+from django.db.models import F
+from django.http import StreamingHttpResponse
 from django.utils.dateparse import parse_date
 
 # --- TEACHER VIEWS ---
 
+@query_budget(4)
 class TeacherCourseList(generics.ListAPIView):
    
     serializer_class = CourseStudentSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Course.objects.filter(teacher=self.request.user)
+        return Course.objects.filter(teacher=self.request.user).prefetch_related('students')
 
 class AttendanceMarking(APIView):
     """
@@ -30,6 +41,7 @@ class AttendanceMarking(APIView):
     """
     permission_classes = [IsAuthenticated]
 
+    @query_budget(2)
     def get(self, request, *args, **kwargs):
         course_id = request.query_params.get('course_id')
         date_str = request.query_params.get('date') 
@@ -41,22 +53,129 @@ class AttendanceMarking(APIView):
         if not date:
             return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Use the correct serializer to show student info
-        records = Attendance.objects.filter(course_id=course_id, date=date)
+        # the whole roster, with a null status for students not marked yet
+        records = get_backend().day_roster(course_id, date)
         serializer = StudentAttendanceSerializer(records, many=True)
         return Response(serializer.data)
 
+    # fixed per roll call; a bulk upsert split into batches counts once
+    @query_budget(30)
     def post(self, request, *args, **kwargs):
         # Use the CreateAttendanceSerializer to validate and save data
         serializer = CreateAttendanceSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save() # This calls the .create() method in the serializer
-            return Response({"message": "Attendance saved successfully"}, status=status.HTTP_201_CREATED)
+            saved = serializer.save() # This calls the .create() method in the serializer
+            return Response({
+                "message": "Attendance saved successfully",
+                "results": saved['results'],
+            }, status=status.HTTP_201_CREATED)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class AttendanceSessionInitialize(APIView):
+    """
+    API view for a teacher to open a roll call: every enrolled student
+    without a status on the date gets the default one ("status" in the
+    body, Absent if omitted), so only changes need to be sent afterwards.
+    Other users get a 403 unless they are staff.
+    """
+    permission_classes = [IsAuthenticated]
+
+    # same shape as a roll call, plus roster slots in bitmap mode
+    @query_budget(30)
+    def post(self, request, *args, **kwargs):
+        serializer = InitializeAttendanceSerializer(data=request.data, context={'request': request})
+        if serializer.is_valid():
+            saved = serializer.save()
+            return Response(saved, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+@query_budget(3)
+class CourseAttendanceTrend(generics.ListAPIView):
+    """
+    API view for a teacher to see a course's daily headcounts,
+    optionally between ?from= and ?to= dates (YYYY-MM-DD).
+    """
+    serializer_class = CourseDailyAttendanceSerializer
+    permission_classes = [IsAuthenticated]
+    ordering = 'date'  # unique within one course
+
+    def get_queryset(self):
+        params = self.request.query_params
+        if not params.get('course_id'):
+            return CourseDailyAttendance.objects.none()
+        try:
+            course_id = int(params['course_id'])
+            start = parse_date(params.get('from') or '')
+            end = parse_date(params.get('to') or '')
+        except ValueError:
+            raise ValidationError({"error": "Invalid id or date. Use integers and YYYY-MM-DD."})
+
+        days = CourseDailyAttendance.objects.filter(course_id=course_id)
+        if not self.request.user.is_staff:
+            days = days.filter(course__teacher=self.request.user)
+        if start:
+            days = days.filter(date__gte=start)
+        if end:
+            days = days.filter(date__lte=end)
+        return days.order_by('date')
+
+def _id_list(params, name):
+    """ Ids from repeated (?x=1&x=2) or comma separated (?x=1,2) params """
+    ids = []
+    for value in params.getlist(name):
+        ids.extend(part for part in value.split(',') if part.strip())
+    return [int(i) for i in ids]
+
+# counted until the streamed body ends: the courses, the dates and one
+# ordered read of the rows (two with bitmap storage)
+@query_budget(4)
+class AttendanceRegister(APIView):
+    """
+    API view for a teacher to download a register: one line per student
+    per course with a status for every date between ?from= and ?to=.
+    Filter with ?course_id= and optionally ?student_id= (repeatable or
+    comma separated). ?output=csv|json, json by default. The response is
+    streamed while the rows are read.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        try:
+            course_ids = _id_list(params, 'course_id')
+            student_ids = _id_list(params, 'student_id')
+            start = parse_date(params.get('from') or '')
+            end = parse_date(params.get('to') or '')
+        except ValueError:
+            return Response({"error": "Invalid id or date. Use integers and YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+        if not course_ids or not start or not end:
+            return Response({"error": "course_id, from and to are required"}, status=status.HTTP_400_BAD_REQUEST)
+        if start > end:
+            return Response({"error": "from must not be after to"}, status=status.HTTP_400_BAD_REQUEST)
+        output = params.get('output', 'json')
+        if output not in RENDERERS:
+            return Response({"error": f"output must be one of {', '.join(sorted(RENDERERS))}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        courses = Course.objects.filter(id__in=course_ids)
+        if not request.user.is_staff:
+            courses = courses.filter(teacher=request.user)
+        course_codes = dict(courses.values_list('id', 'code'))
+
+        backend = get_backend()
+        dates = backend.register_dates(course_codes, start, end)
+        rows = backend.register_rows(course_codes, start, end, student_ids, chunk_size=CHUNK_SIZE)
+        render, content_type = RENDERERS[output]
+        response = StreamingHttpResponse(
+            render(register_lines(rows, dates), dates, course_codes), content_type=content_type
+        )
+        if output == 'csv':
+            response['Content-Disposition'] = f'attachment; filename="attendance-{start}-{end}.csv"'
+        return response
+
 # --- STUDENT VIEWS ---
 
+@query_budget(3)
 class StudentEnrolledCoursesView(generics.ListAPIView):
     """
     API view for a logged-in student to see a list of
@@ -68,6 +187,7 @@ class StudentEnrolledCoursesView(generics.ListAPIView):
     def get_queryset(self):
         return Course.objects.filter(students=self.request.user)
 
+@query_budget(3)
 class StudentAttendanceView(generics.ListAPIView):
     """
     API view for a logged-in student to see their
@@ -75,13 +195,33 @@ class StudentAttendanceView(generics.ListAPIView):
     """
     serializer_class = AttendanceSerializer # Use the simple serializer
     permission_classes = [IsAuthenticated]
+    # one course's days for one student; the bitmap backend returns a list
+    pagination_class = None
+
+    def get_serializer_class(self):
+        if get_backend().name == 'bitmap':
+            return AttendanceDaySerializer
+        return AttendanceSerializer
 
     def get_queryset(self):
         course_id = self.request.query_params.get('course_id')
         if not course_id:
             return Attendance.objects.none()
         
-        return Attendance.objects.filter(
-            student=self.request.user,
-            course_id=course_id
-        ).order_by('date')
\ No newline at end of file
+        return get_backend().student_records(self.request.user, course_id)
+
+@query_budget(3)
+class StudentAttendanceSummaryView(generics.ListAPIView):
+    """
+    API view for a logged-in student to see their
+    attendance percentage in each of their courses.
+    """
+    serializer_class = AttendanceSummarySerializer
+    permission_classes = [IsAuthenticated]
+    # by course code, which is unique; the keyset pages on the annotation
+    ordering = 'course_code_key'
+
+    def get_queryset(self):
+        return AttendanceSummary.objects.filter(
+            student=self.request.user
+        ).select_related('course').annotate(course_code_key=F('course__code'))
@@ -1,3 +1,36 @@
-from django.test import TestCase
+from django.test import override_settings
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from courses.models import Course
+from sms_backend.query_budget import QueryCounter
+from users.models import User
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class CourseQueryBudgetTests(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username="admin", role="admin")
+        self.client.force_authenticate(self.admin)
+
+    def add_courses(self, count):
+        start = Course.objects.count()
+        teachers = User.objects.bulk_create(
+            [User(username=f"teacher-{start + i}", role="teacher") for i in range(count)]
+        )
+        Course.objects.bulk_create(
+            [Course(code=f"C{start + i}", name=f"Course {start + i}", teacher=t) for i, t in enumerate(teachers)]
+        )
+
+    def count_list_queries(self):
+        counter = QueryCounter()
+        with counter.active():
+            response = self.client.get("/api/courses/")
+        self.assertEqual(response.status_code, 200)
+        return len(counter)
+
+    def test_course_list_is_constant(self):
+        self.add_courses(2)
+        small = self.count_list_queries()
+        self.add_courses(25)
+        self.assertEqual(small, self.count_list_queries())
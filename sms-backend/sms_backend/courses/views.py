@@ -3,9 +3,11 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
 from .models import Course
 from .serializers import CourseSerializer
+from sms_backend.query_budget import query_budget
 
+@query_budget(4)
 class CourseListCreateView(generics.ListCreateAPIView): # Change this line
-    queryset = Course.objects.all()
+    queryset = Course.objects.select_related('teacher')
     serializer_class = CourseSerializer
     permission_classes = [IsAuthenticated] 
 
@@ -18,7 +20,7 @@ class CourseListCreateView(generics.ListCreateAPIView): # Change this line
         serializer.save()
 
 class CourseRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Course.objects.all()
+    queryset = Course.objects.select_related('teacher')
     serializer_class = CourseSerializer
     permission_classes = [IsAuthenticated]
 
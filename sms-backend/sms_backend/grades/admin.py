@@ -6,7 +6,10 @@ from .models import (
     GradeScale,
     Enrollment,
     Mark,
-    ResultSummary
+    ResultSummary,
+    YearlyCGPA,
+    PendingRecompute,
+    GradeJob
 )
 
 @admin.register(AcademicYear)
@@ -52,6 +55,26 @@ class MarkAdmin(admin.ModelAdmin):
 
 @admin.register(ResultSummary)
 class ResultSummaryAdmin(admin.ModelAdmin):
-    list_display = ("enrollment", "exam", "total_obtained", "total_max", "percentage", "grade_letter", "class_rank")
+    list_display = ("enrollment", "exam", "total_obtained", "total_max", "percentage", "grade_letter", "class_rank", "school_rank", "percentile")
     list_filter = ("exam", "grade_letter")
     search_fields = ("enrollment__student__username",)
+
+
+
+@admin.register(YearlyCGPA)
+class YearlyCGPAAdmin(admin.ModelAdmin):
+    list_display = ("enrollment", "academic_year", "cgpa", "total_weight", "computed_at")
+    list_filter = ("academic_year",)
+    search_fields = ("enrollment__student__username",)
+
+
+@admin.register(PendingRecompute)
+class PendingRecomputeAdmin(admin.ModelAdmin):
+    list_display = ("enrollment", "exam", "queued_at")
+    list_filter = ("exam",)
+
+
+@admin.register(GradeJob)
+class GradeJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "exam", "status", "progress", "rows_affected", "created_at", "finished_at")
+    list_filter = ("kind", "status")
@@ -6,4 +6,5 @@ class GradesConfig(AppConfig):
     name = 'grades'
 
     def ready(self):
+        import grades.checks
         import grades.signals
@@ -0,0 +1,26 @@
+from django.core import checks
+
+from sms_backend.shared_cache import HINT, STATE_ALIAS, STATE_HINT, can_evict, is_process_local
+
+
+@checks.register(checks.Tags.caches)
+def check_result_cache_is_shared(app_configs, **kwargs):
+    errors = []
+    if is_process_local():
+        errors.append(checks.Warning(
+            "The default cache is local to each process, so web workers keep "
+            "serving leaderboards and student results from before a "
+            "recompute run by run_grade_jobs or process_recompute_queue.",
+            hint=HINT,
+            id="grades.W001",
+        ))
+    if can_evict(STATE_ALIAS):
+        errors.append(checks.Warning(
+            f"Result version stamps are kept in the '{STATE_ALIAS}' cache, whose "
+            "backend can drop entries (per-process memory, or culling and "
+            "eviction): a dropped stamp starts over, and payloads cached under "
+            "an older version can be served as current.",
+            hint=STATE_HINT,
+            id="grades.W002",
+        ))
+    return errors
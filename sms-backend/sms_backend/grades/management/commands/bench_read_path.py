@@ -0,0 +1,97 @@
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from courses.models import Course
+from grades.models import Mark, ResultSummary
+from grades.serializers import MarkSerializer, ResultSummarySerializer
+from grades.services.recompute_results import recompute_results_for_exam
+from grades.services.sample_data import seed_exam
+from sms_backend.values_reader import ValuesReader
+from students.models import studentProfile
+from students.serializers import StudentSerializer
+from users.models import User
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare ModelSerializer rendering with the values() fast path on the "
+        "mark, result and student lists. Everything runs in a transaction that "
+        "is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000, help="Marks to seed.")
+        parser.add_argument("--subjects", type=int, default=5)
+        parser.add_argument("--repeat", type=int, default=3,
+                            help="Runs per measurement; the median is reported.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._bench(options["rows"], options["subjects"], options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _bench(self, rows, subjects, repeat):
+        exam = seed_exam(max(rows // subjects, 1), subjects=subjects)
+        recompute_results_for_exam(exam)
+        self._seed_students(rows)
+
+        lists = [
+            ("marks", MarkSerializer, Mark.objects.filter(exam=exam).select_related(
+                "enrollment__student", "subject", "exam", "assessment_type")),
+            ("results", ResultSummarySerializer, ResultSummary.objects.filter(exam=exam).select_related(
+                "enrollment__student", "enrollment__classroom", "exam")),
+            ("students", StudentSerializer, studentProfile.objects.select_related("user", "course")),
+        ]
+        self.stdout.write(
+            f"{'list':>9} {'rows':>7} {'serializer/s':>13} {'values/s':>10} {'speedup':>8} {'same':>5}"
+        )
+        for label, serializer_class, queryset in lists:
+            queryset = queryset.order_by("id")
+            slow = lambda: serializer_class(list(queryset), many=True).data
+            fast = lambda: ValuesReader(serializer_class()).read(queryset)
+            same = [dict(row) for row in slow()] == fast()
+            count = queryset.count()
+            slow_time = self._median(repeat, slow)
+            fast_time = self._median(repeat, fast)
+            self.stdout.write(
+                f"{label:>9} {count:>7} {count / slow_time:>13,.0f} {count / fast_time:>10,.0f} "
+                f"{slow_time / fast_time:>7.1f}x {'yes' if same else 'NO':>5}"
+            )
+
+    def _seed_students(self, size):
+        tag = uuid.uuid4().hex[:6]
+        teacher = User.objects.create(username=f"{tag}-teacher", role="teacher")
+        course = Course.objects.create(code=tag, name=f"bench {tag}", teacher=teacher)
+        users = User.objects.bulk_create(
+            [User(username=f"{tag}-s{i}", email=f"{tag}-s{i}@example.com", role="student") for i in range(size)]
+        )
+        studentProfile.objects.bulk_create(
+            [
+                studentProfile(
+                    user=user, course=course, roll_number=f"{tag[:3]}{i:05d}", Student_Id=f"{tag}-{i}",
+                    department="Science", year=1, govt_Id=f"G{i}",
+                )
+                for i, user in enumerate(users)
+            ],
+            batch_size=1000,
+        )
+
+    @staticmethod
+    def _median(repeat, func):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from grades.models import Enrollment
+from grades.services.recompute_results import (
+    recompute_result_for_student_exam, recompute_results_for_exam
+)
+from grades.services.sample_data import seed_exam
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the per-enrollment recompute loop with the bulk exam recompute "
+        "on synthetic data. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, nargs="+", default=[100, 1000, 3000])
+        parser.add_argument("--subjects", type=int, default=5)
+        parser.add_argument(
+            "--skip-legacy", action="store_true",
+            help="Only time the bulk engine (the legacy loop is slow on large sizes).",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'students':>9} {'engine':>8} {'queries':>8} {'seconds':>9}")
+        for size in options["students"]:
+            try:
+                with transaction.atomic():
+                    exam = seed_exam(size, subjects=options["subjects"])
+                    if not options["skip_legacy"]:
+                        self._run(size, "loop", lambda: self._legacy(exam))
+                    self._run(size, "bulk", lambda: recompute_results_for_exam(exam))
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _legacy(self, exam):
+        for enrollment in Enrollment.objects.filter(academic_year=exam.academic_year):
+            recompute_result_for_student_exam(enrollment, exam)
+
+    def _run(self, size, label, func):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+        self.stdout.write(f"{size:>9} {label:>8} {queries:>8} {elapsed:>9.3f}")
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from grades.services.recompute_queue import process_pending
+from sms_backend.shared_cache import require_shared_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Drain the PendingRecompute table filled when GRADES_RECOMPUTE_MODE is "
+        "'background'. Runs until stopped unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--interval", type=float, default=2.0,
+                            help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--once", action="store_true",
+                            help="Drain the queue once and exit.")
+
+    def handle(self, *args, **options):
+        require_shared_cache("process_recompute_queue")
+        while True:
+            processed = process_pending(limit=options["batch_size"])
+            if processed:
+                self.stdout.write(f"Recomputed {processed} pending results")
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
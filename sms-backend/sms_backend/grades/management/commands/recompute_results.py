@@ -0,0 +1,166 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from grades.models import Exam
+from grades.services.recompute_results import (
+    exam_classroom_ids, recompute_ranks_for_exam, recompute_results_for_exam
+)
+
+
+def _setup_worker():
+    # spawned workers start from a clean interpreter; forked ones are ready
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def _recompute_chunk(exam_id, classroom_id):
+    started = time.perf_counter()
+    exam = Exam.objects.get(id=exam_id)
+    rows = recompute_results_for_exam(exam, classroom_id=classroom_id)
+    connections.close_all()
+    return exam_id, classroom_id, rows, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute result summaries for whole years, exams or classrooms. "
+        "Work is split into (exam, classroom) chunks run across a process "
+        "pool; finished chunks and ranked exams are checkpointed so an "
+        "interrupted run can be resumed with --resume and the same scope."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, action="append", dest="years", default=[],
+                            help="Academic year id to recompute (repeatable).")
+        parser.add_argument("--exam", type=int, action="append", dest="exams", default=[],
+                            help="Exam id to recompute (repeatable).")
+        parser.add_argument("--classroom", type=int, action="append", dest="classrooms", default=[],
+                            help="Limit to this classroom id (repeatable).")
+        parser.add_argument("--workers", type=int,
+                            help="Worker processes; 1 runs everything in this process. "
+                                 "Defaults to the CPU count, or 1 on SQLite (one writer at a time).")
+        parser.add_argument("--checkpoint", default="recompute_results.checkpoint.json",
+                            help="File recording finished chunks.")
+        parser.add_argument("--resume", action="store_true",
+                            help="Skip chunks recorded in the checkpoint file.")
+        parser.add_argument("--skip-ranks", action="store_true",
+                            help="Do not recompute ranks once an exam is finished.")
+
+    def handle(self, *args, **options):
+        exams = Exam.objects.all()
+        if options["years"] or options["exams"]:
+            exams = exams.filter(id__in=options["exams"]) | exams.filter(academic_year_id__in=options["years"])
+        exams = list(exams.order_by("id"))
+        if not exams:
+            raise CommandError("No exams match the given --year/--exam scope.")
+
+        chunks = self._chunks(exams, options["classrooms"])
+        scope = {name: sorted(options[name]) for name in ("years", "exams", "classrooms")}
+        checkpoint = options["checkpoint"]
+        done, ranked = set(), set()
+        if options["resume"]:
+            done, ranked = self._load_checkpoint(checkpoint, scope)
+        pending = [chunk for chunk in chunks if self._key(*chunk) not in done]
+        self.stdout.write(
+            f"{len(chunks)} chunks across {len(exams)} exams, {len(chunks) - len(pending)} already done"
+        )
+
+        remaining = {}
+        for exam_id, _ in chunks:
+            remaining.setdefault(exam_id, 0)
+        for exam_id, _ in pending:
+            remaining[exam_id] += 1
+
+        def rank(exam_id):
+            if options["skip_ranks"] or exam_id in ranked:
+                return
+            recompute_ranks_for_exam(Exam.objects.get(id=exam_id))
+            ranked.add(exam_id)
+            self._save_checkpoint(checkpoint, scope, done, ranked)
+
+        # exams finished by an interrupted run may have crashed before ranking
+        for exam_id, count in remaining.items():
+            if not count:
+                rank(exam_id)
+
+        workers = options["workers"]
+        if workers is None:
+            workers = 1 if connection.vendor == "sqlite" else os.cpu_count() or 1
+
+        total_rows = 0
+        started = time.perf_counter()
+        for exam_id, classroom_id, rows, seconds in self._run(pending, workers):
+            total_rows += rows
+            done.add(self._key(exam_id, classroom_id))
+            self._save_checkpoint(checkpoint, scope, done, ranked)
+            rate = rows / seconds if seconds else 0
+            self.stdout.write(
+                f"exam {exam_id} classroom {classroom_id}: {rows} rows in {seconds:.2f}s ({rate:.0f} rows/s)"
+            )
+            remaining[exam_id] -= 1
+            if not remaining[exam_id]:
+                rank(exam_id)
+
+        elapsed = time.perf_counter() - started
+        rate = total_rows / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed {total_rows} results in {elapsed:.2f}s ({rate:.0f} rows/s)"
+        ))
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+    def _chunks(self, exams, classroom_ids):
+        chunks = []
+        for exam in exams:
+            chunks.extend(
+                (exam.id, classroom_id)
+                for classroom_id in exam_classroom_ids(exam)
+                if not classroom_ids or classroom_id in classroom_ids
+            )
+        return chunks
+
+    def _run(self, chunks, workers):
+        if workers <= 1:
+            for chunk in chunks:
+                yield _recompute_chunk(*chunk)
+            return
+
+        # children must open their own connections, never reuse ours
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker) as pool:
+            futures = [pool.submit(_recompute_chunk, *chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                yield future.result()
+
+    @staticmethod
+    def _key(exam_id, classroom_id):
+        return f"{exam_id}:{classroom_id}"
+
+    @staticmethod
+    def _load_checkpoint(path, scope):
+        """``(done chunk keys, ranked exam ids)`` from a run over the same scope."""
+        try:
+            with open(path) as fh:
+                state = json.load(fh)
+        except FileNotFoundError:
+            return set(), set()
+        if state.get("scope") != scope:
+            raise CommandError(
+                f"{path} was written for --year/--exam/--classroom {state.get('scope')}, "
+                f"not {scope}; resume with the same arguments or delete the file."
+            )
+        return set(state["done"]), set(state["ranked"])
+
+    @staticmethod
+    def _save_checkpoint(path, scope, done, ranked):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump({"scope": scope, "done": sorted(done), "ranked": sorted(ranked)}, fh)
+        os.replace(tmp, path)
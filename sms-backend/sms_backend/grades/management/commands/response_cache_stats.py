@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from grades.services import response_cache
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss/304 counts of the grades master data response cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after printing.")
+
+    def handle(self, *args, **options):
+        stats = response_cache.stats()
+        served = sum(stats.values())
+        for name, value in stats.items():
+            self.stdout.write(f"{name:>12} {value:>10}")
+        if served:
+            without_query = stats["hits"] + stats["not_modified"]
+            self.stdout.write(f"{'hit ratio':>12} {without_query / served:>10.1%}")
+        if options["reset"]:
+            response_cache.reset_stats()
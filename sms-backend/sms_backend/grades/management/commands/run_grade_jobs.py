@@ -0,0 +1,50 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from django.core.management.base import BaseCommand
+
+from grades.services.jobs import claim_next, fail_stale_jobs, run_job
+from sms_backend.shared_cache import require_shared_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued grade jobs (recompute, recompute_ranks) from the GradeJob "
+        "table. Runs until stopped unless --once is given. Jobs left running "
+        "by a worker that died are marked failed after GRADE_JOB_TIMEOUT."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=2,
+                            help="Number of jobs run at the same time.")
+        parser.add_argument("--interval", type=float, default=2.0,
+                            help="Seconds to sleep when no job is queued.")
+        parser.add_argument("--once", action="store_true",
+                            help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        require_shared_cache("run_grade_jobs")
+        running = set()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            while True:
+                stale = fail_stale_jobs()
+                if stale:
+                    self.stdout.write(f"Marked {stale} stale running job(s) failed")
+                while len(running) < options["concurrency"]:
+                    job = claim_next()
+                    if job is None:
+                        break
+                    self.stdout.write(f"Started {job}")
+                    running.add(pool.submit(run_job, job))
+
+                if running:
+                    finished, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        job = future.result()
+                        self.stdout.write(
+                            f"Finished {job}: {job.rows_affected} rows in {job.duration:.2f}s"
+                        )
+                elif options["once"]:
+                    return
+                else:
+                    time.sleep(options["interval"])
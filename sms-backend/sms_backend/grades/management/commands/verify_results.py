@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from grades.models import Exam
+from grades.services.result_deltas import verify_and_repair
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare stored result summaries with a full aggregate over marks and "
+        "recompute the ones that drifted. Meant to run periodically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--exam", type=int, action="append", dest="exams",
+                            help="Only check this exam id (repeatable).")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Report drift without repairing it.")
+
+    def handle(self, *args, **options):
+        exam_ids = options["exams"] or Exam.objects.values_list("id", flat=True)
+        total = 0
+        for exam_id in exam_ids:
+            drifted = verify_and_repair([exam_id], repair=not options["dry_run"])
+            if drifted:
+                self.stdout.write(f"Exam {exam_id}: {len(drifted)} drifted summaries")
+            total += len(drifted)
+
+        action = "found" if options["dry_run"] else "repaired"
+        self.stdout.write(self.style.SUCCESS(f"{total} drifted summaries {action}"))
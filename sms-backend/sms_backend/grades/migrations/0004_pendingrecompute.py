@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0003_alter_enrollment_classroom_alter_mark_subject_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingRecompute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('queued_at', models.DateTimeField(auto_now_add=True)),
+                ('enrollment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_recomputes', to='grades.enrollment')),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_recomputes', to='grades.exam')),
+            ],
+            options={
+                'ordering': ['queued_at'],
+                'unique_together': {('enrollment', 'exam')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0004_pendingrecompute'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultsummary',
+            name='percentile',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resultsummary',
+            name='school_rank',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
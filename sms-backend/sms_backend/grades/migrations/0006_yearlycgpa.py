@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0005_resultsummary_school_rank_percentile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='YearlyCGPA',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cgpa', models.FloatField(default=0)),
+                ('total_weight', models.FloatField(default=0)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cgpa_records', to='grades.academicyear')),
+                ('enrollment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='cgpa_record', to='grades.enrollment')),
+            ],
+            options={
+                'ordering': ['academic_year', '-cgpa'],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0007_gradejob'),
+        ('school', '0002_subject'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mark',
+            index=models.Index(fields=['exam', 'subject', 'enrollment'], name='grades_mark_exam_subject_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resultsummary',
+            index=models.Index(fields=['exam', '-percentage', 'enrollment'], name='grades_result_exam_pct_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.utils import timezone
 from courses.models import Course
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -133,10 +134,25 @@ class Mark(models.Model):
     class Meta:
         unique_together = ("enrollment", "subject", "exam", "assessment_type")
         ordering = ["exam", "subject"]
+        indexes = [
+            models.Index(fields=["exam", "subject", "enrollment"], name="grades_mark_exam_subject_idx"),
+            # one student's marks in one exam (result recompute, report cards)
+            models.Index(fields=["enrollment", "exam"], name="grades_mark_enroll_exam_idx"),
+        ]
 
     def __str__(self):
         return f"{self.enrollment.student.username} - {self.subject.name} ({self.exam.name})"
 
+    def save(self, *args, **kwargs):
+        # pre_save locks the stored row so result totals are shifted by the
+        # change against it (see result_deltas); the lock needs a transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
     def clean(self):
         if self.marks_obtained > self.max_marks:
             raise ValidationError("Marks obtained cannot exceed maximum marks.")
@@ -165,12 +181,113 @@ class ResultSummary(models.Model):
     grade_letter = models.CharField(max_length=5, blank=True, null=True)
     gpa_points = models.FloatField(default=0)
     class_rank = models.PositiveIntegerField(blank=True, null=True)
+    school_rank = models.PositiveIntegerField(blank=True, null=True)
+    percentile = models.FloatField(blank=True, null=True)
 
     computed_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("enrollment", "exam")
         ordering = ["exam", "enrollment__roll_no"]
+        indexes = [
+            # leaderboards: range scan of one exam in percentage order
+            models.Index(fields=["exam", "-percentage", "enrollment"], name="grades_result_exam_pct_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.enrollment.student.username} - {self.exam.name} ({self.grade_letter or '-'})"
+
+
+# Materialized yearly CGPA, refreshed whenever results are recomputed
+class YearlyCGPA(models.Model):
+    enrollment = models.OneToOneField(
+        "grades.Enrollment",
+        on_delete=models.CASCADE,
+        related_name="cgpa_record"
+    )
+    academic_year = models.ForeignKey(
+        "grades.AcademicYear",
+        on_delete=models.CASCADE,
+        related_name="cgpa_records"
+    )
+    cgpa = models.FloatField(default=0)
+    total_weight = models.FloatField(default=0)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["academic_year", "-cgpa"]
 
     def __str__(self):
-        return f"{self.enrollment.student.username} - {self.exam.name} ({self.grade_letter or '-'})"
\ No newline at end of file
+        return f"{self.enrollment_id} - {self.cgpa}"
+
+
+# Pending recompute queue (background mode)
+class PendingRecompute(models.Model):
+    enrollment = models.ForeignKey(
+        "grades.Enrollment",
+        on_delete=models.CASCADE,
+        related_name="pending_recomputes"
+    )
+    exam = models.ForeignKey(
+        "grades.Exam",
+        on_delete=models.CASCADE,
+        related_name="pending_recomputes"
+    )
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("enrollment", "exam")
+        ordering = ["queued_at"]
+
+    def __str__(self):
+        return f"{self.enrollment_id} - {self.exam_id} (queued {self.queued_at})"
+
+
+# Background jobs for long-running grade operations
+class GradeJob(models.Model):
+    KIND_CHOICES = [
+        ("recompute", "Recompute results"),
+        ("recompute_ranks", "Recompute ranks"),
+    ]
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    exam = models.ForeignKey(
+        "grades.Exam",
+        on_delete=models.CASCADE,
+        related_name="jobs"
+    )
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    progress = models.FloatField(default=0)  # 0..1
+    rows_affected = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="grade_jobs"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.id} ({self.status})"
+
+    @property
+    def duration(self):
+        if not self.started_at:
+            return None
+        return ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from .models import (
     AcademicYear, Exam, AssessmentType, GradeScale,
-    Enrollment, Mark, ResultSummary
+    Enrollment, Mark, ResultSummary, GradeJob
 )
 
 # --- Master Serializers ---
@@ -77,5 +77,34 @@ class ResultSummarySerializer(serializers.ModelSerializer):
         fields = [
             "id", "enrollment", "student_name", "classroom_name", "exam", "exam_name",
             "total_obtained", "total_max", "percentage", "grade_letter",
-            "gpa_points", "class_rank", "computed_at"
+            "gpa_points", "class_rank", "school_rank", "percentile", "computed_at"
+        ]
+
+
+class BulkMarkRowSerializer(serializers.Serializer):
+    """One row of a bulk mark upload; ids are checked against the DB in bulk."""
+    enrollment = serializers.IntegerField()
+    subject = serializers.IntegerField()
+    exam = serializers.IntegerField()
+    assessment_type = serializers.IntegerField(required=False, allow_null=True, default=None)
+    max_marks = serializers.FloatField(min_value=0)
+    marks_obtained = serializers.FloatField(min_value=0)
+    remarks = serializers.CharField(max_length=255, required=False, allow_blank=True, allow_null=True, default=None)
+
+    def validate(self, data):
+        if data["marks_obtained"] > data["max_marks"]:
+            raise serializers.ValidationError("Marks obtained cannot exceed maximum marks.")
+        return data
+
+
+class GradeJobSerializer(serializers.ModelSerializer):
+    exam_name = serializers.CharField(source="exam.name", read_only=True)
+    duration = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = GradeJob
+        fields = [
+            "id", "kind", "exam", "exam_name", "params", "status", "progress",
+            "rows_affected", "error", "created_by", "created_at", "started_at",
+            "finished_at", "duration"
         ]
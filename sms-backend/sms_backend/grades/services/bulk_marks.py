@@ -0,0 +1,104 @@
+from django.db import transaction
+from django.utils import timezone
+
+from grades.models import AssessmentType, Enrollment, Exam, Mark
+from grades.services import recompute_queue
+from school.models import Subject
+
+UPDATE_FIELDS = ["max_marks", "marks_obtained", "remarks", "updated_at"]
+
+
+def _existing_ids(model, ids):
+    ids = {i for i in ids if i is not None}
+    if not ids:
+        return set()
+    return set(model.objects.filter(id__in=ids).values_list("id", flat=True))
+
+
+def find_row_errors(rows):
+    """
+    Check validated mark rows against the database with one query per
+    referenced table. Returns ``{row_index: {field: [message]}}``.
+    """
+    known = {
+        "enrollment": _existing_ids(Enrollment, (r["enrollment"] for r in rows)),
+        "subject": _existing_ids(Subject, (r["subject"] for r in rows)),
+        "exam": _existing_ids(Exam, (r["exam"] for r in rows)),
+        "assessment_type": _existing_ids(AssessmentType, (r["assessment_type"] for r in rows)),
+    }
+
+    errors = {}
+    seen = {}
+    for index, row in enumerate(rows):
+        row_errors = {}
+        for field, ids in known.items():
+            if row[field] is not None and row[field] not in ids:
+                row_errors[field] = [f"Invalid pk \"{row[field]}\" - object does not exist."]
+
+        key = (row["enrollment"], row["subject"], row["exam"], row["assessment_type"])
+        if key in seen:
+            row_errors["non_field_errors"] = [f"Duplicate of row {seen[key]}."]
+        else:
+            seen[key] = index
+
+        if row_errors:
+            errors[index] = row_errors
+    return errors
+
+
+def upsert_marks(rows, created_by=None):
+    """
+    Insert or update marks in one transaction, keyed on the Mark
+    unique_together fields, then queue one recompute per affected
+    (enrollment, exam) pair. Rows must already be validated.
+    Returns the set of affected pairs.
+    """
+    now = timezone.now()
+    keyed, unkeyed = [], []
+    for row in rows:
+        mark = Mark(
+            enrollment_id=row["enrollment"],
+            subject_id=row["subject"],
+            exam_id=row["exam"],
+            assessment_type_id=row["assessment_type"],
+            max_marks=row["max_marks"],
+            marks_obtained=row["marks_obtained"],
+            remarks=row["remarks"],
+            created_by=created_by,
+            updated_at=now,
+        )
+        (keyed if mark.assessment_type_id is not None else unkeyed).append(mark)
+
+    with transaction.atomic():
+        if keyed:
+            Mark.objects.bulk_create(
+                keyed,
+                update_conflicts=True,
+                unique_fields=["enrollment", "subject", "exam", "assessment_type"],
+                update_fields=UPDATE_FIELDS,
+            )
+
+        if unkeyed:
+            # NULL never conflicts in a unique index, so rows without an
+            # assessment type are matched to existing marks here and upserted
+            # on the primary key instead.
+            existing = {
+                (e, s, x): pk
+                for pk, e, s, x in Mark.objects.filter(
+                    assessment_type__isnull=True,
+                    exam_id__in={m.exam_id for m in unkeyed},
+                    enrollment_id__in={m.enrollment_id for m in unkeyed},
+                ).values_list("id", "enrollment_id", "subject_id", "exam_id")
+            }
+            for mark in unkeyed:
+                mark.pk = existing.get((mark.enrollment_id, mark.subject_id, mark.exam_id))
+            Mark.objects.bulk_create(
+                unkeyed,
+                update_conflicts=True,
+                unique_fields=["id"],
+                update_fields=UPDATE_FIELDS,
+            )
+
+        pairs = {(row["enrollment"], row["exam"]) for row in rows}
+        recompute_queue.enqueue_many(pairs)
+    return pairs
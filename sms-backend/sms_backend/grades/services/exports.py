@@ -0,0 +1,109 @@
+"""
+Exam exports: marks and result summaries as flat, denormalized sheets.
+
+Rows are read with ``values_list().iterator()`` in index order (marks by
+subject and enrollment, results in merit order), so neither the queryset
+nor the file is ever held in memory. CSV goes out chunk by chunk as rows
+are read; XLSX is written by xlsxwriter in constant-memory mode to a
+temporary file and streamed from there once the workbook is closed (a zip
+archive cannot be sent before its directory is written).
+"""
+import tempfile
+
+try:
+    import xlsxwriter
+except ImportError:  # optional: only needed for ?output=xlsx
+    xlsxwriter = None
+
+from grades.models import Mark, ResultSummary
+from sms_backend.streaming import line_writer
+
+CHUNK_SIZE = 2000
+LINES_PER_WRITE = 500
+
+MARK_COLUMNS = [
+    ("exam", "exam__name"),
+    ("classroom", "enrollment__classroom__name"),
+    ("roll_no", "enrollment__roll_no"),
+    ("admission_no", "enrollment__admission_no"),
+    ("student", "enrollment__student__username"),
+    ("subject", "subject__name"),
+    ("assessment", "assessment_type__name"),
+    ("marks_obtained", "marks_obtained"),
+    ("max_marks", "max_marks"),
+    ("remarks", "remarks"),
+]
+
+RESULT_COLUMNS = [
+    ("exam", "exam__name"),
+    ("classroom", "enrollment__classroom__name"),
+    ("roll_no", "enrollment__roll_no"),
+    ("admission_no", "enrollment__admission_no"),
+    ("student", "enrollment__student__username"),
+    ("total_obtained", "total_obtained"),
+    ("total_max", "total_max"),
+    ("percentage", "percentage"),
+    ("grade", "grade_letter"),
+    ("gpa_points", "gpa_points"),
+    ("class_rank", "class_rank"),
+    ("school_rank", "school_rank"),
+    ("percentile", "percentile"),
+]
+
+EXPORTS = {
+    # name: (model, columns, ordering served by the exam's index)
+    "marks": (Mark, MARK_COLUMNS, ("subject_id", "enrollment_id")),
+    "results": (ResultSummary, RESULT_COLUMNS, ("-percentage", "enrollment_id")),
+}
+
+
+def export_rows(name, exam_id, classroom_id=None, chunk_size=CHUNK_SIZE):
+    """Header and a lazy stream of row tuples for one exam."""
+    model, columns, ordering = EXPORTS[name]
+    queryset = model.objects.filter(exam_id=exam_id)
+    if classroom_id:
+        queryset = queryset.filter(enrollment__classroom_id=classroom_id)
+    rows = queryset.order_by(*ordering).values_list(*(lookup for _, lookup in columns))
+    return [header for header, _ in columns], rows.iterator(chunk_size=chunk_size)
+
+
+def stream_csv(header, rows, title):
+    writer = line_writer()
+    yield writer.writerow(header)
+    lines = []
+    for row in rows:
+        lines.append(writer.writerow(row))
+        if len(lines) == LINES_PER_WRITE:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+def write_xlsx(header, rows, title, target):
+    workbook = xlsxwriter.Workbook(target, {"constant_memory": True})
+    sheet = workbook.add_worksheet(title[:31])
+    bold = workbook.add_format({"bold": True})
+    sheet.write_row(0, 0, header, bold)
+    sheet.freeze_panes(1, 0)
+    for index, row in enumerate(rows, 1):
+        sheet.write_row(index, 0, row)
+    workbook.close()
+
+
+def stream_xlsx(header, rows, title, block_size=64 * 1024):
+    with tempfile.TemporaryFile() as target:
+        write_xlsx(header, rows, title, target)
+        target.seek(0)
+        while block := target.read(block_size):
+            yield block
+
+
+RENDERERS = {
+    "csv": (stream_csv, "text/csv"),
+    "xlsx": (stream_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def available_outputs():
+    return sorted(name for name in RENDERERS if name != "xlsx" or xlsxwriter is not None)
@@ -0,0 +1,86 @@
+"""
+In-process index of grade bands per academic year.
+
+Every recompute path maps a percentage to a ``GradeScale`` band. The bands
+of a year are loaded once, sorted by ``min_percentage`` and searched with
+bisect. The loaded indexes belong to one version of the ``GradeScale``
+stamp in the shared cache, which ``grades.signals`` bumps when a scale
+change commits; every process (web workers and grade job workers alike)
+drops its indexes on the next lookup after a bump.
+"""
+import bisect
+import threading
+
+from grades.models import GradeScale
+from grades.services.result_cache import bump_versions, get_version, model_version_name
+
+VERSION_NAME = model_version_name(GradeScale)
+
+_cache = {}
+_cache_version = None
+_lock = threading.Lock()
+
+
+class GradeBandIndex:
+    """Sorted grade bands of one academic year."""
+
+    def __init__(self, scales):
+        self.bands = sorted(scales, key=lambda scale: scale.min_percentage)
+        self._mins = [scale.min_percentage for scale in self.bands]
+
+    def lookup(self, percentage):
+        """
+        Return the band containing ``percentage``, or None.
+
+        Where bands share an edge or overlap, the band with the highest
+        ``min_percentage`` wins, so 90 lands in 90-100 rather than 80-90.
+        """
+        i = bisect.bisect_right(self._mins, percentage)
+        while i > 0:
+            i -= 1
+            band = self.bands[i]
+            if percentage <= band.max_percentage:
+                return band
+        return None
+
+
+def get_indexes(academic_year_ids):
+    """Return ``{academic_year_id: GradeBandIndex}``, loading misses in one query."""
+    global _cache_version
+    academic_year_ids = set(academic_year_ids)
+    version = get_version(VERSION_NAME)
+    with _lock:
+        if version != _cache_version:
+            _cache.clear()
+            _cache_version = version
+        found = {i: _cache[i] for i in academic_year_ids if i in _cache}
+    missing = academic_year_ids - found.keys()
+    if missing:
+        scales = {i: [] for i in missing}
+        for scale in GradeScale.objects.filter(academic_year_id__in=missing):
+            scales[scale.academic_year_id].append(scale)
+        loaded = {i: GradeBandIndex(year_scales) for i, year_scales in scales.items()}
+        with _lock:
+            if version == _cache_version:
+                _cache.update(loaded)
+        found.update(loaded)
+    return found
+
+
+def get_index(academic_year_id):
+    return get_indexes([academic_year_id])[academic_year_id]
+
+
+def lookup_grade(academic_year_id, percentage):
+    """Shortcut for one lookup; returns the matching ``GradeScale`` or None."""
+    return get_index(academic_year_id).lookup(percentage)
+
+
+def invalidate():
+    """
+    Drop this process's bands now, for reads later in the same transaction,
+    and every process's once the transaction commits.
+    """
+    with _lock:
+        _cache.clear()
+    bump_versions(VERSION_NAME)
@@ -0,0 +1,101 @@
+"""
+DB-backed job table for recompute operations.
+
+The ``recompute`` and ``recompute_ranks`` actions only insert a
+``GradeJob`` row and return. ``manage.py run_grade_jobs`` claims queued
+jobs and runs them, recording progress, rows affected and timing. A job
+still ``running`` after ``GRADE_JOB_TIMEOUT`` seconds lost its worker and
+is marked failed (``fail_stale_jobs``), so it shows up instead of
+waiting forever.
+"""
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from grades.models import GradeJob
+from grades.services.recompute_results import (
+    exam_classroom_ids, recompute_ranks_for_exam, recompute_results_for_exam
+)
+
+
+def enqueue_job(kind, exam, params=None, created_by=None):
+    return GradeJob.objects.create(kind=kind, exam=exam, params=params or {}, created_by=created_by)
+
+
+def claim_next():
+    """
+    Atomically move the oldest queued job to ``running`` and return it, or
+    None when the queue is empty. Safe to call from several workers.
+    """
+    while True:
+        job = GradeJob.objects.filter(status="queued").order_by("created_at", "id").first()
+        if job is None:
+            return None
+        claimed = GradeJob.objects.filter(id=job.id, status="queued").update(
+            status="running", started_at=timezone.now()
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+        # another worker took it first; try the next one
+
+
+def fail_stale_jobs():
+    """
+    Mark jobs running for longer than ``GRADE_JOB_TIMEOUT`` seconds as
+    failed. Returns how many were. A job that does finish afterwards still
+    records its outcome.
+    """
+    timeout = getattr(settings, "GRADE_JOB_TIMEOUT", 3600)
+    now = timezone.now()
+    return GradeJob.objects.filter(status="running", started_at__lt=now - timedelta(seconds=timeout)).update(
+        status="failed",
+        finished_at=now,
+        error=f"Still running after {timeout}s: its worker stopped. Queue the job again to retry.",
+    )
+
+
+def _set_progress(job, progress, rows_affected):
+    job.progress = progress
+    job.rows_affected = rows_affected
+    GradeJob.objects.filter(id=job.id).update(progress=progress, rows_affected=rows_affected)
+
+
+def _run_recompute(job):
+    classrooms = exam_classroom_ids(job.exam)
+    rows = 0
+    for done, classroom_id in enumerate(classrooms, start=1):
+        rows += recompute_results_for_exam(job.exam, classroom_id=classroom_id)
+        _set_progress(job, done / len(classrooms), rows)
+    return rows
+
+
+def _run_recompute_ranks(job):
+    return recompute_ranks_for_exam(job.exam, school_wide=job.params.get("school_wide", False))
+
+
+RUNNERS = {
+    "recompute": _run_recompute,
+    "recompute_ranks": _run_recompute_ranks,
+}
+
+
+def run_job(job):
+    """Run a claimed job and store its outcome. Never raises."""
+    try:
+        rows = RUNNERS[job.kind](job)
+    except Exception:
+        job.status = "failed"
+        job.error = traceback.format_exc()
+    else:
+        job.status = "succeeded"
+        job.progress = 1
+        job.rows_affected = rows
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "progress", "rows_affected", "error", "finished_at"])
+    # worker threads keep their own connections; release them between jobs
+    connections.close_all()
+    return job
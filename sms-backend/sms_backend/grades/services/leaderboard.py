@@ -0,0 +1,93 @@
+"""
+Top-N leaderboards for an exam: overall, per classroom and per subject.
+
+The overall list is an index range scan on ``(exam, -percentage)``; the
+per-classroom and per-subject lists use ``ROW_NUMBER()`` windows so the
+database returns only the top N of each partition. Results are cached
+until the exam's results are written again.
+"""
+from django.db.models import F, FloatField, Sum, Window
+from django.db.models.functions import Cast, NullIf, RowNumber
+
+from grades.models import Mark, ResultSummary
+from grades.services.result_cache import get_or_build
+
+STUDENT_FIELDS = {
+    "student": F("enrollment__student__username"),
+    "classroom": F("enrollment__classroom__name"),
+}
+
+
+def _overall(exam_id, n):
+    return list(
+        ResultSummary.objects.filter(exam_id=exam_id)
+        .order_by("-percentage", "enrollment_id")
+        .values("enrollment_id", "percentage", "grade_letter", "class_rank", **STUDENT_FIELDS)[:n]
+    )
+
+
+def _by_classroom(exam_id, n):
+    rows = (
+        ResultSummary.objects.filter(exam_id=exam_id)
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("enrollment__classroom_id"),
+                order_by=[F("percentage").desc(), F("enrollment_id").asc()],
+            )
+        )
+        .filter(position__lte=n)
+        .order_by("enrollment__classroom__name", "position")
+        .values(
+            "enrollment_id", "percentage", "grade_letter", "class_rank", "position",
+            classroom_id=F("enrollment__classroom_id"), **STUDENT_FIELDS,
+        )
+    )
+    return _group(rows, "classroom_id", "classroom")
+
+
+def _by_subject(exam_id, n):
+    rows = (
+        Mark.objects.filter(exam_id=exam_id)
+        .values("enrollment_id", "subject_id", subject_name=F("subject__name"), **STUDENT_FIELDS)
+        .annotate(obtained=Sum("marks_obtained"), maximum=Sum("max_marks"))
+        # null rather than a division error when every max_marks is 0
+        .annotate(percentage=Cast("obtained", FloatField()) * 100 / NullIf(F("maximum"), 0.0))
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("subject_id"),
+                order_by=[F("percentage").desc(nulls_last=True), F("enrollment_id").asc()],
+            )
+        )
+        .filter(position__lte=n)
+        .order_by("subject_name", "position")
+    )
+    return _group(rows, "subject_id", "subject_name")
+
+
+def _group(rows, id_field, name_field):
+    groups = {}
+    for row in rows:
+        group = groups.setdefault(
+            row[id_field], {id_field: row[id_field], name_field: row[name_field], "students": []}
+        )
+        group["students"].append(row)
+    return list(groups.values())
+
+
+def build_leaderboard(exam_id, n):
+    return {
+        "exam": exam_id,
+        "n": n,
+        "overall": _overall(exam_id, n),
+        "classrooms": _by_classroom(exam_id, n),
+        "subjects": _by_subject(exam_id, n),
+    }
+
+
+def get_leaderboard(exam_id, n):
+    """Cached leaderboard; rebuilt after the next recompute of the exam."""
+    return get_or_build(
+        f"leaderboard:{exam_id}:{n}", f"exam:{exam_id}", lambda: build_leaderboard(exam_id, n)
+    )
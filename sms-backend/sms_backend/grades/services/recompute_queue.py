@@ -0,0 +1,141 @@
+"""
+Coalescing recompute queue for result summaries.
+
+Mark writes only record the (enrollment, exam) pairs they dirty. The pairs
+are collected per thread and flushed once when the surrounding transaction
+commits, so forty mark saves for one student trigger a single recompute.
+
+``settings.GRADES_RECOMPUTE_MODE`` picks what the flush does:
+
+* ``"deferred"`` (default) recomputes the pairs on commit, in bulk per exam.
+* ``"background"`` writes them to the ``PendingRecompute`` table; run
+  ``manage.py process_recompute_queue`` to drain it.
+"""
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from grades.models import Enrollment, Exam, PendingRecompute
+from grades.services.recompute_results import recompute_results_for_exam, refresh_cgpa
+
+_local = threading.local()
+
+
+def get_mode():
+    return getattr(settings, "GRADES_RECOMPUTE_MODE", "deferred")
+
+
+class _Batch:
+    """Dirty pairs and CGPA enrollments collected within one transaction."""
+
+    def __init__(self):
+        self.pairs = set()
+        self.cgpa_enrollment_ids = set()
+
+    def __call__(self):
+        if getattr(_local, "batch", None) is self:
+            _local.batch = None
+        flush(self.pairs, self.cgpa_enrollment_ids)
+
+
+def _is_pending(batch):
+    # on_commit callbacks are dropped when a transaction rolls back; make
+    # sure the batch we hold is still registered before reusing it.
+    return any(func is batch for _, func, *_ in connection.run_on_commit)
+
+
+def enqueue(enrollment_id, exam_id):
+    """Mark one (enrollment, exam) pair dirty."""
+    enqueue_many([(enrollment_id, exam_id)])
+
+
+def enqueue_many(pairs):
+    """Mark several (enrollment, exam) pairs dirty in the current transaction."""
+    pairs = set(pairs)
+    if not connection.in_atomic_block:
+        # autocommit: nothing to coalesce with
+        flush(pairs)
+        return
+    _current_batch().pairs.update(pairs)
+
+
+def enqueue_cgpa(enrollment_id):
+    """
+    Refresh one enrollment's materialized CGPA on commit. Used when a
+    summary was patched in place rather than recomputed.
+    """
+    if not connection.in_atomic_block:
+        refresh_cgpa(enrollment_ids=[enrollment_id])
+        return
+    _current_batch().cgpa_enrollment_ids.add(enrollment_id)
+
+
+def _current_batch():
+    batch = getattr(_local, "batch", None)
+    if batch is None or not _is_pending(batch):
+        batch = _local.batch = _Batch()
+        transaction.on_commit(batch)
+    return batch
+
+
+def flush(pairs, cgpa_enrollment_ids=()):
+    """Process dirty pairs according to the configured mode."""
+    # recomputed pairs refresh their own CGPA
+    cgpa_enrollment_ids = set(cgpa_enrollment_ids) - {e for e, _ in pairs}
+    if cgpa_enrollment_ids:
+        refresh_cgpa(enrollment_ids=cgpa_enrollment_ids)
+    if not pairs:
+        return
+    if get_mode() == "background":
+        _store_pending(pairs)
+        return
+    recompute_pairs(pairs)
+
+
+def _store_pending(pairs):
+    # a cascade delete of an enrollment or exam dirties the pairs of its
+    # marks; by commit time those parents are gone and cannot be referenced
+    enrollment_ids = set(Enrollment.objects.filter(id__in={e for e, _ in pairs}).values_list("id", flat=True))
+    exam_ids = set(Exam.objects.filter(id__in={x for _, x in pairs}).values_list("id", flat=True))
+    PendingRecompute.objects.bulk_create(
+        [PendingRecompute(enrollment_id=e, exam_id=x) for e, x in pairs if e in enrollment_ids and x in exam_ids],
+        ignore_conflicts=True,
+    )
+
+
+def recompute_pairs(pairs):
+    """Recompute summaries for the given pairs, one bulk pass per exam."""
+    by_exam = defaultdict(set)
+    for enrollment_id, exam_id in pairs:
+        by_exam[exam_id].add(enrollment_id)
+
+    count = 0
+    for exam in Exam.objects.filter(id__in=by_exam):
+        count += recompute_results_for_exam(exam, enrollment_ids=by_exam[exam.id])
+    return count
+
+
+def process_pending(limit=500):
+    """
+    Drain up to ``limit`` queued pairs from ``PendingRecompute``.
+
+    Rows are claimed by deleting them before the recompute runs, so a mark
+    saved while we work re-queues its pair instead of being lost. On failure
+    the claimed pairs are put back. Returns the number of pairs processed.
+    """
+    with transaction.atomic():
+        claimed = list(
+            PendingRecompute.objects.order_by("queued_at")
+            .values_list("id", "enrollment_id", "exam_id")[:limit]
+        )
+        PendingRecompute.objects.filter(id__in=[row[0] for row in claimed]).delete()
+
+    pairs = {(enrollment_id, exam_id) for _, enrollment_id, exam_id in claimed}
+    try:
+        recompute_pairs(pairs)
+    except Exception:
+        _store_pending(pairs)
+        raise
+    return len(pairs)
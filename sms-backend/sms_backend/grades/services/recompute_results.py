@@ -1,5 +1,9 @@
-from django.db.models import Sum, F
-from grades.models import Mark, ResultSummary, GradeScale
+from django.db import connection, transaction
+from django.db.models import DecimalField, Sum, F, Value, Window
+from django.db.models.functions import Cast, Coalesce, NullIf, PercentRank, Rank, Round
+from grades.models import Enrollment, Mark, ResultSummary, YearlyCGPA
+from grades.services.grade_bands import get_indexes, lookup_grade
+from grades.services.result_cache import invalidate_exam_results, invalidate_student_results
 
 
 def recompute_result_for_student_exam(enrollment, exam):
@@ -9,6 +13,8 @@ def recompute_result_for_student_exam(enrollment, exam):
     marks = Mark.objects.filter(enrollment=enrollment, exam=exam)
     if not marks.exists():
         ResultSummary.objects.filter(enrollment=enrollment, exam=exam).delete()
+        invalidate_exam_results(exam.id)
+        refresh_cgpa(enrollment_ids=[enrollment.id])
         return None
 
     total_obtained = marks.aggregate(Sum("marks_obtained"))["marks_obtained__sum"] or 0
@@ -17,15 +23,7 @@ def recompute_result_for_student_exam(enrollment, exam):
     percentage = (total_obtained / total_max * 100) if total_max else 0
 
     # find grade scale
-    grade_scale = (
-        GradeScale.objects.filter(
-            academic_year=enrollment.academic_year,
-            min_percentage__lte=percentage,
-            max_percentage__gte=percentage,
-        )
-        .order_by("-min_percentage")
-        .first()
-    )
+    grade_scale = lookup_grade(enrollment.academic_year_id, percentage)
 
     grade_letter = grade_scale.letter if grade_scale else None
     gpa_points = grade_scale.gpa_points if grade_scale else 0
@@ -41,61 +39,225 @@ def recompute_result_for_student_exam(enrollment, exam):
             "gpa_points": gpa_points,
         },
     )
+    invalidate_exam_results(exam.id)
+    refresh_cgpa(enrollment_ids=[enrollment.id])
     return summary
 
 
-def recompute_ranks_for_exam(exam):
+def recompute_results_for_exam(exam, enrollment_ids=None, classroom_id=None):
+    """
+    Recalculate result summaries for every student of an exam in bulk.
+
+    Runs a fixed number of queries whatever the class size: one grouped
+    aggregate over marks, one upsert and one delete for students that no
+    longer have marks (grade bands come from the in-process index), plus
+    the CGPA refresh of the students involved. Pass ``enrollment_ids`` or
+    ``classroom_id`` to limit the recompute to a subset of students.
+    Returns the number of summaries written.
+    """
+    marks = Mark.objects.filter(exam=exam)
+    stale = ResultSummary.objects.filter(exam=exam)
+    if enrollment_ids is not None:
+        enrollment_ids = list(enrollment_ids)
+        marks = marks.filter(enrollment_id__in=enrollment_ids)
+        stale = stale.filter(enrollment_id__in=enrollment_ids)
+    if classroom_id is not None:
+        marks = marks.filter(enrollment__classroom_id=classroom_id)
+        stale = stale.filter(enrollment__classroom_id=classroom_id)
+
+    totals = list(
+        marks.order_by()
+        .values("enrollment_id", "enrollment__academic_year_id")
+        .annotate(total_obtained=Sum("marks_obtained"), total_max=Sum("max_marks"))
+    )
+
+    bands = get_indexes({row["enrollment__academic_year_id"] for row in totals})
+
+    summaries = []
+    for row in totals:
+        total_obtained = row["total_obtained"] or 0
+        total_max = row["total_max"] or 0
+        percentage = (total_obtained / total_max * 100) if total_max else 0
+
+        grade_scale = bands[row["enrollment__academic_year_id"]].lookup(percentage)
+        summaries.append(
+            ResultSummary(
+                enrollment_id=row["enrollment_id"],
+                exam=exam,
+                total_obtained=total_obtained,
+                total_max=total_max,
+                percentage=round(percentage, 2),
+                grade_letter=grade_scale.letter if grade_scale else None,
+                gpa_points=grade_scale.gpa_points if grade_scale else 0,
+            )
+        )
+
+    with transaction.atomic():
+        # students whose marks were all removed lose their summary
+        stale.exclude(enrollment_id__in=marks.values("enrollment_id")).delete()
+        if summaries:
+            ResultSummary.objects.bulk_create(
+                summaries,
+                update_conflicts=True,
+                unique_fields=["enrollment", "exam"],
+                update_fields=[
+                    "total_obtained", "total_max", "percentage",
+                    "grade_letter", "gpa_points", "computed_at",
+                ],
+            )
+        invalidate_exam_results(exam.id)
+        if enrollment_ids is None:
+            refresh_cgpa(academic_year_id=exam.academic_year_id, classroom_id=classroom_id)
+        else:
+            refresh_cgpa(enrollment_ids=enrollment_ids)
+    return len(summaries)
+
+
+def exam_classroom_ids(exam):
+    """Classrooms with students enrolled in the exam's academic year."""
+    return list(
+        Enrollment.objects.filter(academic_year_id=exam.academic_year_id)
+        .order_by("classroom_id")
+        .values_list("classroom_id", flat=True)
+        .distinct()
+    )
+
+
+def recompute_ranks_for_exam(exam, school_wide=False):
     """
     Rank students within their classroom for a given exam.
+
+    Ranks come from a ``RANK()`` window, so tied percentages share a rank
+    and the next one skips (1, 1, 3). ``percentile`` is the share of
+    classmates scoring strictly below the student. With ``school_wide`` the
+    rank across every classroom is stored in ``school_rank`` as well.
+    Only rows whose values changed are written. Returns that count.
+
+    The ranked rows are never read into Python: one ``UPDATE ... FROM``
+    joins the window query on id (SQLite 3.39+ or PostgreSQL), so only rows
+    that still exist are written.
     """
-    summaries = (
+    ranks = {
+        "class_rank": Window(
+            Rank(),
+            partition_by=F("enrollment__classroom_id"),
+            order_by=F("percentage").desc(),
+        ),
+        "percentile": Round(Cast(
+            Window(
+                PercentRank(),
+                partition_by=F("enrollment__classroom_id"),
+                order_by=F("percentage").asc(),
+            ) * 100,
+            DecimalField(max_digits=5, decimal_places=2),
+        ), 2),
+    }
+    if school_wide:
+        ranks["school_rank"] = Window(Rank(), order_by=F("percentage").desc())
+
+    ranked = (
         ResultSummary.objects.filter(exam=exam)
-        .select_related("enrollment__classroom")
-        .order_by("enrollment__classroom", "-percentage")
+        .order_by()
+        .annotate(**{f"new_{field}": rank for field, rank in ranks.items()})
+        .values("id", *(f"new_{field}" for field in ranks))
     )
+    ranked_sql, params = ranked.query.sql_with_params()
 
-    current_class = None
-    rank = 0
-    same_score_count = 0
-    last_percentage = None
-
-    for summary in summaries:
-        classroom = summary.enrollment.classroom
-        if classroom != current_class:
-            # new class, reset rank counter
-            current_class = classroom
-            rank = 1
-            same_score_count = 0
-            last_percentage = summary.percentage
-        else:
-            # same class, increase rank or tie
-            if summary.percentage == last_percentage:
-                same_score_count += 1
-            else:
-                rank += same_score_count + 1
-                same_score_count = 0
-                last_percentage = summary.percentage
+    qn = connection.ops.quote_name
+    table = qn(ResultSummary._meta.db_table)
+    assignments = ", ".join(f"{qn(field)} = ranked.{qn('new_' + field)}" for field in ranks)
+    # only rows whose rank moved, so a re-rank after a few mark edits stays small
+    moved = " OR ".join(f"{table}.{qn(field)} IS DISTINCT FROM ranked.{qn('new_' + field)}" for field in ranks)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET {assignments} FROM ({ranked_sql}) AS ranked "
+            f"WHERE {table}.{qn('id')} = ranked.{qn('id')} AND ({moved}) "
+            f"RETURNING {table}.{qn('enrollment_id')}",
+            params,
+        )
+        enrollment_ids = [enrollment_id for (enrollment_id,) in cursor.fetchall()]
+        if enrollment_ids:
+            invalidate_exam_results(exam.id)
+            invalidate_student_results(id__in=enrollment_ids)
+    return len(enrollment_ids)
 
-        summary.class_rank = rank
-        summary.save(update_fields=["class_rank"])
+
+def _exam_weight():
+    # an exam without a weightage counts as 100, like `weightage or 100`
+    return Coalesce(NullIf(F("exam__weightage"), Value(0.0)), Value(100.0))
 
 
 def compute_cgpa_for_enrollment(enrollment):
     """
     Compute the average GPA across all exams for one student (yearly CGPA).
     """
-    summaries = ResultSummary.objects.filter(enrollment=enrollment)
-    if not summaries.exists():
-        return 0
-
+    totals = ResultSummary.objects.filter(enrollment=enrollment).aggregate(
+        weighted_gpa=Sum(F("gpa_points") * _exam_weight()),
+        total_weight=Sum(_exam_weight()),
+    )
     # Weighted average using exam weightage if available
-    total_weight = 0
-    weighted_gpa = 0
+    total_weight = totals["total_weight"] or 0
+    cgpa = totals["weighted_gpa"] / total_weight if total_weight else 0
+    return round(cgpa, 2)
 
-    for s in summaries:
-        weight = s.exam.weightage or 100
-        total_weight += weight
-        weighted_gpa += s.gpa_points * weight
 
-    cgpa = weighted_gpa / total_weight if total_weight else 0
-    return round(cgpa, 2)
+def get_cgpa_for_enrollment(enrollment):
+    """Read the materialized CGPA, computing it when it was never stored."""
+    cgpa = YearlyCGPA.objects.filter(enrollment=enrollment).values_list("cgpa", flat=True).first()
+    if cgpa is None:
+        cgpa = compute_cgpa_for_enrollment(enrollment)
+    return cgpa
+
+
+def refresh_cgpa(academic_year_id=None, enrollment_ids=None, classroom_id=None):
+    """
+    Rebuild ``YearlyCGPA`` rows for a whole academic year, a classroom or
+    some enrollments with one weighted aggregate and one upsert. Returns
+    the number of rows written.
+    """
+    summaries = ResultSummary.objects.order_by()
+    stale = YearlyCGPA.objects.all()
+    if academic_year_id is not None:
+        summaries = summaries.filter(enrollment__academic_year_id=academic_year_id)
+        stale = stale.filter(academic_year_id=academic_year_id)
+    if enrollment_ids is not None:
+        enrollment_ids = list(enrollment_ids)
+        summaries = summaries.filter(enrollment_id__in=enrollment_ids)
+        stale = stale.filter(enrollment_id__in=enrollment_ids)
+    if classroom_id is not None:
+        summaries = summaries.filter(enrollment__classroom_id=classroom_id)
+        stale = stale.filter(enrollment__classroom_id=classroom_id)
+
+    rows = summaries.values("enrollment_id", "enrollment__academic_year_id").annotate(
+        weighted_gpa=Sum(F("gpa_points") * _exam_weight()),
+        total_weight=Sum(_exam_weight()),
+    )
+    records = [
+        YearlyCGPA(
+            enrollment_id=row["enrollment_id"],
+            academic_year_id=row["enrollment__academic_year_id"],
+            cgpa=round(row["weighted_gpa"] / row["total_weight"], 2) if row["total_weight"] else 0,
+            total_weight=row["total_weight"] or 0,
+        )
+        for row in rows
+    ]
+
+    with transaction.atomic():
+        stale.exclude(enrollment_id__in=summaries.values("enrollment_id")).delete()
+        if records:
+            YearlyCGPA.objects.bulk_create(
+                records,
+                update_conflicts=True,
+                unique_fields=["enrollment"],
+                update_fields=["academic_year", "cgpa", "total_weight", "computed_at"],
+            )
+        # every result write path ends here, so this also covers the summaries
+        enrollment_filter = {}
+        if academic_year_id is not None:
+            enrollment_filter["academic_year_id"] = academic_year_id
+        if enrollment_ids is not None:
+            enrollment_filter["id__in"] = enrollment_ids
+        if classroom_id is not None:
+            enrollment_filter["classroom_id"] = classroom_id
+        invalidate_student_results(**enrollment_filter)
+    return len(records)
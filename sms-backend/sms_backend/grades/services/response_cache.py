@@ -0,0 +1,95 @@
+"""
+Response cache for read-mostly grades master data (academic years, exams,
+assessment types, grade scales).
+
+Each cached viewset lists the models its output is built from. Saving or
+deleting any of them bumps that model's version (see grades/signals.py),
+and the versions are part of both the cache key and the ETag: a client
+whose If-None-Match still matches gets a 304 without a query, and a stale
+entry is never read again.
+
+Hits, misses and 304s are counted in the ``state`` cache, which never
+culls them, so the numbers add up across processes when the file-based
+backend is used.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from grades.services.result_cache import bump_versions, get_versions, model_version_name
+from sms_backend.shared_cache import state_cache
+
+RESPONSE_TIMEOUT = 24 * 60 * 60
+COUNTERS = ("hits", "misses", "not_modified")
+
+
+def invalidate_model(model):
+    bump_versions(model_version_name(model))
+
+
+def _counter_key(name):
+    return f"grades:response_cache:{name}"
+
+
+def count(name):
+    key = _counter_key(name)
+    try:
+        state_cache.incr(key)
+    except ValueError:
+        if not state_cache.add(key, 1, None):
+            state_cache.incr(key)
+
+
+def stats():
+    found = state_cache.get_many([_counter_key(name) for name in COUNTERS])
+    return {name: found.get(_counter_key(name), 0) for name in COUNTERS}
+
+
+def reset_stats():
+    state_cache.delete_many([_counter_key(name) for name in COUNTERS])
+
+
+class CachedResponseMixin:
+    """
+    Serve ``list`` and ``retrieve`` from the cache. Set ``cache_models`` to
+    every model the serialized output reads from.
+    """
+    cache_models = ()
+    cache_timeout = RESPONSE_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(super().retrieve, request, *args, **kwargs)
+
+    def _cached_response(self, build, request, *args, **kwargs):
+        versions = get_versions(*(model_version_name(model) for model in self.cache_models))
+        source = "|".join(
+            [type(self).__name__, request.accepted_renderer.format, request.build_absolute_uri()]
+            + [str(version) for version in versions]
+        )
+        digest = hashlib.sha1(source.encode()).hexdigest()
+        headers = {"ETag": f'"{digest}"', "Cache-Control": "private, no-cache"}
+
+        client_etags = parse_etags(request.headers.get("If-None-Match", ""))
+        if headers["ETag"] in client_etags or "*" in client_etags:
+            count("not_modified")
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        key = f"grades:response:{digest}"
+        data = cache.get(key)
+        if data is not None:
+            count("hits")
+            return Response(data, headers=headers)
+
+        count("misses")
+        response = build(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, self.cache_timeout)
+            for name, value in headers.items():
+                response[name] = value
+        return response
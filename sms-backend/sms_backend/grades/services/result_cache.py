@@ -0,0 +1,99 @@
+"""
+Version stamps for cached result data.
+
+Cached payloads embed the version of what they were built from in their
+cache key. Writers bump the version instead of hunting down keys, so stale
+entries are simply never read again and expire on their own. The stamps
+themselves live in the ``state`` cache, which never culls them: a dropped
+stamp starts over, and is no longer sure to be ahead of every payload
+cached under it.
+Payloads stay in the default cache, where a culled one is just rebuilt.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from grades.models import Enrollment
+from sms_backend.shared_cache import state_cache
+
+LEADERBOARD_TIMEOUT = 60 * 60
+STUDENT_RESULTS_TIMEOUT = 24 * 60 * 60
+
+
+def _version_key(name):
+    return f"grades:version:{name}"
+
+
+def get_version(name):
+    key = _version_key(name)
+    version = state_cache.get(key)
+    if version is None:
+        state_cache.add(key, time.time_ns(), None)
+        version = state_cache.get(key)
+    return version
+
+
+def get_versions(*names):
+    """Versions of several names with one cache round trip when all exist."""
+    keys = [_version_key(name) for name in names]
+    found = state_cache.get_many(keys)
+    return [found[key] if key in found else get_version(name) for name, key in zip(names, keys)]
+
+
+def _set_versions(names):
+    stamp = time.time_ns()
+    state_cache.set_many({_version_key(name): stamp for name in names}, None)
+
+
+def bump_versions(*names):
+    """Give each name a fresh version once the current transaction commits."""
+    transaction.on_commit(lambda: _set_versions(names))
+
+
+def model_version_name(model):
+    """Version bumped whenever any row of ``model`` is saved or deleted."""
+    return f"model:{model._meta.label_lower}"
+
+
+def invalidate_exam_results(exam_id):
+    """Called by every path that writes ResultSummary rows of an exam."""
+    bump_versions(f"exam:{exam_id}")
+
+
+def _student_version_name(student_id):
+    return f"student:{student_id}"
+
+
+def invalidate_students(*student_ids):
+    bump_versions(*(_student_version_name(student_id) for student_id in student_ids))
+
+
+def invalidate_student_results(**enrollment_filter):
+    """
+    Called by every path that writes ResultSummary or YearlyCGPA rows: the
+    students owning the enrollments matched by ``enrollment_filter`` get a
+    fresh version (one query) once the transaction commits.
+    """
+    def bump():
+        student_ids = (
+            Enrollment.objects.filter(**enrollment_filter)
+            .order_by().values_list("student_id", flat=True).distinct()
+        )
+        _set_versions([_student_version_name(student_id) for student_id in student_ids])
+
+    transaction.on_commit(bump)
+
+
+def get_student_payload(kind, student_id, build):
+    """A student's own results view, rebuilt only after their rows change."""
+    return get_or_build(f"{kind}:{student_id}", _student_version_name(student_id), build, STUDENT_RESULTS_TIMEOUT)
+
+
+def get_or_build(name, version_name, build, timeout=LEADERBOARD_TIMEOUT):
+    key = f"grades:{name}:{get_version(version_name)}"
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, timeout)
+    return value
@@ -0,0 +1,175 @@
+"""
+Incremental maintenance of ``ResultSummary`` totals.
+
+A single mark change moves its summary's totals by a known amount, so the
+summary is patched with one ``UPDATE`` built from ``F()`` expressions
+instead of re-summing every mark. The percentage, grade letter and GPA
+points are derived in the same statement; the grade is a ``CASE`` over the
+cached grade bands. When there is no summary to patch (first mark, last
+mark removed) the pair is handed to the recompute queue instead.
+
+The change is measured against the stored mark, locked before the save or
+delete (``lock_stored_values``), not against the values the instance was
+loaded with: another request may have edited the mark in between.
+
+``verify_and_repair`` compares summaries with a full aggregate and
+recomputes the ones that drifted.
+"""
+from django.conf import settings
+from django.db.models import Case, CharField, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Round
+from django.db.models.lookups import GreaterThanOrEqual, LessThanOrEqual
+from django.utils import timezone
+
+from grades.models import Enrollment, Mark, ResultSummary
+from grades.services import recompute_queue
+from grades.services.grade_bands import get_index
+from grades.services.result_cache import invalidate_exam_results
+
+# tolerance when comparing float totals in verify_and_repair
+EPSILON = 1e-6
+
+
+def is_enabled():
+    return getattr(settings, "GRADES_INCREMENTAL_RESULTS", True)
+
+
+def _academic_year_id(mark, enrollment_id):
+    if enrollment_id == mark.enrollment_id and Mark.enrollment.is_cached(mark):
+        return mark.enrollment.academic_year_id
+    return Enrollment.objects.filter(pk=enrollment_id).values_list("academic_year_id", flat=True).first()
+
+
+def lock_stored_values(mark):
+    """
+    Lock ``mark``'s row until the transaction ends and remember its stored
+    amounts as the ones the save or delete changes. Call inside a
+    transaction (``Mark.save``/``Mark.delete`` open one).
+    """
+    if mark.pk is None:
+        return
+    mark._loaded_values = (
+        Mark.objects.select_for_update()
+        .filter(pk=mark.pk)
+        .values("enrollment_id", "exam_id", "marks_obtained", "max_marks")
+        .first()
+    )
+
+
+def apply_delta(enrollment_id, exam_id, academic_year_id, obtained, maximum):
+    """
+    Shift one summary's totals by ``obtained``/``maximum`` in a single
+    UPDATE. Returns False when no summary was updated, either because it
+    does not exist or because its total would drop to zero.
+    """
+    total_obtained = F("total_obtained") + obtained
+    total_max = F("total_max") + maximum
+    percentage = total_obtained * 100.0 / total_max
+
+    # bands ordered by descending min so edges resolve like the index does
+    bands = sorted(get_index(academic_year_id).bands, key=lambda b: -b.min_percentage)
+
+    def in_band(band):
+        return Q(
+            GreaterThanOrEqual(percentage, band.min_percentage),
+            LessThanOrEqual(percentage, band.max_percentage),
+        )
+
+    # every right-hand side reads the pre-update columns, as in standard SQL
+    updated = ResultSummary.objects.filter(
+        enrollment_id=enrollment_id, exam_id=exam_id, total_max__gt=-maximum,
+    ).update(
+        total_obtained=total_obtained,
+        total_max=total_max,
+        computed_at=timezone.now(),
+        percentage=Round(percentage, 2),
+        grade_letter=Case(
+            *[When(in_band(b), then=Value(b.letter)) for b in bands],
+            default=None,
+            output_field=CharField(),
+        ),
+        gpa_points=Case(
+            *[When(in_band(b), then=Value(b.gpa_points)) for b in bands],
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    )
+    if updated:
+        invalidate_exam_results(exam_id)
+    return bool(updated)
+
+
+def _apply_or_enqueue(mark, key, obtained, maximum):
+    enrollment_id, exam_id = key
+    if obtained == 0 and maximum == 0:
+        return
+    academic_year_id = _academic_year_id(mark, enrollment_id)
+    if academic_year_id is None or not apply_delta(enrollment_id, exam_id, academic_year_id, obtained, maximum):
+        recompute_queue.enqueue(enrollment_id, exam_id)
+    else:
+        recompute_queue.enqueue_cgpa(enrollment_id)
+
+
+def mark_saved(mark, created):
+    """Adjust summaries after ``mark`` was inserted or updated."""
+    new_key = (mark.enrollment_id, mark.exam_id)
+    if created:
+        _apply_or_enqueue(mark, new_key, mark.marks_obtained, mark.max_marks)
+    else:
+        old = getattr(mark, "_loaded_values", None)
+        try:
+            old_key = (old["enrollment_id"], old["exam_id"])
+            old_obtained, old_max = old["marks_obtained"], old["max_marks"]
+        except (TypeError, KeyError):
+            # no stored row was locked to measure the change against
+            recompute_queue.enqueue(*new_key)
+        else:
+            if old_key == new_key:
+                _apply_or_enqueue(mark, new_key, mark.marks_obtained - old_obtained, mark.max_marks - old_max)
+            else:
+                _apply_or_enqueue(mark, old_key, -old_obtained, -old_max)
+                _apply_or_enqueue(mark, new_key, mark.marks_obtained, mark.max_marks)
+
+
+def mark_deleted(mark):
+    """Adjust the summary after ``mark`` was deleted."""
+    old = getattr(mark, "_loaded_values", None) or {}
+    obtained = old.get("marks_obtained", mark.marks_obtained)
+    maximum = old.get("max_marks", mark.max_marks)
+    _apply_or_enqueue(mark, (mark.enrollment_id, mark.exam_id), -obtained, -maximum)
+
+
+def verify_and_repair(exam_ids=None, repair=True):
+    """
+    Compare every summary with a full aggregate over its marks and
+    recompute the (enrollment, exam) pairs that drifted. Returns the set of
+    drifted pairs.
+    """
+    marks = Mark.objects.order_by()
+    summaries = ResultSummary.objects.order_by()
+    if exam_ids is not None:
+        marks = marks.filter(exam_id__in=exam_ids)
+        summaries = summaries.filter(exam_id__in=exam_ids)
+
+    expected = {
+        (row["enrollment_id"], row["exam_id"]): (row["obtained"] or 0, row["maximum"] or 0)
+        for row in marks.values("enrollment_id", "exam_id").annotate(
+            obtained=Sum("marks_obtained"), maximum=Sum("max_marks")
+        )
+    }
+    stored = {
+        (e, x): (obtained, maximum)
+        for e, x, obtained, maximum in summaries.values_list(
+            "enrollment_id", "exam_id", "total_obtained", "total_max"
+        )
+    }
+
+    drifted = set()
+    for key in expected.keys() | stored.keys():
+        want, have = expected.get(key), stored.get(key)
+        if want is None or have is None or any(abs(a - b) > EPSILON for a, b in zip(want, have)):
+            drifted.add(key)
+
+    if repair and drifted:
+        recompute_queue.recompute_pairs(drifted)
+    return drifted
@@ -0,0 +1,74 @@
+import datetime
+import random
+import uuid
+
+from django.contrib.auth import get_user_model
+from grades.models import AcademicYear, Exam, GradeScale, Enrollment, Mark
+from school.models import Classroom, Subject
+
+DEFAULT_BANDS = [
+    # (letter, min, max, gpa)
+    ("A1", 90, 100, 10),
+    ("A2", 80, 89.99, 9),
+    ("B1", 70, 79.99, 8),
+    ("B2", 60, 69.99, 7),
+    ("C1", 50, 59.99, 6),
+    ("C2", 40, 49.99, 5),
+    ("D", 33, 39.99, 4),
+    ("E", 0, 32.99, 0),
+]
+
+
+def seed_exam(students, subjects=5, classrooms=1, seed=0):
+    """
+    Create a synthetic academic year with one exam, grade bands, enrollments
+    and a full mark sheet. Used by the benchmark commands; callers are
+    expected to run it inside a transaction they roll back.
+    """
+    User = get_user_model()
+    rng = random.Random(seed)
+    tag = uuid.uuid4().hex[:8]
+
+    year = AcademicYear.objects.create(name=f"bench-{tag}")
+    exam = Exam.objects.create(
+        academic_year=year,
+        name="Benchmark",
+        start_date=datetime.date(2025, 3, 1),
+        end_date=datetime.date(2025, 3, 15),
+    )
+    GradeScale.objects.bulk_create(
+        GradeScale(academic_year=year, letter=letter, min_percentage=lo, max_percentage=hi, gpa_points=gpa)
+        for letter, lo, hi, gpa in DEFAULT_BANDS
+    )
+    rooms = Classroom.objects.bulk_create(
+        Classroom(name=f"{tag}-{i}") for i in range(classrooms)
+    )
+    subject_objs = Subject.objects.bulk_create(
+        Subject(name=f"{tag}-subject-{i}", code=f"{tag}{i}") for i in range(subjects)
+    )
+    users = User.objects.bulk_create(
+        User(username=f"{tag}-student-{i}", password="!", role="student")
+        for i in range(students)
+    )
+    enrollments = Enrollment.objects.bulk_create(
+        Enrollment(
+            student=user,
+            academic_year=year,
+            classroom=rooms[i % classrooms],
+            roll_no=i + 1,
+            admission_no=f"{tag}-{i}",
+        )
+        for i, user in enumerate(users)
+    )
+    Mark.objects.bulk_create(
+        Mark(
+            enrollment=enrollment,
+            subject=subject,
+            exam=exam,
+            max_marks=100,
+            marks_obtained=rng.randint(0, 100),
+        )
+        for enrollment in enrollments
+        for subject in subject_objs
+    )
+    return exam
@@ -1,11 +1,76 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
 from django.dispatch import receiver
-from grades.models import Mark
-from grades.services.recompute_results import recompute_result_for_student_exam
+from grades.models import AcademicYear, AssessmentType, Enrollment, Exam, Mark, GradeScale
+from grades.services import grade_bands, recompute_queue, response_cache, result_deltas
+from grades.services.result_cache import invalidate_student_results, invalidate_students
+from school.models import Classroom
+from users.models import User
 
 
-@receiver([post_save, post_delete], sender=Mark)
-def update_result_summary(sender, instance, **kwargs):
-    enrollment = instance.enrollment
-    exam = instance.exam
-    recompute_result_for_student_exam(enrollment, exam)
+@receiver(pre_save, sender=Mark)
+@receiver(pre_delete, sender=Mark)
+def lock_mark(sender, instance, **kwargs):
+    if result_deltas.is_enabled():
+        # the delta is taken against the stored row, not the loaded instance
+        result_deltas.lock_stored_values(instance)
+
+
+@receiver(post_save, sender=Mark)
+def update_result_summary(sender, instance, created, **kwargs):
+    if result_deltas.is_enabled():
+        # one UPDATE shifting the summary totals by this mark's change
+        result_deltas.mark_saved(instance, created)
+    else:
+        # the recompute runs once per (enrollment, exam) when the transaction commits
+        recompute_queue.enqueue(instance.enrollment_id, instance.exam_id)
+
+
+@receiver(post_delete, sender=Mark)
+def remove_from_result_summary(sender, instance, **kwargs):
+    if result_deltas.is_enabled():
+        result_deltas.mark_deleted(instance)
+    else:
+        recompute_queue.enqueue(instance.enrollment_id, instance.exam_id)
+
+
+@receiver([post_save, post_delete], sender=GradeScale)
+def invalidate_grade_bands(sender, instance, **kwargs):
+    grade_bands.invalidate()
+
+
+@receiver([post_save, post_delete], sender=AcademicYear)
+@receiver([post_save, post_delete], sender=Exam)
+@receiver([post_save, post_delete], sender=AssessmentType)
+@receiver([post_save, post_delete], sender=GradeScale)
+def invalidate_cached_responses(sender, instance, **kwargs):
+    response_cache.invalidate_model(sender)
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def invalidate_enrollment_results(sender, instance, **kwargs):
+    # my_cgpa follows the active enrollment; deleting one drops its results
+    invalidate_students(instance.student_id)
+
+
+@receiver(post_delete, sender=Exam)
+def invalidate_deleted_exam_results(sender, instance, **kwargs):
+    invalidate_student_results(academic_year_id=instance.academic_year_id)
+
+
+# students' cached results show the exam, classroom and user names
+@receiver(post_save, sender=Exam)
+def invalidate_renamed_exam_results(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_student_results(results__exam_id=instance.id)
+
+
+@receiver(post_save, sender=Classroom)
+def invalidate_renamed_classroom_results(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_student_results(classroom_id=instance.id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_renamed_student_results(sender, instance, created, update_fields=None, **kwargs):
+    if not created and (not update_fields or "username" in update_fields):
+        invalidate_students(instance.id)
@@ -1,3 +1,615 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import os
+import shutil
+import sys
+import tempfile
+from io import StringIO
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.core.cache import cache, caches
+from django.core.management import CommandError, call_command
+from django.core.management.base import SystemCheckError
+from django.db import connection, transaction
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from grades.models import (
+    AcademicYear, AssessmentType, Enrollment, Exam, GradeJob, GradeScale, Mark, PendingRecompute, ResultSummary, YearlyCGPA
+)
+from grades.services import exports, grade_bands, jobs, recompute_queue
+from grades.services.leaderboard import get_leaderboard
+from grades.services.result_cache import _set_versions, get_version, invalidate_exam_results
+from grades.services.result_deltas import verify_and_repair
+from grades.services.recompute_results import (
+    compute_cgpa_for_enrollment, exam_classroom_ids, recompute_ranks_for_exam,
+    recompute_result_for_student_exam, recompute_results_for_exam, refresh_cgpa,
+)
+from grades.services.sample_data import seed_exam
+from school.models import Subject
+from users.models import User
+
+
+class FastListTests(APITestCase):
+    """The values() read path must render exactly what the serializers do."""
+
+    def setUp(self):
+        self.exam = seed_exam(12, subjects=3)
+        recompute_results_for_exam(self.exam)
+        self.client.force_authenticate(User.objects.create(username="admin", role="admin", is_staff=True))
+
+    def assertSameResponse(self, url):
+        with override_settings(FAST_LIST_READS=False):
+            slow = self.client.get(url)
+        with override_settings(FAST_LIST_READS=True):
+            fast = self.client.get(url)
+        self.assertEqual(fast.status_code, 200)
+        self.assertTrue(fast.json()["results"])
+        self.assertEqual(fast.json(), slow.json())
+
+    def test_marks(self):
+        self.assertSameResponse("/api/grades/marks/?page_size=20")
+
+    def test_results(self):
+        self.assertSameResponse("/api/grades/results/?page_size=5")
+
+
+class MasterDataCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.year = AcademicYear.objects.create(name="2026-27")
+        self.client.force_authenticate(User.objects.create(username="admin", role="admin", is_staff=True))
+
+    def test_cached_until_a_dependency_changes(self):
+        first = self.client.get("/api/grades/exams/")
+        etag = first["ETag"]
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/grades/exams/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertEqual(self.client.get("/api/grades/exams/").json(), first.json())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Exam.objects.create(academic_year=self.year, name="Term 1",
+                                start_date=datetime.date(2026, 6, 1), end_date=datetime.date(2026, 6, 5))
+        changed = self.client.get("/api/grades/exams/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+        self.assertEqual(changed.json()["results"][0]["academic_year"], "2026-27")
+
+
+class LeaderboardTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.exam = seed_exam(6, subjects=2)
+        recompute_results_for_exam(self.exam)
+
+    def test_rebuilt_after_the_exam_results_change(self):
+        before = get_leaderboard(self.exam.id, 3)
+        top = before["overall"][0]["enrollment_id"]
+        Mark.objects.filter(exam=self.exam, enrollment_id=top).update(marks_obtained=0)
+        self.assertEqual(get_leaderboard(self.exam.id, 3), before)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recompute_results_for_exam(self.exam)
+            invalidate_exam_results(self.exam.id)
+        self.assertNotEqual(get_leaderboard(self.exam.id, 3)["overall"][0]["enrollment_id"], top)
+
+    def test_subject_without_max_marks_sorts_last(self):
+        mark = Mark.objects.filter(exam=self.exam).first()
+        Mark.objects.filter(id=mark.id).update(max_marks=0, marks_obtained=0)
+        subject = next(
+            group for group in get_leaderboard(self.exam.id, 10)["subjects"]
+            if group["subject_id"] == mark.subject_id
+        )
+        self.assertIsNone(subject["students"][-1]["percentage"])
+        self.assertEqual(subject["students"][-1]["enrollment_id"], mark.enrollment_id)
+
+    @override_settings(CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "state": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "state"},
+    })
+    def test_workers_refuse_a_process_local_cache(self):
+        with self.assertRaisesMessage(SystemCheckError, "grades.W001"):
+            call_command("check", fail_level="WARNING")
+        for command in ("run_grade_jobs", "process_recompute_queue"):
+            with self.subTest(command=command), self.assertRaises(CommandError):
+                call_command(command, once=True)
+
+    def test_version_stamps_outlive_culled_payloads(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        backend = "django.core.cache.backends.filebased.FileBasedCache"
+        caches_setting = {
+            "default": {"BACKEND": backend, "LOCATION": f"{location}/default", "OPTIONS": {"MAX_ENTRIES": 10}},
+            "state": {"BACKEND": backend, "LOCATION": f"{location}/state", "OPTIONS": {"MAX_ENTRIES": sys.maxsize}},
+        }
+        with override_settings(CACHES=caches_setting):
+            version = get_version(f"exam:{self.exam.id}")
+            for i in range(50):
+                caches["default"].set(f"payload:{i}", i)
+            self.assertEqual(get_version(f"exam:{self.exam.id}"), version)
+
+        caches_setting["state"]["OPTIONS"] = {}
+        with override_settings(CACHES=caches_setting):
+            with self.assertRaisesMessage(SystemCheckError, "grades.W002"):
+                call_command("check", fail_level="WARNING")
+
+
+class StudentResultsCacheTests(APITestCase):
+    url = "/api/grades/results/my_results/"
+
+    def setUp(self):
+        cache.clear()
+        self.exam = seed_exam(3, subjects=2)
+        recompute_results_for_exam(self.exam)
+        self.enrollment = Enrollment.objects.select_related("student", "classroom").first()
+        self.client.force_authenticate(self.enrollment.student)
+
+    def my_result(self):
+        results = self.client.get(self.url).json()
+        self.assertEqual(len(results), 1)
+        return results[0]
+
+    def test_cached_until_the_results_are_recomputed(self):
+        first = self.my_result()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.my_result(), first)
+
+        Mark.objects.filter(enrollment=self.enrollment).update(marks_obtained=0)
+        self.assertEqual(self.my_result(), first)
+        with self.captureOnCommitCallbacks(execute=True):
+            recompute_results_for_exam(self.exam)
+        self.assertEqual(self.my_result()["total_obtained"], 0)
+
+    def test_renames_reach_the_cached_results(self):
+        self.my_result()
+        renames = [
+            (self.exam, "name", "Finals", "exam_name"),
+            (self.enrollment.classroom, "name", "Room 9", "classroom_name"),
+            (self.enrollment.student, "username", "renamed", "student_name"),
+        ]
+        for instance, field, value, key in renames:
+            with self.subTest(key=key):
+                setattr(instance, field, value)
+                with self.captureOnCommitCallbacks(execute=True):
+                    instance.save()
+                self.assertEqual(self.my_result()[key], value)
+
+
+class GradeBandTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.year = seed_exam(1, subjects=1).academic_year
+
+    def test_bands_follow_the_shared_version(self):
+        self.assertEqual(grade_bands.lookup_grade(self.year.id, 95).letter, "A1")
+        with self.assertNumQueries(0):
+            self.assertEqual(grade_bands.lookup_grade(self.year.id, 95).letter, "A1")
+
+        # changed and committed by another process: its bump is all this one sees
+        GradeScale.objects.filter(academic_year=self.year, letter="A1").update(letter="O")
+        self.assertEqual(grade_bands.lookup_grade(self.year.id, 95).letter, "A1")
+        _set_versions([grade_bands.VERSION_NAME])
+        self.assertEqual(grade_bands.lookup_grade(self.year.id, 95).letter, "O")
+
+    def test_saved_scale_is_used_in_the_same_transaction(self):
+        grade_bands.lookup_grade(self.year.id, 95)
+        scale = GradeScale.objects.get(academic_year=self.year, letter="A1")
+        scale.letter = "O"
+        with self.captureOnCommitCallbacks() as callbacks:
+            scale.save()
+        self.assertEqual(grade_bands.lookup_grade(self.year.id, 95).letter, "O")
+        self.assertTrue(callbacks)
+
+
+class RecomputeResultsCommandTests(APITestCase):
+    def setUp(self):
+        self.exam = seed_exam(4, subjects=2, classrooms=2)
+        self.checkpoint = os.path.join(tempfile.mkdtemp(), "checkpoint.json")
+
+    def recompute(self, *args):
+        call_command("recompute_results", "--exam", str(self.exam.id), "--checkpoint", self.checkpoint,
+                     *args, stdout=StringIO())
+
+    def test_resume_ranks_an_exam_that_crashed_before_ranking(self):
+        with mock.patch("grades.management.commands.recompute_results.recompute_ranks_for_exam",
+                        side_effect=RuntimeError("crash")):
+            with self.assertRaises(RuntimeError):
+                self.recompute()
+        self.assertTrue(os.path.exists(self.checkpoint))
+        self.assertFalse(ResultSummary.objects.filter(exam=self.exam, class_rank__isnull=False).exists())
+
+        self.recompute("--resume")
+        self.assertFalse(ResultSummary.objects.filter(exam=self.exam, class_rank__isnull=True).exists())
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_resume_refuses_a_different_scope(self):
+        with mock.patch("grades.management.commands.recompute_results.recompute_ranks_for_exam",
+                        side_effect=RuntimeError("crash")):
+            with self.assertRaises(RuntimeError):
+                self.recompute()
+        with self.assertRaisesMessage(CommandError, "resume with the same arguments"):
+            self.recompute("--resume", "--classroom", "1")
+
+    def test_defaults_to_one_worker_on_sqlite(self):
+        with mock.patch("grades.management.commands.recompute_results.ProcessPoolExecutor") as pool:
+            self.recompute()
+        pool.assert_not_called()
+
+
+class ResultDeltaTests(APITestCase):
+    """Summaries patched by mark deltas must match a full recompute."""
+
+    def setUp(self):
+        self.exam = seed_exam(3, subjects=2)
+        self.other_exam = Exam.objects.create(academic_year=self.exam.academic_year, name="Retake",
+                                              start_date=self.exam.start_date, end_date=self.exam.end_date)
+        recompute_results_for_exam(self.exam)
+        self.first, self.second = Enrollment.objects.filter(academic_year=self.exam.academic_year)[:2]
+        self.mark = Mark.objects.filter(enrollment=self.first, exam=self.exam).first()
+
+    def summaries(self):
+        return sorted(ResultSummary.objects.values_list(
+            "enrollment_id", "exam_id", "total_obtained", "total_max", "percentage", "grade_letter", "gpa_points",
+        ))
+
+    def assertMatchesRecompute(self):
+        self.assertEqual(verify_and_repair(repair=False), set())
+        patched = self.summaries()
+        for exam in (self.exam, self.other_exam):
+            recompute_results_for_exam(exam)
+        self.assertEqual(patched, self.summaries())
+
+    def test_create(self):
+        subject = Subject.objects.create(name="Extra", code="EXTRA")
+        with self.captureOnCommitCallbacks(execute=True):
+            Mark.objects.create(enrollment=self.first, exam=self.exam, subject=subject,
+                                max_marks=50, marks_obtained=10)
+            Mark.objects.create(enrollment=self.first, exam=self.other_exam, subject=subject,
+                                max_marks=50, marks_obtained=10)
+        self.assertMatchesRecompute()
+
+    def test_update(self):
+        before = ResultSummary.objects.get(enrollment=self.first, exam=self.exam).computed_at
+        self.mark.marks_obtained = 1
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mark.save()
+        self.assertGreater(ResultSummary.objects.get(enrollment=self.first, exam=self.exam).computed_at, before)
+        self.assertMatchesRecompute()
+
+    def test_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mark.delete()
+            Mark.objects.filter(enrollment=self.second, exam=self.exam).delete()
+        self.assertMatchesRecompute()
+
+    def test_move_to_another_exam_and_enrollment(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mark.exam = self.other_exam
+            self.mark.save()
+            moved = Mark.objects.filter(enrollment=self.second, exam=self.exam).first()
+            moved.enrollment = self.first
+            moved.exam = self.other_exam
+            moved.assessment_type = AssessmentType.objects.create(name="Project")
+            moved.save()
+        self.assertMatchesRecompute()
+
+    def test_stale_instance_is_measured_against_the_stored_row(self):
+        stale = Mark.objects.get(id=self.mark.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mark.marks_obtained = 1
+            self.mark.save()
+            stale.marks_obtained = 2
+            stale.save()
+        self.assertMatchesRecompute()
+
+
+class RecomputeResultsTests(APITestCase):
+    def summaries(self, exam):
+        return sorted(ResultSummary.objects.filter(exam=exam).values_list(
+            "enrollment_id", "total_obtained", "total_max", "percentage", "grade_letter", "gpa_points",
+        ))
+
+    def test_matches_the_per_enrollment_recompute(self):
+        exam = seed_exam(8, subjects=3, classrooms=2)
+        Mark.objects.filter(enrollment=Enrollment.objects.first()).delete()
+        for enrollment in Enrollment.objects.filter(academic_year=exam.academic_year):
+            recompute_result_for_student_exam(enrollment, exam)
+        per_row = self.summaries(exam)
+        self.assertEqual(len(per_row), 7)
+
+        # a stale summary for the student without marks must go as well
+        ResultSummary.objects.create(enrollment=Enrollment.objects.first(), exam=exam)
+        self.assertEqual(recompute_results_for_exam(exam), 7)
+        self.assertEqual(self.summaries(exam), per_row)
+
+    def test_query_count_does_not_grow_with_the_class(self):
+        for students in (3, 30):
+            exam = seed_exam(students, subjects=2, classrooms=2)
+            recompute_results_for_exam(exam)  # warm the grade bands
+            with self.subTest(students=students), self.assertNumQueries(10):
+                recompute_results_for_exam(exam)
+
+
+@override_settings(GRADES_INCREMENTAL_RESULTS=False)
+class RecomputeQueueTests(APITestCase):
+    def setUp(self):
+        self.exam = seed_exam(3, subjects=3)
+        recompute_results_for_exam(self.exam)
+        self.enrollment = Enrollment.objects.filter(academic_year=self.exam.academic_year).first()
+
+    def test_mark_saves_in_one_transaction_recompute_once(self):
+        with mock.patch("grades.services.recompute_queue.recompute_results_for_exam",
+                        wraps=recompute_results_for_exam) as recompute:
+            with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+                for mark in Mark.objects.filter(enrollment=self.enrollment):
+                    mark.marks_obtained = 0
+                    mark.save()
+        recompute.assert_called_once_with(self.exam, enrollment_ids={self.enrollment.id})
+        self.assertEqual(ResultSummary.objects.get(enrollment=self.enrollment, exam=self.exam).total_obtained, 0)
+
+    @override_settings(GRADES_RECOMPUTE_MODE="background")
+    def test_background_mode_queues_pairs_until_processed(self):
+        mark = Mark.objects.filter(enrollment=self.enrollment).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            mark.delete()
+        self.assertEqual(list(PendingRecompute.objects.values_list("enrollment_id", "exam_id")),
+                         [(self.enrollment.id, self.exam.id)])
+        self.assertEqual(recompute_queue.process_pending(), 1)
+        self.assertFalse(PendingRecompute.objects.exists())
+        self.assertEqual(ResultSummary.objects.get(enrollment=self.enrollment, exam=self.exam).total_max, 200)
+
+    @override_settings(GRADES_RECOMPUTE_MODE="background")
+    def test_cascade_deletes_do_not_queue_deleted_parents(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.enrollment.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.exam.delete()
+        self.assertFalse(PendingRecompute.objects.exists())
+        connection.check_constraints()
+
+
+class BulkMarkTests(APITestCase):
+    url = "/api/grades/marks/bulk/"
+
+    def setUp(self):
+        self.exam = seed_exam(2, subjects=2)
+        recompute_results_for_exam(self.exam)
+        self.mark = Mark.objects.filter(exam=self.exam).first()
+        self.client.force_authenticate(User.objects.create(username="admin", role="admin", is_staff=True))
+
+    def row(self, **values):
+        return {"enrollment": self.mark.enrollment_id, "subject": self.mark.subject_id,
+                "exam": self.exam.id, "max_marks": 100, "marks_obtained": 40, **values}
+
+    def test_upserts_and_recomputes(self):
+        unit_test = AssessmentType.objects.create(name="Unit Test")
+        rows = [self.row(marks_obtained=7), self.row(assessment_type=unit_test.id, max_marks=20, marks_obtained=20)]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {"marks": rows}, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json(), {"saved": 2, "results_recomputed": 1})
+
+        self.mark.refresh_from_db()
+        self.assertEqual(self.mark.marks_obtained, 7)
+        self.assertEqual(Mark.objects.filter(exam=self.exam).count(), 5)
+        summary = ResultSummary.objects.get(enrollment_id=self.mark.enrollment_id, exam=self.exam)
+        expected = recompute_result_for_student_exam(self.mark.enrollment, self.exam)
+        self.assertEqual((summary.total_obtained, summary.total_max), (expected.total_obtained, expected.total_max))
+
+    def test_rejects_the_whole_grid_on_any_bad_row(self):
+        rows = [self.row(marks_obtained=1), self.row(marks_obtained=2), self.row(enrollment=999999)]
+        response = self.client.post(self.url, {"marks": rows}, format="json")
+        self.assertEqual(response.status_code, 400)
+        errors = {error["row"]: error["errors"] for error in response.json()["errors"]}
+        self.assertIn("non_field_errors", errors[1])
+        self.assertIn("enrollment", errors[2])
+        self.mark.refresh_from_db()
+        self.assertNotIn(self.mark.marks_obtained, (1, 2))
+
+
+class RankTests(APITestCase):
+    def setUp(self):
+        self.exam = seed_exam(12, subjects=2, classrooms=2)
+        recompute_results_for_exam(self.exam)
+        # a tie in each classroom
+        for classroom_id in exam_classroom_ids(self.exam):
+            tied = ResultSummary.objects.filter(exam=self.exam, enrollment__classroom_id=classroom_id)[:2]
+            ResultSummary.objects.filter(id__in=[r.id for r in tied]).update(percentage=50)
+
+    def per_row_ranks(self):
+        """The ranks the old loop over each classroom in percentage order gave."""
+        ranks = {}
+        for classroom_id in exam_classroom_ids(self.exam):
+            rows = list(ResultSummary.objects.filter(exam=self.exam, enrollment__classroom_id=classroom_id)
+                        .order_by("-percentage").values_list("id", "percentage"))
+            for position, (summary_id, percentage) in enumerate(rows):
+                ranks[summary_id] = 1 + sum(1 for _, other in rows[:position] if other > percentage)
+        return ranks
+
+    def test_matches_the_per_row_ranking(self):
+        self.assertEqual(recompute_ranks_for_exam(self.exam), 12)
+        stored = dict(ResultSummary.objects.filter(exam=self.exam).values_list("id", "class_rank"))
+        self.assertEqual(stored, self.per_row_ranks())
+
+        lowest = ResultSummary.objects.filter(exam=self.exam).order_by("percentage", "id").first()
+        self.assertEqual(lowest.percentile, 0)
+
+        for classroom_id in exam_classroom_ids(self.exam):
+            rows = list(ResultSummary.objects.filter(exam=self.exam, enrollment__classroom_id=classroom_id)
+                        .values_list("percentage", "percentile"))
+            for percentage, percentile in rows:
+                below = sum(1 for other, _ in rows if other < percentage)
+                self.assertEqual(percentile, round(below / (len(rows) - 1) * 100, 2))
+
+    def test_school_wide_ranks(self):
+        recompute_ranks_for_exam(self.exam, school_wide=True)
+        ranks = list(ResultSummary.objects.filter(exam=self.exam).order_by("school_rank")
+                     .values_list("school_rank", flat=True))
+        self.assertEqual(ranks[0], 1)
+        self.assertEqual(ranks[-1], 12)
+
+    def test_only_changed_rows_are_written(self):
+        recompute_ranks_for_exam(self.exam)
+        self.assertEqual(recompute_ranks_for_exam(self.exam), 0)
+
+    def test_query_count_does_not_grow_with_the_class(self):
+        for students in (3, 30):
+            exam = seed_exam(students, subjects=2, classrooms=2)
+            recompute_results_for_exam(exam)
+            # savepoint, the UPDATE, release
+            with self.subTest(students=students), self.assertNumQueries(3):
+                recompute_ranks_for_exam(exam)
+
+
+class CgpaTests(APITestCase):
+    def setUp(self):
+        self.exam = seed_exam(6, subjects=2, classrooms=2)
+        self.year = self.exam.academic_year
+        recompute_results_for_exam(self.exam)
+        # a half-weight exam, and one without a weightage (counts as 100)
+        for name, weightage, gpa in (("Half", 50, 1.0), ("Unweighted", 0, 2.5)):
+            exam = Exam.objects.create(academic_year=self.year, name=name, weightage=weightage,
+                                       start_date=self.exam.start_date, end_date=self.exam.end_date)
+            ResultSummary.objects.bulk_create(
+                ResultSummary(enrollment=enrollment, exam=exam, gpa_points=gpa)
+                for enrollment in Enrollment.objects.filter(academic_year=self.year)
+            )
+
+    @staticmethod
+    def per_row_cgpa(enrollment):
+        """The old loop over an enrollment's summaries."""
+        total_weight = weighted_gpa = 0
+        for summary in ResultSummary.objects.filter(enrollment=enrollment).select_related("exam"):
+            weight = summary.exam.weightage or 100
+            total_weight += weight
+            weighted_gpa += summary.gpa_points * weight
+        return round(weighted_gpa / total_weight, 2) if total_weight else 0
+
+    def test_matches_the_per_enrollment_loop(self):
+        self.assertEqual(refresh_cgpa(academic_year_id=self.year.id), 6)
+        for enrollment in Enrollment.objects.filter(academic_year=self.year):
+            expected = self.per_row_cgpa(enrollment)
+            self.assertEqual(YearlyCGPA.objects.get(enrollment=enrollment).cgpa, expected)
+            self.assertEqual(compute_cgpa_for_enrollment(enrollment), expected)
+
+    def test_refresh_one_classroom_with_few_queries(self):
+        YearlyCGPA.objects.all().delete()
+        classroom_id = exam_classroom_ids(self.exam)[0]
+        with self.assertNumQueries(5):
+            self.assertEqual(refresh_cgpa(academic_year_id=self.year.id, classroom_id=classroom_id), 3)
+        self.assertEqual(YearlyCGPA.objects.count(), 3)
+
+    def test_enrollment_without_results_loses_its_cgpa(self):
+        refresh_cgpa(academic_year_id=self.year.id)
+        enrollment = Enrollment.objects.filter(academic_year=self.year).first()
+        ResultSummary.objects.filter(enrollment=enrollment).delete()
+        refresh_cgpa(enrollment_ids=[enrollment.id])
+        self.assertFalse(YearlyCGPA.objects.filter(enrollment=enrollment).exists())
+
+    def test_classroom_endpoint(self):
+        refresh_cgpa(academic_year_id=self.year.id)
+        self.client.force_authenticate(User.objects.create(username="admin", role="admin", is_staff=True))
+        data = self.client.get(f"/api/grades/results/cgpa/?academic_year_id={self.year.id}").json()
+        self.assertEqual(len(data), 6)
+        self.assertEqual([row["cgpa"] for row in data], sorted((row["cgpa"] for row in data), reverse=True))
+
+
+# run_job releases the worker thread's connections; keep the test's open
+@mock.patch("grades.services.jobs.connections")
+class GradeJobTests(APITestCase):
+    def setUp(self):
+        self.exam = seed_exam(6, subjects=2, classrooms=2)
+        self.client.force_authenticate(User.objects.create(username="admin", role="admin", is_staff=True))
+
+    def test_recompute_runs_in_the_background(self, connections):
+        response = self.client.post("/api/grades/results/recompute/", {"exam_id": self.exam.id}, format="json")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["status"], "queued")
+        self.assertFalse(ResultSummary.objects.exists())
+
+        job = jobs.claim_next()
+        self.assertEqual(job.id, response.json()["job_id"])
+        self.assertIsNone(jobs.claim_next())
+        jobs.run_job(job)
+
+        status = self.client.get(f"/api/grades/jobs/{job.id}/").json()
+        self.assertEqual((status["status"], status["progress"], status["rows_affected"]), ("succeeded", 1, 6))
+        self.assertEqual(ResultSummary.objects.filter(exam=self.exam).count(), 6)
+
+    def test_recompute_ranks_passes_school_wide(self, connections):
+        recompute_results_for_exam(self.exam)
+        self.client.post("/api/grades/results/recompute_ranks/",
+                         {"exam_id": self.exam.id, "school_wide": True}, format="json")
+        job = jobs.claim_next()
+        self.assertEqual(job.params, {"school_wide": True})
+        jobs.run_job(job)
+        self.assertFalse(ResultSummary.objects.filter(exam=self.exam, school_rank__isnull=True).exists())
+
+    def test_failure_is_recorded(self, connections):
+        jobs.enqueue_job("recompute", self.exam)
+        with mock.patch.dict(jobs.RUNNERS, recompute=mock.Mock(side_effect=RuntimeError("boom"))):
+            jobs.run_job(jobs.claim_next())
+        job = self.client.get("/api/grades/jobs/").json()["results"][0]
+        self.assertEqual(job["status"], "failed")
+        self.assertIn("RuntimeError: boom", job["error"])
+
+    @override_settings(GRADE_JOB_TIMEOUT=60)
+    def test_job_of_a_dead_worker_is_failed(self, connections):
+        for _ in range(2):
+            jobs.enqueue_job("recompute", self.exam)
+        abandoned, live = jobs.claim_next(), jobs.claim_next()
+        GradeJob.objects.filter(id=abandoned.id).update(started_at=timezone.now() - datetime.timedelta(seconds=61))
+
+        call_command("run_grade_jobs", once=True, stdout=StringIO())
+        abandoned.refresh_from_db()
+        live.refresh_from_db()
+        self.assertEqual(abandoned.status, "failed")
+        self.assertIn("worker stopped", abandoned.error)
+        self.assertEqual(live.status, "running")
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        self.exam = seed_exam(5, subjects=2, classrooms=2)
+        recompute_results_for_exam(self.exam)
+        recompute_ranks_for_exam(self.exam)
+        self.client.force_authenticate(User.objects.create(username="admin", role="admin", is_staff=True))
+
+    def export(self, name, **params):
+        query = "&".join(f"{key}={value}" for key, value in {"exam_id": self.exam.id, **params}.items())
+        response = self.client.get(f"/api/grades/{name}/export/?{query}")
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content)
+
+    def test_marks_csv(self):
+        response, body = self.export("marks")
+        self.assertIn(f"marks-exam-{self.exam.id}.csv", response["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(body.decode())))
+        self.assertEqual(len(rows), Mark.objects.filter(exam=self.exam).count())
+        mark = Mark.objects.select_related("enrollment__student", "subject").order_by("subject_id", "enrollment_id")[0]
+        self.assertEqual(
+            (rows[0]["student"], rows[0]["subject"], float(rows[0]["marks_obtained"])),
+            (mark.enrollment.student.username, mark.subject.name, mark.marks_obtained),
+        )
+
+    def test_results_csv_in_merit_order_for_one_classroom(self):
+        classroom_id = exam_classroom_ids(self.exam)[0]
+        _, body = self.export("results", classroom_id=classroom_id)
+        rows = list(csv.DictReader(io.StringIO(body.decode())))
+        expected = ResultSummary.objects.filter(exam=self.exam, enrollment__classroom_id=classroom_id)
+        self.assertEqual(len(rows), expected.count())
+        percentages = [float(row["percentage"]) for row in rows]
+        self.assertEqual(percentages, sorted(percentages, reverse=True))
+
+    @skipIf(exports.xlsxwriter is None, "xlsxwriter is not installed")
+    def test_results_xlsx(self):
+        response, body = self.export("results", output="xlsx")
+        self.assertEqual(response["Content-Type"], "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        self.assertEqual(body[:2], b"PK")  # a zip archive
+
+    def test_rejects_bad_parameters(self):
+        for query in ("", "exam_id=x", f"exam_id={self.exam.id}&output=pdf"):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f"/api/grades/results/export/?{query}").status_code, 400)
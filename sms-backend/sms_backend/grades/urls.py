@@ -1,7 +1,8 @@
 from rest_framework.routers import DefaultRouter
 from .views import (
     AcademicYearViewSet, ExamViewSet, AssessmentTypeViewSet,
-    GradeScaleViewSet, EnrollmentViewSet, MarkViewSet, ResultSummaryViewSet
+    GradeScaleViewSet, EnrollmentViewSet, MarkViewSet, ResultSummaryViewSet,
+    GradeJobViewSet
 )
 
 router = DefaultRouter()
@@ -12,5 +13,6 @@ router.register(r'grade-scales', GradeScaleViewSet)
 router.register(r'enrollments', EnrollmentViewSet)
 router.register(r'marks', MarkViewSet)
 router.register(r'results', ResultSummaryViewSet)
+router.register(r'jobs', GradeJobViewSet)
 
 urlpatterns = router.urls
@@ -1,43 +1,73 @@
 from rest_framework import viewsets, permissions, filters
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from django.db.models import Sum, Avg
+from django.db.models import Sum, Avg, F
+from django.http import StreamingHttpResponse
 from .permission import *
 from .models import (
     AcademicYear, Exam, AssessmentType, GradeScale,
-    Enrollment, Mark, ResultSummary
+    Enrollment, Mark, ResultSummary, YearlyCGPA, GradeJob
 )
 from .serializers import (
     AcademicYearSerializer, ExamSerializer, AssessmentTypeSerializer,
-    GradeScaleSerializer, EnrollmentSerializer, MarkSerializer, ResultSummarySerializer
+    GradeScaleSerializer, EnrollmentSerializer, MarkSerializer, ResultSummarySerializer,
+    BulkMarkRowSerializer, GradeJobSerializer
 )
 
-from grades.services.recompute_results import (
-    recompute_ranks_for_exam, compute_cgpa_for_enrollment
-)
+from grades.services.bulk_marks import find_row_errors, upsert_marks
+from grades.services.exports import RENDERERS, available_outputs, export_rows
+from grades.services.jobs import enqueue_job
+from grades.services.leaderboard import get_leaderboard
+from grades.services.response_cache import CachedResponseMixin
+from grades.services.result_cache import get_student_payload
+from grades.services.recompute_results import get_cgpa_for_enrollment
+from sms_backend.values_reader import FastListMixin, reader_for
+
+
+def _export(request, name):
+    """Stream one exam's marks or results; ?exam_id=, ?classroom_id=, ?output=csv|xlsx"""
+    try:
+        exam_id = int(request.query_params.get("exam_id", ""))
+        classroom_id = int(request.query_params.get("classroom_id") or 0) or None
+    except ValueError:
+        return Response({"error": "exam_id (required) and classroom_id must be integers"}, status=400)
+    output = request.query_params.get("output", "csv")
+    if output not in available_outputs():
+        return Response({"error": f"output must be one of {', '.join(available_outputs())}"}, status=400)
+
+    header, rows = export_rows(name, exam_id, classroom_id)
+    render, content_type = RENDERERS[output]
+    filename = f"{name}-exam-{exam_id}" + (f"-classroom-{classroom_id}" if classroom_id else "")
+    response = StreamingHttpResponse(render(header, rows, filename), content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{output}"'
+    return response
 
 
 # --- Master ViewSets (for admin or basic viewing) ---
 
-class AcademicYearViewSet(viewsets.ModelViewSet):
+class AcademicYearViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = AcademicYear.objects.all()
+    cache_models = (AcademicYear,)
     serializer_class = AcademicYearSerializer
     permission_classes = [IsAdmin | ReadOnly]
 
-class ExamViewSet(viewsets.ModelViewSet):
+class ExamViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Exam.objects.all().select_related("academic_year")
+    cache_models = (Exam, AcademicYear)
     serializer_class = ExamSerializer
     permission_classes = [IsAdmin | ReadOnly]
 
 
-class AssessmentTypeViewSet(viewsets.ModelViewSet):
+class AssessmentTypeViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = AssessmentType.objects.all()
+    cache_models = (AssessmentType,)
     serializer_class = AssessmentTypeSerializer
     permission_classes = [IsAdmin | ReadOnly]
 
 
-class GradeScaleViewSet(viewsets.ModelViewSet):
+class GradeScaleViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = GradeScale.objects.select_related("academic_year").all()
+    cache_models = (GradeScale, AcademicYear)
     serializer_class = GradeScaleSerializer
     permission_classes = [IsAdmin | ReadOnly]
 
@@ -54,7 +84,7 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
 
 # --- Mark CRUD (teacher/admin) ---
 
-class MarkViewSet(viewsets.ModelViewSet):
+class MarkViewSet(FastListMixin, viewsets.ModelViewSet):
     queryset = Mark.objects.select_related(
         "enrollment__student", "subject", "exam", "assessment_type"
     ).all()
@@ -74,9 +104,35 @@ class MarkViewSet(viewsets.ModelViewSet):
         # Student → only their marks
         return qs.filter(enrollment__student=user)
 
+    @action(detail=False, methods=["post"], url_path="bulk", permission_classes=[IsTeacherOrAdmin])
+    def bulk(self, request):
+        """Upsert a whole grid of marks in one transaction"""
+        rows = request.data.get("marks") if isinstance(request.data, dict) else request.data
+        if not isinstance(rows, list) or not rows:
+            return Response({"error": "marks must be a non-empty list"}, status=400)
+
+        serializer = BulkMarkRowSerializer(data=rows, many=True)
+        if not serializer.is_valid():
+            errors = [{"row": i, "errors": e} for i, e in enumerate(serializer.errors) if e]
+            return Response({"errors": errors}, status=400)
+
+        rows = serializer.validated_data
+        row_errors = find_row_errors(rows)
+        if row_errors:
+            errors = [{"row": i, "errors": e} for i, e in sorted(row_errors.items())]
+            return Response({"errors": errors}, status=400)
+
+        pairs = upsert_marks(rows, created_by=request.user)
+        return Response({"saved": len(rows), "results_recomputed": len(pairs)}, status=201)
+
+    @action(detail=False, methods=["get"], permission_classes=[IsTeacherOrAdmin])
+    def export(self, request):
+        """Download every mark of an exam as CSV or XLSX"""
+        return _export(request, "marks")
+
 # --- ResultSummary (for viewing computed results) ---
 
-class ResultSummaryViewSet(viewsets.ReadOnlyModelViewSet):
+class ResultSummaryViewSet(FastListMixin, viewsets.ReadOnlyModelViewSet):
     queryset = ResultSummary.objects.select_related(
         "enrollment__student", "enrollment__classroom", "exam"
     ).all()
@@ -88,52 +144,68 @@ class ResultSummaryViewSet(viewsets.ReadOnlyModelViewSet):
         """For students: see their result summaries"""
         student = request.user
         results = ResultSummary.objects.filter(enrollment__student=student)
-        serializer = self.get_serializer(results, many=True)
-        return Response(serializer.data)
+        reader = reader_for(self.get_serializer_class())
+        return Response(get_student_payload("my_results", student.id, lambda: reader.read(results)))
     
 
     @action(detail=False, methods=["post"], permission_classes=[IsAdmin])
     def recompute(self, request):
-        """Recompute results for an exam (admin only)"""
+        """Queue a recompute of results for an exam (admin only)"""
         exam_id = request.data.get("exam_id")
         if not exam_id:
             return Response({"error": "exam_id required"}, status=400)
 
-        from grades.models import Enrollment, Exam
-        from grades.services.recompute_results import recompute_result_for_student_exam
-
         exam = Exam.objects.get(id=exam_id)
-        enrollments = Enrollment.objects.filter(academic_year=exam.academic_year)
-        count = 0
-        for e in enrollments:
-            recompute_result_for_student_exam(e, exam)
-            count += 1
-
-        return Response({"status": f"Recomputed {count} results for {exam.name}"})
+        job = enqueue_job("recompute", exam, created_by=request.user)
+        return Response({"job_id": job.id, "status": job.status}, status=202)
 
-    
     @action(detail=False, methods=["post"], permission_classes=[IsAdmin])
     def recompute_ranks(self, request):
-        """Recalculate ranks for a given exam"""
+        """Queue a recalculation of ranks for a given exam"""
         exam_id = request.data.get("exam_id")
         if not exam_id:
             return Response({"error": "exam_id required"}, status=400)
-        from grades.models import Exam
+
         exam = Exam.objects.get(id=exam_id)
-        recompute_ranks_for_exam(exam)
-        return Response({"status": f"Ranks recomputed for {exam.name}"})
+        school_wide = str(request.data.get("school_wide", "")).lower() in ("1", "true")
+        job = enqueue_job("recompute_ranks", exam, {"school_wide": school_wide}, created_by=request.user)
+        return Response({"job_id": job.id, "status": job.status}, status=202)
 
     @action(detail=False, methods=["get"], permission_classes=[IsStudentSelf])
     def my_cgpa(self, request):
         """Get yearly CGPA for the logged-in student"""
-        enrollment = (
-            request.user.enrollments.filter(is_active=True).select_related("academic_year").first()
-        )
-        if not enrollment:
+        def build():
+            enrollment = request.user.enrollments.filter(is_active=True).first()
+            return {"cgpa": get_cgpa_for_enrollment(enrollment)} if enrollment else None
+
+        payload = get_student_payload("my_cgpa", request.user.id, build)
+        if payload is None:
             return Response({"error": "No active enrollment found"}, status=404)
+        return Response(payload)
 
-        cgpa = compute_cgpa_for_enrollment(enrollment)
-        return Response({"cgpa": cgpa})
+    @action(detail=False, methods=["get"], permission_classes=[IsTeacherOrAdmin])
+    def cgpa(self, request):
+        """Get stored CGPA for a whole classroom and/or academic year"""
+        classroom_id = request.query_params.get("classroom_id")
+        academic_year_id = request.query_params.get("academic_year_id")
+        if not classroom_id and not academic_year_id:
+            return Response({"error": "classroom_id or academic_year_id required"}, status=400)
+
+        records = YearlyCGPA.objects.all()
+        if classroom_id:
+            records = records.filter(enrollment__classroom_id=classroom_id)
+        if academic_year_id:
+            records = records.filter(academic_year_id=academic_year_id)
+
+        data = records.order_by("-cgpa", "enrollment__roll_no").values(
+            "enrollment_id",
+            "cgpa",
+            student=F("enrollment__student__username"),
+            classroom=F("enrollment__classroom__name"),
+            roll_no=F("enrollment__roll_no"),
+            academic_year_name=F("academic_year__name"),
+        )
+        return Response(list(data))
 
     @action(detail=False, methods=["get"], permission_classes=[IsTeacherOrAdmin])
     def top_students(self, request):
@@ -159,4 +231,35 @@ class ResultSummaryViewSet(viewsets.ReadOnlyModelViewSet):
             }
             for r in results
         ]
-        return Response(data)
\ No newline at end of file
+        return Response(data)
+
+    @action(detail=False, methods=["get"], permission_classes=[IsTeacherOrAdmin])
+    def leaderboard(self, request):
+        """Top N overall, per classroom and per subject for an exam (default 10)"""
+        exam_id = request.query_params.get("exam_id")
+        if not exam_id:
+            return Response({"error": "exam_id required"}, status=400)
+        try:
+            exam_id = int(exam_id)
+            top_n = int(request.query_params.get("n", 10))
+        except ValueError:
+            return Response({"error": "exam_id and n must be integers"}, status=400)
+        if top_n < 1:
+            return Response({"error": "n must be positive"}, status=400)
+
+        return Response(get_leaderboard(exam_id, top_n))
+
+    @action(detail=False, methods=["get"], permission_classes=[IsTeacherOrAdmin])
+    def export(self, request):
+        """Download the results of an exam in merit order as CSV or XLSX"""
+        return _export(request, "results")
+
+
+# --- Background jobs (status of queued recomputes) ---
+
+class GradeJobViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = GradeJob.objects.select_related("exam").all()
+    serializer_class = GradeJobSerializer
+    permission_classes = [IsAdmin]
+    # newest first; read by KeysetPagination (no ordering filter backend here)
+    ordering = "-id"
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from sms_backend.hot_queries import HOT_QUERIES, explain
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN every registered hot query (sms_backend/hot_queries.py) and "
+        "fail if any of them scans a whole table. Extra sort steps are "
+        "reported but allowed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("names", nargs="*", help="Only these queries (default: all).")
+        parser.add_argument("--plans", action="store_true", help="Print every plan, not just flagged ones.")
+
+    def handle(self, *args, **options):
+        names = options["names"] or list(HOT_QUERIES)
+        unknown = sorted(set(names) - set(HOT_QUERIES))
+        if unknown:
+            raise CommandError(f"Unknown hot queries: {', '.join(unknown)}")
+
+        scans = []
+        for name in names:
+            plan, full_scan, sorts = explain(name)
+            flags = [flag for flag, found in (("FULL SCAN", full_scan), ("sort", sorts)) if found]
+            self.stdout.write(f"{name:<32} {', '.join(flags) or 'ok'}")
+            if flags or options["plans"]:
+                for line in plan.splitlines():
+                    self.stdout.write(f"    {line}")
+            if full_scan:
+                scans.append(name)
+
+        if scans:
+            raise CommandError(f"Full table scans in: {', '.join(scans)}")
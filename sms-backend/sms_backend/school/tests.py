@@ -1,3 +1,17 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from sms_backend.hot_queries import HOT_QUERIES, explain
+
+
+class HotQueryPlanTests(TestCase):
+    def test_no_hot_query_scans_a_whole_table(self):
+        scans = [name for name in HOT_QUERIES if explain(name)[1]]
+        self.assertEqual(scans, [])
+
+    def test_command_reports_every_query(self):
+        out = StringIO()
+        call_command("explain_hot_queries", stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), len(HOT_QUERIES))
@@ -0,0 +1,99 @@
+"""
+Registry of hot queries: the access paths the busiest endpoints depend on.
+
+Each entry builds the query the way its view or service does, with
+placeholder ids (only the plan matters, not the rows). ``manage.py
+explain_hot_queries`` runs EXPLAIN on every entry and flags any that read a
+whole table, so a dropped index or a rewritten filter that no longer fits
+one shows up before it shows up in latency. Register new hot paths with
+``@hot_query``.
+"""
+import datetime
+import re
+
+from django.db import connection
+
+from announcements.models import Announcement
+from attendance.models import Attendance
+from grades.models import Mark, ResultSummary
+from users.models import User
+
+HOT_QUERIES = {}
+
+# plan lines that mean every row of a table is read, and an extra sort step;
+# plans from other databases are shown but not checked
+FULL_SCAN_PATTERNS = {
+    "sqlite": re.compile(r"\bSCAN (?!CONSTANT ROW)"),
+    "postgresql": re.compile(r"\bSeq Scan on\b"),
+}
+SORT_PATTERNS = {
+    "sqlite": re.compile(r"\bUSE TEMP B-TREE\b"),
+    "postgresql": re.compile(r"^\s*(->\s*)?Sort\b", re.MULTILINE),
+}
+
+ID = 1
+DAY = datetime.date(2000, 1, 1)
+
+
+def hot_query(name):
+    def register(build):
+        HOT_QUERIES[name] = build
+        return build
+    return register
+
+
+def explain(name):
+    """``(plan, full_scan, sorts)`` for one registered query on the default database."""
+    plan = HOT_QUERIES[name]().explain()
+    full_scan = FULL_SCAN_PATTERNS.get(connection.vendor)
+    sort = SORT_PATTERNS.get(connection.vendor)
+    return (
+        plan,
+        bool(full_scan and full_scan.search(plan)),
+        bool(sort and sort.search(plan)),
+    )
+
+
+@hot_query("teacher list")
+def _teachers():
+    return User.objects.filter(role="teacher").order_by("id")[:50]
+
+
+@hot_query("course teacher choices")
+def _course_teachers():
+    return User.objects.filter(role__in=["teacher", "admin"])
+
+
+@hot_query("attendance register for a day")
+def _attendance_day():
+    return Attendance.objects.filter(course_id=ID, date=DAY, student_id__in=[ID, ID + 1])
+
+
+@hot_query("attendance over a date range")
+def _attendance_range():
+    return Attendance.objects.filter(course_id__in=[ID, ID + 1], date__range=(DAY, DAY + datetime.timedelta(days=30)))
+
+
+@hot_query("student attendance history")
+def _attendance_history():
+    return Attendance.objects.filter(student_id=ID, course_id=ID).order_by("date")
+
+
+@hot_query("student marks in an exam")
+def _student_marks():
+    return Mark.objects.filter(enrollment_id=ID, exam_id=ID).order_by()
+
+
+@hot_query("exam marks export")
+def _exam_marks():
+    return Mark.objects.filter(exam_id=ID).order_by("subject_id", "enrollment_id")
+
+
+@hot_query("exam leaderboard")
+def _leaderboard():
+    return ResultSummary.objects.filter(exam_id=ID).order_by("-percentage", "enrollment_id")[:50]
+
+
+@hot_query("course announcements")
+def _course_announcements():
+    return Announcement.objects.filter(course_id=ID).order_by("-created_at")[:50]
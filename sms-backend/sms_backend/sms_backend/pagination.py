@@ -0,0 +1,56 @@
+"""
+Keyset (cursor) pagination used by every list endpoint.
+
+Pages are read with ``WHERE key > last_key ORDER BY key LIMIT n`` on an
+indexed, unique key, so fetching page 1000 costs the same as page 1 and
+only one page of objects is ever serialized. The key is ``id`` unless the
+view sets ``ordering`` (e.g. ``"-id"`` for newest first, or another
+column that is unique within the view's queryset).
+
+Query parameters:
+    ?page_size=N   rows per page (default PAGE_SIZE, at most 1000)
+    ?cursor=...    opaque position taken from ``next``/``previous``
+    ?count=true    also return the total number of rows; this is one extra
+                   COUNT(*) over the whole queryset, so it is off by default
+"""
+from collections import OrderedDict
+
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+TRUE_VALUES = {"1", "true", "yes", "on"}
+
+
+class KeysetPagination(CursorPagination):
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = "id"
+    count_query_param = "count"
+
+    def get_ordering(self, request, queryset, view):
+        if not any(hasattr(backend, "get_ordering") for backend in getattr(view, "filter_backends", [])):
+            ordering = getattr(view, "ordering", None)
+            if ordering:
+                return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+        return super().get_ordering(request, queryset, view)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param, "").lower() in TRUE_VALUES:
+            self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        payload = [("next", self.get_next_link()), ("previous", self.get_previous_link())]
+        if self.count is not None:
+            payload.insert(0, ("count", self.count))
+        return Response(OrderedDict(payload + [("results", data)]))
+
+    def get_paginated_response_schema(self, schema):
+        response = super().get_paginated_response_schema(schema)
+        response["properties"]["count"] = {
+            "type": "integer",
+            "example": 123,
+            "description": f"Only present with ?{self.count_query_param}=true",
+        }
+        return response
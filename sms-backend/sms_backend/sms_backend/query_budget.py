@@ -0,0 +1,136 @@
+"""
+Query budgets: a ceiling on the number of SQL queries an endpoint may run.
+
+Decorate a view class (or a single view method) with ``@query_budget(n)``.
+Every request is counted and going over budget logs a warning. Tests turn
+on ``QUERY_BUDGET_STRICT`` (with ``override_settings``), which makes it
+raise ``QueryBudgetExceeded`` instead, so an N+1 fails the suite long
+before it shows up in production latency. In strict mode the view runs in
+a transaction that the raise rolls back: a request is never reported as
+failed after its writes were committed.
+
+A bulk insert that the backend splits into batches (SQLite binds at most a
+few hundred rows per statement) counts as one query, so a budget does not
+depend on how many rows a request writes. A loop of single-row inserts
+still counts every insert.
+
+A streamed response's body is read after the view returns; its queries
+are counted as they run and the budget is checked again once the body is
+exhausted. By then the headers are sent, so strict mode raises mid-body.
+
+Tests can also wrap any block in ``max_queries(n)`` to assert a ceiling
+directly; the failure message lists the statements that ran.
+"""
+import functools
+import logging
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections, transaction, DEFAULT_DB_ALIAS
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _insert_head(sql):
+    """An INSERT statement up to its VALUES list, else None."""
+    return sql.partition(" VALUES ")[0] if sql.startswith("INSERT") else None
+
+
+class QueryCounter:
+    """Records every statement run on one connection while active."""
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.connection = connections[using]
+        self.statements = []
+        self.batches = 0
+        self._bulk_insert = None
+
+    def __call__(self, execute, sql, params, many, context):
+        head = _insert_head(sql)
+        if head is not None and head == self._bulk_insert:
+            self.batches += 1  # next batch of the multi-row insert before it
+        several_rows = head is not None and "), (" in sql.partition(" VALUES ")[2]
+        self._bulk_insert = head if several_rows else None
+        self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.statements) - self.batches
+
+    @contextmanager
+    def active(self):
+        with self.connection.execute_wrapper(self):
+            yield self
+
+    def report(self):
+        return "\n".join(f"{index}. {sql}" for index, sql in enumerate(self.statements, 1))
+
+
+def _is_strict():
+    return getattr(settings, "QUERY_BUDGET_STRICT", False)
+
+
+def _enforce(counter, limit, label):
+    if len(counter) <= limit:
+        return
+    message = f"{label} ran {len(counter)} queries, budget is {limit}"
+    if _is_strict():
+        raise QueryBudgetExceeded(f"{message}:\n{counter.report()}")
+    logger.warning(message)
+
+
+def _counted(content, counter, limit, label):
+    with counter.active():
+        yield from content
+    _enforce(counter, limit, label)
+
+
+@contextmanager
+def max_queries(limit, using=DEFAULT_DB_ALIAS, label="block"):
+    """Fail with ``QueryBudgetExceeded`` if the block runs more than ``limit`` queries."""
+    counter = QueryCounter(using)
+    with counter.active():
+        yield counter
+    if len(counter) > limit:
+        raise QueryBudgetExceeded(
+            f"{label} ran {len(counter)} queries, budget is {limit}:\n{counter.report()}"
+        )
+
+
+def query_budget(limit, using=DEFAULT_DB_ALIAS):
+    """
+    Cap the queries run by a view. Applied to a class it wraps
+    ``dispatch``, so every HTTP method shares the budget; applied to a
+    function or method it wraps that call only.
+    """
+    def wrap(func, label):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            counter = QueryCounter(using)
+            if _is_strict():
+                with transaction.atomic(using=using):
+                    with counter.active():
+                        result = func(*args, **kwargs)
+                    _enforce(counter, limit, label)
+            else:
+                with counter.active():
+                    result = func(*args, **kwargs)
+                _enforce(counter, limit, label)
+            if getattr(result, "streaming", False):
+                result.streaming_content = _counted(result.streaming_content, counter, limit, label)
+            return result
+
+        return wrapper
+
+    def decorate(target):
+        if isinstance(target, type):
+            target.dispatch = wrap(target.dispatch, target.__qualname__)
+            target.query_budget = limit
+            return target
+        return wrap(target, target.__qualname__)
+
+    return decorate
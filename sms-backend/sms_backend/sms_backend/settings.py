@@ -1,6 +1,8 @@
 
 from pathlib import Path
 import os
+import sys
+import tempfile
 from datetime import timedelta
 from dotenv import load_dotenv
 
@@ -114,6 +116,30 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# New hashes use PASSWORD_HASHER ("pbkdf2", "scrypt" or "argon2", which needs
+# argon2-cffi); hashes made with another hasher or other work factors are
+# upgraded on the user's next login (users/hashers.py).
+PASSWORD_HASHER_CLASSES = {
+    'pbkdf2': 'users.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'users.hashers.ScryptPasswordHasher',
+    'argon2': 'users.hashers.Argon2PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 1_000_000))
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.environ.get('PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 14))
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get('PASSWORD_ARGON2_MEMORY_COST', 102400))
+
+# ModelBackend plus the login form's role; a wrong-role login is turned
+# away before hashing (users/backends.py)
+AUTHENTICATION_BACKENDS = ['users.backends.RoleModelBackend']
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -140,9 +166,16 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DATETIME_FORMAT': "%Y-%m-%d Time: %H:%M:%S",
      'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # request.user is built from the token's claims without a query,
+    # see users/authentication.py; AUTH_STATELESS_JWT=false loads the row
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication'
+        if os.environ.get('AUTH_STATELESS_JWT', 'true').lower() == 'true'
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    # keyset pages: {"next", "previous", "results"}, see sms_backend/pagination.py
+    'DEFAULT_PAGINATION_CLASS': 'sms_backend.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
 }
 
 AUTH_USER_MODEL = 'users.User' 
@@ -162,6 +195,7 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
     "UPDATE_LAST_LOGIN": False,
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.ClaimsTokenRefreshSerializer",
 
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY,
@@ -175,6 +209,69 @@ SIMPLE_JWT = {
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Leaderboards, version stamps and cached grades master data responses.
+# Web workers and the grade job workers must share one cache: the default
+# file cache does on one host (CACHE_LOCATION). locmem is per process, so
+# only fit for a single process (see sms_backend/shared_cache.py).
+# Payloads may be culled once MAX_ENTRIES (room for two per student plus
+# leaderboards and responses) is reached; a culled one is rebuilt. Token
+# revocations, version stamps and counters go in 'state', which must never
+# cull an entry before it expires (users.E001 and grades.W002 check).
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'sms_backend_cache'))
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[os.environ.get('CACHE_BACKEND', 'file')],
+        'LOCATION': CACHE_LOCATION,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 25000)),
+            'CULL_FREQUENCY': 4,
+        },
+    },
+    'state': {
+        'BACKEND': CACHE_BACKENDS[os.environ.get('CACHE_BACKEND', 'file')],
+        'LOCATION': os.environ.get('CACHE_STATE_LOCATION', f'{CACHE_LOCATION}_state'),
+        'OPTIONS': {'MAX_ENTRIES': sys.maxsize, 'CULL_FREQUENCY': 3},
+    },
+}
+
+# Result summaries are recomputed once per (enrollment, exam) when a mark
+# transaction commits ("deferred"), or queued for the process_recompute_queue
+# worker ("background").
+GRADES_RECOMPUTE_MODE = os.environ.get('GRADES_RECOMPUTE_MODE', 'deferred')
+
+# Single mark edits shift the stored totals with one UPDATE instead of
+# re-aggregating; run `manage.py verify_results` periodically to repair drift.
+GRADES_INCREMENTAL_RESULTS = os.environ.get('GRADES_INCREMENTAL_RESULTS', 'true').lower() == 'true'
+
+# Seconds a grade job may stay "running" before run_grade_jobs assumes its
+# worker died and marks it failed; keep it above the longest recompute.
+GRADE_JOB_TIMEOUT = int(os.environ.get('GRADE_JOB_TIMEOUT', 3600))
+
+# Attendance storage: one row per student per day ("rows") or one packed
+# bitmap per course per day ("bitmap"). Switch with `manage.py convert_attendance`.
+ATTENDANCE_STORAGE = os.environ.get('ATTENDANCE_STORAGE', 'rows')
+
+# Views decorated with @query_budget log when they run more queries than
+# budgeted (see sms_backend/query_budget.py). The tests turn on strict mode,
+# which raises and rolls the request back instead.
+QUERY_BUDGET_STRICT = False
+
+# The tests run against temporary copies of CACHES, never the live ones.
+TEST_RUNNER = 'sms_backend.test_runner.TestRunner'
+
+# Mark, result and student lists are read with values() and rendered through
+# a field mapping compiled from their serializers (sms_backend/values_reader.py).
+FAST_LIST_READS = os.environ.get('FAST_LIST_READS', 'true').lower() == 'true'
+
+# Rows accepted by the student import endpoint, whose passwords are hashed
+# within the request; `manage.py import_students` takes any size and hashes
+# on every core.
+STUDENT_IMPORT_MAX_ROWS = int(os.environ.get('STUDENT_IMPORT_MAX_ROWS', 100))
+
 STRIPE_SECRET_KEY = os.environ.get('STRIPE_SECRET_KEY', '')
 STRIPE_PUBLISHABLE_KEY = os.environ.get('STRIPE_PUBLISHABLE_KEY', '')
 
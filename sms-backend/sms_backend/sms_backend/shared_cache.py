@@ -0,0 +1,60 @@
+"""
+The caches are shared state between processes: every web worker,
+``run_grade_jobs`` and ``process_recompute_queue`` read and write them.
+Version bumps, token revocations and cached payloads are only seen by the
+other processes when the backend is shared (the file cache on one host,
+Redis or Memcached across hosts); a local-memory cache never is.
+
+Entries whose loss changes behaviour, and not just costs a rebuild, go in
+the ``state`` alias (``state_cache``): a culled token revocation would
+trust stale claims again, a culled version stamp would serve payloads from
+before the last bump. That alias must be a backend that never evicts,
+i.e. the file or database cache with ``MAX_ENTRIES`` set to
+``NEVER_CULL``. It holds one revocation per user, one stamp per student,
+exam and cached model, and the response cache counters.
+"""
+import sys
+
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import CommandError
+from django.utils.connection import ConnectionProxy
+
+HINT = "Set CACHE_BACKEND=file (the default) or configure a shared cache backend."
+
+STATE_ALIAS = "state"
+NEVER_CULL = sys.maxsize
+
+STATE_HINT = (
+    f"Use the file or database cache for the '{STATE_ALIAS}' alias with "
+    f"OPTIONS={{'MAX_ENTRIES': {NEVER_CULL}}} (see CACHES in settings.py)."
+)
+
+state_cache = ConnectionProxy(caches, STATE_ALIAS)
+
+
+def is_process_local(alias="default"):
+    return isinstance(caches[alias], LocMemCache)
+
+
+def can_evict(alias=STATE_ALIAS):
+    """
+    Whether the backend may drop an entry before it expires. Local memory
+    culls, Memcached and Redis evict under memory pressure; the file and
+    database caches only cull once ``MAX_ENTRIES`` is reached.
+    """
+    backend = caches[alias]
+    if isinstance(backend, (FileBasedCache, DatabaseCache)):
+        return backend._max_entries < NEVER_CULL
+    return True
+
+
+def require_shared_cache(command):
+    """For worker commands whose cache writes the web workers must see."""
+    if is_process_local() or is_process_local(STATE_ALIAS):
+        raise CommandError(
+            f"{command} writes cache versions the web workers must see, but the "
+            f"cache is local to each process. {HINT}"
+        )
@@ -0,0 +1,19 @@
+"""
+Helpers for streamed responses.
+
+``line_writer()`` is a ``csv.writer`` whose ``writerow`` returns the
+formatted line instead of writing it anywhere, so a generator can yield
+CSV one row (or one batch of rows) at a time.
+"""
+import csv
+
+
+class _Echo:
+    """csv.writer target that hands each formatted line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def line_writer():
+    return csv.writer(_Echo())
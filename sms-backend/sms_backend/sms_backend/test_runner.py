@@ -0,0 +1,30 @@
+"""
+Test runner that points every cache alias at a temporary directory.
+
+The configured caches are shared with the servers running on the same
+host, and the tests clear and fill them; the suite gets its own copies
+(same backends and options) that are removed afterwards.
+"""
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._cache_dir = tempfile.mkdtemp(prefix="sms_backend_test_cache_")
+        self._caches = override_settings(CACHES={
+            alias: {**config, "LOCATION": f"{self._cache_dir}/{alias}"}
+            for alias, config in settings.CACHES.items()
+        })
+        self._caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches.disable()
+        shutil.rmtree(self._cache_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,171 @@
+"""
+Fast read path for large lists.
+
+A ``ModelSerializer`` builds a model instance per row, then walks every
+dotted ``source`` (``enrollment.student.username``) through those instances
+and calls each field's ``to_representation``. ``ValuesReader`` compiles the
+serializer's readable fields once into a ``values()`` lookup and a converter
+per column, so rows come out of the database as dicts and only columns whose
+representation differs from the raw value (dates, files) are touched.
+
+The output is the same as ``serializer.data`` for the same rows; sources that
+are not concrete model fields (properties, methods, ``source="*"``) cannot be
+compiled and raise ``ImproperlyConfigured``.
+
+Compiling walks the serializer's fields and picks a converter for each, so
+``reader_for`` keeps one reader per serializer class for the life of the
+process. Serializers read this way must not vary their fields with the
+request context.
+"""
+import functools
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import models
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# DRF field -> model fields whose values() output it returns unchanged
+PASSTHROUGH = (
+    (serializers.PrimaryKeyRelatedField, (models.ForeignKey, models.OneToOneField)),
+    (serializers.BooleanField, (models.BooleanField,)),
+    (serializers.IntegerField, (models.IntegerField, models.AutoField)),
+    (serializers.FloatField, (models.FloatField,)),
+    (serializers.CharField, (models.CharField, models.TextField)),
+)
+
+
+def _model_field(model, attrs):
+    field = None
+    for attr in attrs:
+        if field is not None:
+            if not field.is_relation:
+                raise FieldDoesNotExist(attr)
+            model = field.related_model
+        field = model._meta.get_field(attr)
+        if field.many_to_many or field.one_to_many:
+            raise FieldDoesNotExist(attr)
+    return field
+
+
+def _file_converter(field, model_field):
+    def convert(name):
+        return field.to_representation(model_field.attr_class(None, model_field, name))
+    return convert
+
+
+def _datetime_converter(field):
+    # DateTimeField.to_representation looks up the current timezone on
+    # every call; resolve the timezone and format once instead.
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if output_format is None:
+        return None
+    tz = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+    if tz is None:
+        return field.to_representation
+    iso = output_format.lower() == ISO_8601
+
+    def convert(value):
+        if timezone.is_naive(value):
+            return field.to_representation(value)
+        value = value.astimezone(tz)
+        if iso:
+            value = value.isoformat()
+            return value[:-6] + "Z" if value.endswith("+00:00") else value
+        return value.strftime(output_format)
+
+    if iso or "%f" in output_format:
+        return convert
+
+    # Second-resolution formats: rows written in the same second (a bulk
+    # upload, a recompute) share one formatted string.
+    formatted = {}
+
+    def convert_seconds(value):
+        key = int(value.timestamp())
+        try:
+            return formatted[key]
+        except KeyError:
+            if len(formatted) >= 4096:
+                formatted.clear()
+            text = formatted[key] = convert(value)
+            return text
+    return convert_seconds
+
+
+def _converter(field, model_field):
+    if isinstance(model_field, models.FileField):
+        return _file_converter(field, model_field)
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    for drf_class, model_classes in PASSTHROUGH:
+        if isinstance(field, drf_class):
+            return None if isinstance(model_field, model_classes) else field.to_representation
+    return field.to_representation
+
+
+class ValuesReader:
+    """Reads a queryset as the given serializer would render it, via ``values()``."""
+
+    def __init__(self, serializer):
+        model = serializer.Meta.model
+        columns = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            try:
+                model_field = _model_field(model, field.source_attrs)
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(
+                    f"{type(serializer).__name__}.{name}: source {field.source!r} "
+                    f"is not a model field of {model.__name__}"
+                )
+            lookup = "__".join(field.source_attrs)
+            columns.append((name, lookup, _converter(field, model_field)))
+        # (key, values() lookup, converter or None for the raw value)
+        self.columns = tuple(columns)
+        self.lookups = list(dict.fromkeys(lookup for _, lookup, _ in self.columns))
+
+    def query(self, queryset):
+        return queryset.values(*self.lookups)
+
+    def render(self, rows):
+        columns = self.columns
+        return [
+            {
+                name: row[lookup] if convert is None
+                else None if (value := row[lookup]) is None
+                else convert(value)
+                for name, lookup, convert in columns
+            }
+            for row in rows
+        ]
+
+    def read(self, queryset):
+        return self.render(self.query(queryset))
+
+
+@functools.lru_cache(maxsize=None)
+def reader_for(serializer_class):
+    """The compiled reader for a serializer class, built on first use."""
+    return ValuesReader(serializer_class())
+
+
+class FastListMixin:
+    """
+    ``list()`` through ``ValuesReader`` instead of the serializer; detail
+    views and writes keep using the serializer. ``FAST_LIST_READS = False``
+    turns it off everywhere.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not getattr(settings, "FAST_LIST_READS", True):
+            return super().list(request, *args, **kwargs)
+        reader = reader_for(self.get_serializer_class())
+        rows = reader.query(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(reader.render(page))
+        return Response(reader.render(rows))
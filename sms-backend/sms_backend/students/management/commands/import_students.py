@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from students.services.student_import import import_students, read_csv
+
+
+class Command(BaseCommand):
+    help = (
+        "Create students from a CSV file (username, email, course, department, "
+        "year, govt_Id and optionally password, first_name, last_name, "
+        "date_of_birth, phone, address). Invalid rows are skipped and listed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Password hashing processes (default: one per CPU).")
+        parser.add_argument("--dry-run", action="store_true", help="Only validate the file.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], "rb") as handle:
+                rows = read_csv(handle.read())
+        except (OSError, UnicodeDecodeError) as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+
+        started = time.perf_counter()
+        report = import_students(rows, workers=options["workers"], dry_run=options["dry_run"])
+        elapsed = time.perf_counter() - started
+
+        for error in report["errors"]:
+            messages = "; ".join(f"{field}: {' '.join(map(str, msgs))}" for field, msgs in error["errors"].items())
+            self.stderr.write(f"row {error['row']}: {messages}")
+        if options["dry_run"]:
+            summary = f"{report['rows'] - len(report['errors'])} valid"
+        else:
+            summary = f"{report['created']} created"
+        self.stdout.write(f"{report['rows']} rows: {summary}, {len(report['errors'])} rejected ({elapsed:.1f}s)")
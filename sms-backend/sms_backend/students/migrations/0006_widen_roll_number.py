@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0005_studentprofile_govt_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studentprofile',
+            name='Student_Id',
+            field=models.CharField(max_length=20, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='studentprofile',
+            name='roll_number',
+            field=models.CharField(max_length=20, unique=True),
+        ),
+    ]
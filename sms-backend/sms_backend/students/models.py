@@ -5,8 +5,9 @@ from courses.models import Course
 class studentProfile(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     
-    roll_number = models.CharField(max_length=8, unique=True) 
-    Student_Id = models.CharField(max_length=12, unique=True) 
+    # course code (up to 10 characters) followed by the profile id
+    roll_number = models.CharField(max_length=20, unique=True) 
+    Student_Id = models.CharField(max_length=20, unique=True) 
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='student')
     department = models.CharField(max_length=100)
     year = models.IntegerField()
@@ -18,12 +19,16 @@ class studentProfile(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.Student_Id}"
+
+    @staticmethod
+    def make_roll_number(course_code, profile_id):
+        return f"{course_code.upper()}{profile_id:02d}"
     
     def save(self, *args, **kwargs):
 
         if not self.roll_number:
             super().save(*args, **kwargs) 
-            new_roll_number = f"{self.course.code.upper()}{self.id:02d}" 
+            new_roll_number = self.make_roll_number(self.course.code, self.id)
             self.roll_number = new_roll_number
     
             super().save(update_fields=['roll_number'])
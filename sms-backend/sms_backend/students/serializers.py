@@ -1,3 +1,4 @@
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from rest_framework import serializers
 from rest_framework.exceptions import PermissionDenied
 from users.models import User
@@ -88,4 +89,25 @@ class StudentProfileSerializer(serializers.ModelSerializer):
             'teacher_first_name',
             'teacher_last_name'
         ]
-        # Remove 'email' and 'username' from here, they are read-only now
\ No newline at end of file
+        # Remove 'email' and 'username' from here, they are read-only now
+
+class StudentImportRowSerializer(serializers.Serializer):
+    """One row of a student import CSV; usernames and courses are checked against the DB in bulk."""
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    email = serializers.EmailField()
+    password = serializers.CharField(required=False, allow_blank=True, default='')
+    first_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+    last_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+    course = serializers.CharField(help_text="Course code")
+    department = serializers.CharField(max_length=100)
+    year = serializers.IntegerField()
+    date_of_birth = serializers.DateField(required=False, allow_null=True, default=None)
+    phone = serializers.CharField(max_length=15, required=False, allow_blank=True, default='')
+    address = serializers.CharField(max_length=200, required=False, allow_blank=True, default='')
+    govt_Id = serializers.CharField(max_length=50)
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict):
+            # empty CSV cells mean "not given"
+            data = {key: value for key, value in data.items() if value not in ('', None)}
+        return super().to_internal_value(data)
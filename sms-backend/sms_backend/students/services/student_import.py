@@ -0,0 +1,165 @@
+"""
+Bulk student onboarding from a CSV file.
+
+Rows are validated together (one query for taken usernames, one for course
+codes), passwords are hashed across a process pool (by the management
+command; the HTTP endpoint hashes in its own process), and users and
+profiles go in with ``bulk_create``. A profile's roll number is built from its own
+id, so profiles are inserted with a placeholder derived from the (already
+known) user id and the real roll numbers are written back in one upsert,
+instead of the two saves ``studentProfile.save()`` does per student.
+
+Row numbers in the report are spreadsheet rows: the header is row 1.
+"""
+import csv
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from courses.models import Course
+from students.models import studentProfile
+from students.serializers import StudentImportRowSerializer
+from users.models import User
+
+DEFAULT_PASSWORD = 'default1to9'  # same default as StudentSerializer.create
+FIRST_ROW = 2
+BATCH_SIZE = 1000
+# Below this many passwords, starting worker processes costs more than it saves.
+MIN_POOL_PASSWORDS = 32
+
+
+def read_csv(data):
+    """Rows of an uploaded CSV (bytes or text) as dicts keyed by the header."""
+    if isinstance(data, bytes):
+        data = data.decode('utf-8-sig')
+    return list(csv.DictReader(io.StringIO(data)))
+
+
+def find_row_errors(rows):
+    """
+    Validate raw rows. Returns ``(valid, errors)``: ``valid`` maps row index
+    to validated data and ``errors`` maps row index to ``{field: [message]}``.
+    """
+    valid, errors = {}, {}
+    for index, row in enumerate(rows):
+        serializer = StudentImportRowSerializer(data=row)
+        if serializer.is_valid():
+            valid[index] = serializer.validated_data
+        else:
+            errors[index] = serializer.errors
+
+    usernames = {row['username'] for row in valid.values()}
+    taken = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    codes = {row['course'] for row in valid.values()}
+    courses = dict(Course.objects.filter(code__in=codes).values_list('code', 'id'))
+
+    seen = {}
+    for index, row in list(valid.items()):
+        row_errors = {}
+        if row['username'] in taken:
+            row_errors['username'] = ["A user with this username already exists."]
+        elif row['username'] in seen:
+            row_errors['username'] = [f"Duplicate of row {seen[row['username']] + FIRST_ROW}."]
+        else:
+            seen[row['username']] = index
+        if row['course'] not in courses:
+            row_errors['course'] = [f"No course with code \"{row['course']}\"."]
+        else:
+            row['course_id'] = courses[row['course']]
+        if row_errors:
+            errors[index] = row_errors
+            del valid[index]
+    return valid, errors
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    ``make_password`` for each password, spread over ``workers`` processes
+    (default: one per CPU). Workers are spawned rather than forked so they
+    never share the parent's database connections.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(passwords) < MIN_POOL_PASSWORDS:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=django.setup) as pool:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def create_students(rows, workers=None):
+    """
+    Insert validated rows (with ``course_id`` resolved) as student users and
+    profiles. Returns the profiles, in row order, with roll numbers set.
+    """
+    hashes = hash_passwords([row['password'] or DEFAULT_PASSWORD for row in rows], workers)
+    codes = dict(Course.objects.filter(id__in={row['course_id'] for row in rows}).values_list('id', 'code'))
+
+    with transaction.atomic():
+        users = User.objects.bulk_create(
+            [
+                User(
+                    username=row['username'], email=row['email'], password=password,
+                    first_name=row['first_name'], last_name=row['last_name'], role='student',
+                )
+                for row, password in zip(rows, hashes)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        profiles = studentProfile.objects.bulk_create(
+            [
+                studentProfile(
+                    user=user, course_id=row['course_id'],
+                    # unique placeholders until the profile ids are known
+                    roll_number=f"~{user.id}", Student_Id=f"~{user.id}",
+                    department=row['department'], year=row['year'],
+                    date_of_birth=row['date_of_birth'], phone=row['phone'],
+                    address=row['address'], govt_Id=row['govt_Id'],
+                )
+                for row, user in zip(rows, users)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        for profile in profiles:
+            profile.roll_number = profile.Student_Id = studentProfile.make_roll_number(
+                codes[profile.course_id], profile.id
+            )
+        studentProfile.objects.bulk_create(
+            profiles,
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['id'],
+            update_fields=['roll_number', 'Student_Id'],
+        )
+    return profiles
+
+
+def import_students(rows, workers=None, dry_run=False):
+    """
+    Validate raw CSV rows and create every valid one. Invalid rows are
+    skipped and reported; nothing is written when ``dry_run`` is set.
+    """
+    valid, errors = find_row_errors(rows)
+    report = {
+        'rows': len(rows),
+        'created': 0,
+        'students': [],
+        'errors': [{'row': index + FIRST_ROW, 'errors': e} for index, e in sorted(errors.items())],
+    }
+    if dry_run or not valid:
+        return report
+
+    indexes = sorted(valid)
+    profiles = create_students([valid[index] for index in indexes], workers)
+    report['created'] = len(profiles)
+    report['students'] = [
+        {'row': index + FIRST_ROW, 'id': profile.id, 'username': profile.user.username,
+         'roll_number': profile.roll_number}
+        for index, profile in zip(indexes, profiles)
+    ]
+    return report
@@ -1,3 +1,105 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from courses.models import Course
+from students.models import studentProfile
+from students.services.student_import import import_students
+from sms_backend.values_reader import reader_for
+from users.models import User
+
+HEADER = "username,email,course,department,year,govt_Id\n"
+
+
+def csv_rows(*rows):
+    return [dict(zip(HEADER.strip().split(","), row.split(","))) for row in rows]
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class StudentImportTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(code="COMPSCI101", name="Computer Science")
+        User.objects.create(username="taken")
+
+    def test_valid_rows_are_created_and_invalid_rows_reported(self):
+        report = import_students(csv_rows(
+            "ana,ana@example.com,COMPSCI101,Science,1,G1",
+            "ben,ben@example.com,NOPE,Science,1,G2",
+            "taken,t@example.com,COMPSCI101,Science,1,G3",
+            "ana,ana2@example.com,COMPSCI101,Science,1,G4",
+            "cy,not-an-email,COMPSCI101,Science,1,G5",
+            "dee,dee@example.com,COMPSCI101,Science,2,G6",
+        ), workers=1)
+
+        self.assertEqual(report["created"], 2)
+        self.assertEqual([error["row"] for error in report["errors"]], [3, 4, 5, 6])
+        self.assertIn("Duplicate of row 2.", report["errors"][2]["errors"]["username"])
+        max_length = studentProfile._meta.get_field("roll_number").max_length
+        for created in report["students"]:
+            profile = studentProfile.objects.select_related("user").get(id=created["id"])
+            self.assertEqual(profile.roll_number, f"COMPSCI101{profile.id:02d}")
+            self.assertEqual(profile.Student_Id, profile.roll_number)
+            self.assertLessEqual(len(profile.roll_number), max_length)
+            self.assertEqual(profile.user.role, "student")
+            self.assertTrue(profile.user.check_password("default1to9"))
+
+    def test_dry_run_writes_nothing(self):
+        report = import_students(csv_rows("ana,ana@example.com,COMPSCI101,Science,1,G1"), dry_run=True)
+        self.assertEqual((report["created"], report["errors"]), (0, []))
+        self.assertFalse(studentProfile.objects.exists())
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"], STUDENT_IMPORT_MAX_ROWS=40)
+class StudentImportViewTests(APITestCase):
+    url = "/api/students/import/"
+
+    def setUp(self):
+        Course.objects.create(code="C1", name="Course")
+        self.client.force_authenticate(User.objects.create(username="admin", role="admin"))
+
+    def upload(self, count, query=""):
+        body = HEADER + "".join(f"s{i},s{i}@example.com,C1,Science,1,G{i}\n" for i in range(count))
+        return self.client.post(self.url + query, {"file": SimpleUploadedFile("intake.csv", body.encode())})
+
+    def test_passwords_are_hashed_in_the_request_process(self):
+        with mock.patch("os.cpu_count", return_value=8), \
+                mock.patch("students.services.student_import.ProcessPoolExecutor") as pool:
+            response = self.upload(40)
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()["created"], 40)
+        pool.assert_not_called()
+
+    def test_large_uploads_are_refused_unless_dry_run(self):
+        self.assertEqual(self.upload(41).status_code, 400)
+        self.assertFalse(studentProfile.objects.exists())
+        self.assertEqual(self.upload(41, "?dry_run=true").status_code, 200)
+
+
+class StudentListTests(APITestCase):
+    """The values() read path must render exactly what the serializer does."""
+
+    def setUp(self):
+        Course.objects.create(code="COMPSCI101", name="Computer Science")
+        import_students(csv_rows(
+            "ana,ana@example.com,COMPSCI101,Science,1,G1",
+            "ben,ben@example.com,COMPSCI101,Arts,2,G2",
+        ), workers=1)
+        studentProfile.objects.filter(user__username="ana").update(phone="555", date_of_birth="2008-02-29")
+        self.client.force_authenticate(User.objects.create(username="admin", role="admin", is_staff=True))
+
+    def test_same_response_as_the_serializer(self):
+        with override_settings(FAST_LIST_READS=False):
+            slow = self.client.get("/api/students/")
+        with override_settings(FAST_LIST_READS=True):
+            fast = self.client.get("/api/students/")
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(len(fast.json()["results"]), 2)
+        self.assertEqual(fast.json(), slow.json())
+
+    def test_reader_is_compiled_once(self):
+        reader_for.cache_clear()
+        for _ in range(3):
+            self.client.get("/api/students/")
+        self.assertEqual(reader_for.cache_info().misses, 1)
@@ -5,4 +5,5 @@ urlpatterns = [
     path('', StudentListCreateView.as_view(), name='students'),
     path('<int:pk>/', StudentDestroyView.as_view(), name='student-detail'),
     path('profile/', StudentProfileView.as_view(), name='student-profile'),
+    path('import/', StudentImportView.as_view(), name='student-import'),
 ]
@@ -1,12 +1,20 @@
-from rest_framework import generics, serializers
+import csv
+
+from django.conf import settings
+from rest_framework import generics, serializers, status
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from users.models import User
 from .models import studentProfile
 from .serializers import *
+from sms_backend.values_reader import FastListMixin
+from students.services.student_import import import_students, read_csv
 
 
-class StudentListCreateView(generics.ListCreateAPIView):
+class StudentListCreateView(FastListMixin, generics.ListCreateAPIView):
     
     serializer_class = StudentSerializer
     permission_classes = [IsAuthenticated]
@@ -21,7 +29,7 @@ class StudentListCreateView(generics.ListCreateAPIView):
             return studentProfile.objects.filter(user=user)
         
         elif user.role in ['teacher', 'admin']:
-            return studentProfile.objects.all()
+            return studentProfile.objects.select_related('user', 'course')
         
         return studentProfile.objects.none()
     
@@ -70,4 +78,45 @@ class StudentProfileView(generics.RetrieveAPIView):
             # Get the profile linked to the logged-in user
             return studentProfile.objects.get(user=user)
         except studentProfile.DoesNotExist:
-            raise PermissionDenied("Student profile not found.")
\ No newline at end of file
+            raise PermissionDenied("Student profile not found.")
+
+
+class StudentImportView(APIView):
+    """
+    Onboard a whole intake from a CSV upload (multipart field "file").
+    Columns: username, email, course (code), department, year, govt_Id and
+    optionally password, first_name, last_name, date_of_birth, phone,
+    address. Valid rows are created, invalid ones are reported per row;
+    ?dry_run=true only validates. Every password is hashed within the
+    request, so uploads are capped at STUDENT_IMPORT_MAX_ROWS rows.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        user = request.user
+        if not hasattr(user, 'role') or user.role not in ['teacher', 'admin']:
+            raise PermissionDenied("Only teachers or admins can add students.")
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "Upload the CSV as the 'file' field."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            rows = read_csv(upload.read())
+        except (UnicodeDecodeError, csv.Error):
+            return Response({"error": "file must be a UTF-8 CSV"}, status=status.HTTP_400_BAD_REQUEST)
+        if not rows:
+            return Response({"error": "file has no rows"}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        if not dry_run and len(rows) > settings.STUDENT_IMPORT_MAX_ROWS:
+            return Response(
+                {"error": f"At most {settings.STUDENT_IMPORT_MAX_ROWS} rows per upload; "
+                          f"import larger files with `manage.py import_students`."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # hashed in this process: a worker pool would take every core from the web server
+        report = import_students(rows, workers=1, dry_run=dry_run)
+        if dry_run:
+            return Response(report)
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,75 @@
+"""
+Stateless JWT authentication.
+
+Tokens carry the claims the permission checks read (username, role,
+is_staff), and ``ClaimsJWTAuthentication`` builds ``request.user`` from
+them instead of loading the User row on every request. Every other field
+is deferred, so code that does read, say, ``request.user.email`` still
+gets the stored value with one lazy query.
+
+Claims can go stale: whenever a user is saved or deleted their id goes on
+a revocation list in the cache for one access-token lifetime, and tokens
+issued up to that moment are checked against the database again (which
+rejects deactivated users and sees the new role). Refreshing a token
+re-reads the claims from the database. Every worker must read the same
+revocation list, and an entry dropped early would trust stale claims
+again, so the list is kept in the ``state`` cache, which is shared between
+processes and never culled; the users.E001 system check refuses a backend
+that can evict.
+"""
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from sms_backend.shared_cache import state_cache
+from users.models import User
+
+CLAIM_FIELDS = ("username", "role", "is_staff")
+
+
+def set_user_claims(token, user):
+    for field in CLAIM_FIELDS:
+        token[field] = getattr(user, field)
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token (and derived access tokens) carrying ``CLAIM_FIELDS``."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        set_user_claims(token, user)
+        return token
+
+
+def _revocation_key(user_id):
+    return f"users:revoked:{user_id}"
+
+
+def revoke_claims(user_id):
+    """Stop trusting the claims of tokens issued to ``user_id`` up to now."""
+    lifetime = settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"].total_seconds()
+    state_cache.set(_revocation_key(user_id), int(time.time()), lifetime)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        claims = validated_token.payload
+        user_id = claims.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or any(field not in claims for field in CLAIM_FIELDS):
+            # issued before tokens carried claims
+            return super().get_user(validated_token)
+
+        revoked_at = state_cache.get(_revocation_key(user_id))
+        if revoked_at is not None and claims.get("iat", 0) <= revoked_at:
+            return super().get_user(validated_token)
+
+        known = {field: claims[field] for field in CLAIM_FIELDS}
+        known.update(id=User._meta.pk.to_python(user_id), is_active=True)
+        # from_db wants the loaded fields in model order; the rest are deferred
+        fields = [f.attname for f in User._meta.concrete_fields if f.attname in known]
+        return User.from_db(DEFAULT_DB_ALIAS, fields, [known[name] for name in fields])
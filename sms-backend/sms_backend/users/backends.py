@@ -0,0 +1,36 @@
+"""
+Authentication backend for the login and token endpoints.
+
+``RoleModelBackend`` is Django's ``ModelBackend`` plus the login form's
+``role``: the user is looked up by username (unique index) first, and an
+attempt for another role's portal is turned away before any hashing. An
+unknown username still pays for one hash, as with ``ModelBackend``, so
+response times do not reveal which usernames exist. Logins go through
+``django.contrib.auth.authenticate``, which sends ``user_login_failed``
+for every miss. A successful check with an outdated hash re-encodes the
+password with the preferred hasher (see users/hashers.py).
+"""
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+
+from users.models import User
+
+
+class RoleModelBackend(ModelBackend):
+
+    def authenticate(self, request, username=None, password=None, role=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if not username or not password:
+            return None
+        try:
+            user = User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            User().set_password(password)  # as long as a real check
+            return None
+        if role is not None and user.role != role:
+            # stops later backends from accepting the wrong portal
+            raise PermissionDenied
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,24 @@
+from django.core import checks
+from rest_framework.settings import api_settings
+
+from sms_backend.shared_cache import STATE_ALIAS, STATE_HINT, can_evict
+from users.authentication import ClaimsJWTAuthentication
+
+
+@checks.register(checks.Tags.caches, checks.Tags.security)
+def check_revocations_are_shared(app_configs, **kwargs):
+    stateless = any(
+        issubclass(auth_class, ClaimsJWTAuthentication)
+        for auth_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    )
+    if stateless and can_evict(STATE_ALIAS):
+        return [checks.Error(
+            "Token claims are trusted until revoked, and revocations are kept "
+            f"in the '{STATE_ALIAS}' cache, whose backend can drop entries "
+            "(per-process memory, or culling and eviction): a user deactivated "
+            "or demoted keeps their old role on workers that no longer see the "
+            "revocation until their access token expires.",
+            hint=f"{STATE_HINT} Or set AUTH_STATELESS_JWT=false to load the user on every request.",
+            id="users.E001",
+        )]
+    return []
@@ -0,0 +1,31 @@
+"""
+Password hashers whose work factors come from settings.
+
+Django compares a stored hash's parameters with the hasher's on every
+successful ``check_password`` and re-encodes the password when they differ
+(or when the hash was made by a hasher other than the first one in
+``PASSWORD_HASHERS``). Changing ``PASSWORD_HASHER`` or one of the
+``PASSWORD_*`` work factors therefore migrates users one login at a time.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    def __init__(self):
+        self.iterations = getattr(settings, "PASSWORD_PBKDF2_ITERATIONS", self.iterations)
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    def __init__(self):
+        self.work_factor = getattr(settings, "PASSWORD_SCRYPT_WORK_FACTOR", self.work_factor)
+        # scrypt needs about 128 * n * r bytes; OpenSSL's default cap is 32MB
+        self.maxmem = 2 * 128 * self.work_factor * self.block_size
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Needs argon2-cffi, but only once a password is hashed with it."""
+
+    def __init__(self):
+        self.time_cost = getattr(settings, "PASSWORD_ARGON2_TIME_COST", self.time_cost)
+        self.memory_cost = getattr(settings, "PASSWORD_ARGON2_MEMORY_COST", self.memory_cost)
@@ -0,0 +1,82 @@
+import os
+import time
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import get_hashers, make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from users.models import User
+
+PASSWORD = "bench-password-1"
+
+
+class _Rollback(Exception):
+    pass
+
+
+def legacy_login(username, password, role):
+    """The flow LoginView used before: hash first, check the role after."""
+    user = authenticate(username=username, password=password)
+    return user if user is not None and user.role == role else None
+
+
+def role_login(username, password, role):
+    """The flow LoginView uses now: the backend turns a wrong role away first."""
+    return authenticate(username=username, password=password, role=role)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure logins per second on one core for the old authenticate()-then-"
+        "role flow and the lookup-first login, plus the verify rate of each "
+        "configured password hasher. Users are created in a transaction that "
+        "is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--logins", type=int, default=20, help="Attempts per measurement.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._bench(options["users"], options["logins"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _bench(self, size, logins):
+        encoded = make_password(PASSWORD)
+        users = User.objects.bulk_create(
+            [User(username=f"bench-login-{i}", password=encoded, role="student") for i in range(size)]
+        )
+        attempts = {
+            "valid": lambda i: (users[i % size].username, PASSWORD, "student"),
+            "wrong role": lambda i: (users[i % size].username, PASSWORD, "teacher"),
+            "wrong password": lambda i: (users[i % size].username, "not-the-password", "student"),
+            "unknown user": lambda i: (f"bench-nobody-{i}", PASSWORD, "student"),
+        }
+        self.stdout.write(f"one process, {os.cpu_count()} CPUs; hasher: {get_hashers()[0].algorithm}")
+        self.stdout.write(f"{'attempt':>15} {'legacy/s':>10} {'login/s':>10} {'speedup':>8}")
+        for label, attempt in attempts.items():
+            legacy = self._rate(logins, lambda i: legacy_login(*attempt(i)))
+            fast = self._rate(logins, lambda i: role_login(*attempt(i)))
+            self.stdout.write(f"{label:>15} {legacy:>10,.1f} {fast:>10,.1f} {fast / legacy:>7.1f}x")
+
+        self.stdout.write(f"\n{'hasher':>15} {'verify/s':>10}")
+        for hasher in get_hashers():
+            try:
+                hashed = hasher.encode(PASSWORD, hasher.salt())
+            except (TypeError, ValueError) as exc:  # missing library
+                self.stdout.write(f"{hasher.algorithm:>15} {'-':>10}  {exc}")
+                continue
+            rate = self._rate(logins, lambda i: hasher.verify(PASSWORD, hashed))
+            self.stdout.write(f"{hasher.algorithm:>15} {rate:>10,.1f}")
+
+    @staticmethod
+    def _rate(count, func):
+        started = time.perf_counter()
+        for i in range(count):
+            func(i)
+        return count / (time.perf_counter() - started)
@@ -1,7 +1,10 @@
 from rest_framework import serializers
-from django.contrib.auth import get_user_model
+from django.contrib.auth import authenticate, get_user_model
 from .models import User
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework.exceptions import AuthenticationFailed
+from .authentication import ClaimsRefreshToken, set_user_claims
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -22,14 +25,36 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
-    @classmethod
-    def get_token(cls, user):
-        token = super().get_token(user)
-        token['role'] = user.role
-        return token
+    # role, username and is_staff claims come with the token class
+    token_class = ClaimsRefreshToken
 
     def validate(self, attrs):
-        data = super().validate(attrs)
-        data['role'] = self.user.role
-        data['username'] = self.user.username
-        return data
\ No newline at end of file
+        # same backend call as LoginView; role is optional here
+        self.user = authenticate(
+            self.context.get('request'),
+            username=attrs[self.username_field],
+            password=attrs['password'],
+            role=self.initial_data.get('role'),
+        )
+        if self.user is None:
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        refresh = self.get_token(self.user)
+        return {
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+            'role': self.user.role,
+            'username': self.user.username,
+        }
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh with the user's current claims rather than the ones issued at login."""
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}).first()
+        if user is not None:
+            set_user_claims(refresh, user)
+            attrs = {**attrs, 'refresh': str(refresh)}
+        return super().validate(attrs)
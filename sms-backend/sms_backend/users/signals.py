@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from users.authentication import revoke_claims
+from users.models import User
+
+# saves that cannot change a claim, such as the password rehash on login
+CLAIMLESS_UPDATES = {"password", "last_login"}
+
+
+@receiver([post_save, post_delete], sender=User)
+def revoke_token_claims(sender, instance, created=False, update_fields=None, **kwargs):
+    # role, staff flag or active flag may have changed; new users have no tokens yet
+    if created or (update_fields and set(update_fields) <= CLAIMLESS_UPDATES):
+        return
+    revoke_claims(instance.id)
@@ -1,3 +1,138 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.signals import user_login_failed
+import shutil
+import sys
+import tempfile
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+from django.test import TestCase, override_settings
+from rest_framework.exceptions import AuthenticationFailed
+
+from sms_backend.shared_cache import state_cache
+from users.authentication import ClaimsJWTAuthentication, ClaimsRefreshToken, revoke_claims
+from users.models import User
+from users.serializers import MyTokenObtainPairSerializer
+
+
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        state_cache.clear()  # revocations from other tests
+        self.user = User.objects.create(username="teacher", role="teacher", email="t@example.com")
+        self.token = ClaimsRefreshToken.for_user(self.user).access_token
+        # backdate so a change in the same second counts as after issue
+        self.token["iat"] -= 5
+
+    def authenticate(self):
+        return ClaimsJWTAuthentication().get_user(self.token)
+
+    def test_user_comes_from_claims(self):
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+            self.assertEqual((user.pk, user.username, user.role, user.is_staff), (self.user.pk, "teacher", "teacher", False))
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, "t@example.com")
+
+    def test_saved_user_is_checked_against_the_database(self):
+        self.user.role = "admin"
+        self.user.save()
+        self.assertEqual(self.authenticate().role, "admin")
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+
+    def file_caches(self, **state_options):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        backend = "django.core.cache.backends.filebased.FileBasedCache"
+        return override_settings(CACHES={
+            "default": {"BACKEND": backend, "LOCATION": f"{location}/default", "OPTIONS": {"MAX_ENTRIES": 30}},
+            "state": {"BACKEND": backend, "LOCATION": f"{location}/state", "OPTIONS": state_options},
+        })
+
+    def test_revocation_reaches_other_workers(self):
+        with self.file_caches(MAX_ENTRIES=sys.maxsize):
+            # the admin's request is served by another process with its own cache instance
+            other_worker = caches.create_connection("state")
+            User.objects.filter(pk=self.user.pk).update(is_active=False)
+            with mock.patch("users.authentication.state_cache", other_worker):
+                revoke_claims(self.user.pk)
+            with self.assertRaises(AuthenticationFailed):
+                self.authenticate()
+
+    def test_revocation_survives_a_full_default_cache(self):
+        with self.file_caches(MAX_ENTRIES=sys.maxsize):
+            revoke_claims(self.user.pk)
+            User.objects.filter(pk=self.user.pk).update(is_active=False)
+            for i in range(100):  # culls the default cache several times
+                caches["default"].set(f"payload:{i}", i)
+            self.assertLessEqual(len(caches["default"]._list_cache_files()), 30)
+            with self.assertRaises(AuthenticationFailed):
+                self.authenticate()
+
+    @override_settings(CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "state": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "state"},
+    })
+    def test_process_local_cache_is_refused(self):
+        with self.assertRaisesMessage(SystemCheckError, "users.E001"):
+            call_command("check")
+
+    def test_culling_cache_is_refused(self):
+        with self.file_caches(), self.assertRaisesMessage(SystemCheckError, "users.E001"):
+            call_command("check")
+
+
+@override_settings(PASSWORD_HASHERS=settings.PASSWORD_HASHERS, PASSWORD_PBKDF2_ITERATIONS=1000)
+class LoginTests(TestCase):
+    def setUp(self):
+        self.user = User(username="student", role="student")
+        self.user.set_password("secret-1")
+        self.user.save()
+
+    def login(self, username, password, role=None):
+        return authenticate(username=username, password=password, role=role)
+
+    def test_wrong_role_is_rejected_before_hashing(self):
+        with mock.patch.object(User, "check_password") as check, self.assertNumQueries(1):
+            self.assertIsNone(self.login("student", "secret-1", "teacher"))
+        check.assert_not_called()
+        self.assertEqual(self.login("student", "secret-1", "student"), self.user)
+        self.assertIsNone(self.login("student", "wrong", "student"))
+
+    def test_unknown_username_still_hashes(self):
+        with mock.patch("django.contrib.auth.base_user.make_password") as make_password:
+            self.assertIsNone(self.login("nobody", "secret-1", "student"))
+        make_password.assert_called_once_with("secret-1")
+
+    def test_every_miss_sends_user_login_failed(self):
+        failures = []
+        handler = lambda sender, credentials, **kwargs: failures.append(credentials["username"])
+        user_login_failed.connect(handler)
+        self.addCleanup(user_login_failed.disconnect, handler)
+        self.login("nobody", "secret-1", "student")
+        self.login("student", "wrong", "student")
+        self.login("student", "secret-1", "teacher")
+        self.login("student", "secret-1", "student")
+        self.assertEqual(failures, ["nobody", "student", "student"])
+
+    def test_outdated_hash_is_upgraded_on_login(self):
+        with override_settings(PASSWORD_HASHERS=settings.PASSWORD_HASHERS, PASSWORD_PBKDF2_ITERATIONS=1200):
+            self.assertEqual(self.login("student", "secret-1"), self.user)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1200$"))
+
+    def test_token_serializer_shares_the_login_flow(self):
+        serializer = MyTokenObtainPairSerializer(data={"username": "student", "password": "secret-1"})
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data["role"], "student")
+        serializer = MyTokenObtainPairSerializer(data={"username": "student", "password": "secret-1", "role": "admin"})
+        with self.assertRaises(AuthenticationFailed):
+            serializer.is_valid()
@@ -1,6 +1,7 @@
+from django.contrib.auth import authenticate
 from rest_framework import status, generics
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import ClaimsRefreshToken
 from .serializers import UserSerializer 
 # Add IsAuthenticated permission
 from rest_framework.permissions import AllowAny, IsAuthenticated 
@@ -15,7 +16,6 @@ class RegisterView(generics.CreateAPIView):
 
 # Login API
 from rest_framework.views import APIView
-from django.contrib.auth import authenticate
 
 class LoginView(APIView):
     def post(self, request):
@@ -26,9 +26,9 @@ class LoginView(APIView):
         if not role:
              return Response({"error": "Role was not provided"}, status=status.HTTP_400_BAD_REQUEST)
 
-        user = authenticate(username=username, password=password)
-        if user is not None and user.role == role:
-            refresh = RefreshToken.for_user(user)
+        user = authenticate(request, username=username, password=password, role=role)
+        if user is not None:
+            refresh = ClaimsRefreshToken.for_user(user)
            
             return Response({
                 "refresh": str(refresh),